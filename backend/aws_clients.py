@@ -0,0 +1,82 @@
+"""
+Process-wide boto3 client registry.
+
+Building a boto3 client is expensive relative to the cheap read calls this
+dashboard makes: every construction walks the credential chain, resolves the
+endpoint and loads the botocore service model. main.py used to build six
+clients per request, so client setup dominated latency for most endpoints.
+
+Clients are created lazily, once per (service, region), and shared by every
+request thread. botocore clients are thread-safe once built; construction is
+not (it goes through the shared default Session), so it is serialized behind
+a lock. All clients share one botocore Config:
+
+  - max_pool_connections: sized for the uvicorn threadpool so concurrent
+    handlers don't queue on urllib3's connection pool (default is 10).
+  - tcp_keepalive: keeps pooled connections warm between dashboard polls.
+  - retries: adaptive mode — standard retries plus client-side rate limiting,
+    which is what we want for throttle-prone APIs like Cost Explorer.
+
+Tunables come from env vars so they can be set per deployment without a
+rebuild:
+  AWS_MAX_POOL_CONNECTIONS  (default 50)
+  AWS_MAX_ATTEMPTS          (default 5)
+  AWS_CONNECT_TIMEOUT       (seconds, default 5)
+  AWS_READ_TIMEOUT          (seconds, default 30)
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+MAX_POOL_CONNECTIONS = _env_int("AWS_MAX_POOL_CONNECTIONS", 50)
+MAX_ATTEMPTS = _env_int("AWS_MAX_ATTEMPTS", 5)
+CONNECT_TIMEOUT = _env_int("AWS_CONNECT_TIMEOUT", 5)
+READ_TIMEOUT = _env_int("AWS_READ_TIMEOUT", 30)
+
+CLIENT_CONFIG = Config(
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+    tcp_keepalive=True,
+    connect_timeout=CONNECT_TIMEOUT,
+    read_timeout=READ_TIMEOUT,
+    retries={"mode": "adaptive", "max_attempts": MAX_ATTEMPTS},
+)
+
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(service: str, region_name: Optional[str] = None) -> Any:
+    """Return the shared client for `service` (in `region_name`, or the
+    default region when None), building it on first use."""
+    key = (service, region_name)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            kwargs: Dict[str, Any] = {"config": CLIENT_CONFIG}
+            if region_name:
+                kwargs["region_name"] = region_name
+            client = boto3.client(service, **kwargs)
+            _clients[key] = client
+        return client
+
+
+def reset_clients() -> None:
+    """Drop every cached client so the next get_client() rebuilds it.
+    Useful after rotating credentials in-process."""
+    with _clients_lock:
+        _clients.clear()
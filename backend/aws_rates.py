@@ -1,8 +1,10 @@
 """
 Static EC2 on-demand pricing table for us-west-2 (Linux, hourly USD).
 
-Kept in a dedicated module so it can be updated independently and, in the
-future, swapped for the AWS Pricing API without touching main.py.
+Kept in a dedicated module so it can be updated independently. Lookups now
+go through the price book in pricing.py; this table seeds its bundled
+snapshot (`python pricing.py --from-rates`) and is the fallback if that
+snapshot can't be loaded.
 
 Values are AWS list prices (us-west-2, on-demand, Linux) as of 2026.
 Use these ONLY for rough monthly rollups — actual billing may differ due to
@@ -0,0 +1,72 @@
+"""
+Shared plumbing for the scripts in this directory.
+
+Each benchmark is a plain script (`python benchmarks/bench_<name>.py`) that
+talks to stubbed AWS clients only — no credentials or network needed. This
+module puts backend/ on sys.path, pins a default region so boto3 can build
+clients offline, and provides the timing/reporting helpers they share.
+"""
+
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND = Path(__file__).resolve().parent.parent
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+
+
+def measure(
+    fn: Callable[[], Any],
+    iterations: int,
+    warmup: int = 1,
+    setup: Optional[Callable[[], Any]] = None,
+) -> Dict[str, float]:
+    """Per-call wall time of fn, in milliseconds: mean, p50, p99. `setup`,
+    if given, runs untimed before each call."""
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def report(label: str, stats: Dict[str, float]) -> None:
+    print(f"{label:<40} mean {stats['mean']:9.3f} ms   p50 {stats['p50']:9.3f} ms   p99 {stats['p99']:9.3f} ms")
+
+
+def speedup(before: Dict[str, float], after: Dict[str, float]) -> None:
+    print(f"{'speedup (mean)':<40} {before['mean'] / after['mean']:.1f}x")
+
+
+class Paginator:
+    """Minimal stand-in for a boto3 paginator over a stub's list_* method.
+    Splits `items` into pages of `page_size`, sleeping `latency` per page."""
+
+    def __init__(self, pages: Callable[..., List[Dict[str, Any]]], latency: float) -> None:
+        self._pages = pages
+        self._latency = latency
+
+    def paginate(self, **kwargs):
+        for page in self._pages(**kwargs):
+            time.sleep(self._latency)
+            yield page
+
+
+def pages_of(key: str, items: List[Any], page_size: int) -> List[Dict[str, Any]]:
+    return [{key: items[i:i + page_size]} for i in range(0, len(items), page_size)] or [{key: []}]
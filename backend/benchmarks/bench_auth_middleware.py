@@ -0,0 +1,104 @@
+"""
+Requests per second through the auth layer: the previous
+@app.middleware("http") (BaseHTTPMiddleware) version vs the pure-ASGI
+JWTAuthMiddleware, each in front of the same trivial authenticated route.
+Requests go through httpx's in-process ASGI transport with a fixed number
+of concurrent clients, so there is no socket or server in the measurement.
+
+    python benchmarks/bench_auth_middleware.py [requests] [concurrency]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from _harness import BACKEND  # noqa: F401  (puts backend/ on sys.path)
+
+import httpx
+import jwt
+from fastapi import FastAPI, HTTPException, Request
+
+os.environ.setdefault("C2A_JWT_SECRET", "YmVuY2htYXJrLXNlY3JldC1iZW5jaG1hcmstc2VjcmV0")
+import main  # noqa: E402  (reads C2A_JWT_SECRET at import)
+
+
+def _ping_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    def ping():
+        return {"ok": True}
+
+    return app
+
+
+def legacy_app() -> FastAPI:
+    """Same semantics as JWTAuthMiddleware, registered the old way."""
+    app = _ping_app()
+
+    @app.middleware("http")
+    async def jwt_auth_middleware(request: Request, call_next):
+        path = request.url.path
+        if not path.startswith("/api/") or request.method == "OPTIONS" or path in main.AUTH_EXEMPT_PATHS:
+            return await call_next(request)
+        token = main._extract_token(request)
+        if not token:
+            return main._json_error(401, "UNAUTHORIZED", "missing bearer token")
+        try:
+            claims = main._verify_token(token)
+        except HTTPException as e:
+            code = "UNAUTHORIZED" if e.status_code == 401 else "SERVER_ERROR"
+            return main._json_error(e.status_code, code, str(e.detail))
+        if claims.get("userType") != "SYSTEM":
+            return main._json_error(403, "FORBIDDEN", "SYSTEM users only")
+        request.state.jwt_claims = claims
+        return await call_next(request)
+
+    return app
+
+
+def asgi_app() -> FastAPI:
+    app = _ping_app()
+    app.add_middleware(main.JWTAuthMiddleware)
+    return app
+
+
+async def _load(app: FastAPI, token: str, requests: int, concurrency: int) -> float:
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def run(total: int) -> None:
+            remaining = iter(range(total))
+
+            async def worker():
+                for _ in remaining:
+                    resp = await client.get("/api/ping", headers=headers)
+                    assert resp.status_code == 200, resp.text
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+        await run(200)  # warm up
+        started = time.perf_counter()
+        await run(requests)
+        return requests / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    token = jwt.encode(
+        {"sub": "bench", "userType": "SYSTEM", "exp": int(time.time()) + 3600},
+        main.JWT_SECRET_BYTES,
+        algorithm=main.JWT_ALG,
+    )
+    results = {}
+    for label, app in [
+        ('@app.middleware("http")', legacy_app()),
+        ("JWTAuthMiddleware (pure ASGI)", asgi_app()),
+    ]:
+        results[label] = asyncio.run(_load(app, token, requests, concurrency))
+        print(f"{label:<40} {results[label]:9.0f} req/s")
+    legacy, pure = results.values()
+    print(f"{'speedup':<40} {pure / legacy:.2f}x")
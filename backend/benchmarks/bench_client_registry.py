@@ -0,0 +1,46 @@
+"""
+Per-request client setup: a fresh get_boto_clients() (six boto3.client()
+constructions, as before the registry) vs the shared registry in
+aws_clients.py. No AWS calls are made — construction is the cost measured.
+With no credentials in the environment the per-request path also walks
+the credential chain, as it did in production.
+
+    python benchmarks/bench_client_registry.py [iterations]
+"""
+
+import sys
+
+from _harness import measure, report, speedup  # also puts backend/ on sys.path
+
+import boto3
+
+from aws_clients import get_client
+
+SERVICES = [
+    ("ce", "us-east-1"),
+    ("identitystore", None),
+    ("sso-admin", None),
+    ("resourcegroupstaggingapi", None),
+    ("eks", None),
+    ("ec2", None),
+]
+
+
+def per_request_clients():
+    return {
+        service: boto3.client(service, **({"region_name": region} if region else {}))
+        for service, region in SERVICES
+    }
+
+
+def registry_clients():
+    return {service: get_client(service, region_name=region) for service, region in SERVICES}
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    before = measure(per_request_clients, iterations)
+    report("six clients per request", before)
+    after = measure(registry_clients, iterations * 100)
+    report("shared registry", after)
+    speedup(before, after)
@@ -0,0 +1,105 @@
+"""
+/api/costs/summary cache misses against a Cost Explorer stub with injected
+latency.
+
+  before: the baseline's three sequential MONTHLY get_cost_and_usage calls
+          (MTD, previous month, previous MTD).
+  cold:   costs_summary before the cost cube has loaded — its single DAILY
+          query over [previous month start, today), with the three totals
+          summed locally. The cube starts loading in the background.
+  warm:   costs_summary sliced from the loaded cube; no CE call.
+
+"before" and "cold" are both timed on an empty CE cache and cube.
+
+    python benchmarks/bench_costs_summary.py [latency_ms]
+"""
+
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+from _harness import measure, report, speedup  # also puts backend/ on sys.path
+
+os.environ.setdefault("C2A_JWT_SECRET", "YmVuY2htYXJrLXNlY3JldC1iZW5jaG1hcmstc2VjcmV0")
+
+import main
+from cost_cube import CostCubeCache
+from cost_windows import add_months
+
+
+SERVICES = [f"Service {i}" for i in range(40)]
+
+
+class StubCostExplorer:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls = 0
+        self.ungrouped = 0
+
+    def get_cost_and_usage(self, TimePeriod, Granularity, Metrics, GroupBy=None, NextPageToken=None):
+        time.sleep(self.latency)
+        self.calls += 1
+        self.ungrouped += GroupBy is None
+        day = date.fromisoformat(TimePeriod["Start"])
+        end = date.fromisoformat(TimePeriod["End"])
+        buckets = []
+        while day < end:
+            nxt = day + timedelta(days=1) if Granularity == "DAILY" else add_months(day, 1)
+            bucket = {"TimePeriod": {"Start": day.isoformat(), "End": min(nxt, end).isoformat()}}
+            if GroupBy:
+                bucket["Groups"] = [
+                    {"Keys": [name], "Metrics": {"UnblendedCost": {"Amount": "1.25"}}} for name in SERVICES
+                ]
+            else:
+                bucket["Total"] = {"UnblendedCost": {"Amount": str(1.25 * len(SERVICES))}}
+            buckets.append(bucket)
+            day = nxt
+        return {"ResultsByTime": buckets}
+
+
+def baseline_summary(ce: StubCostExplorer) -> None:
+    today = date.today()
+    mtd_start = today.replace(day=1)
+    prev_month_start = add_months(today, -1)
+    windows = [
+        (mtd_start, today if today > mtd_start else mtd_start + timedelta(days=1)),
+        (prev_month_start, mtd_start),
+        (prev_month_start, prev_month_start + timedelta(days=(today - mtd_start).days)),
+    ]
+    for start, end in windows:
+        if start < end:
+            ce.get_cost_and_usage(
+                TimePeriod={"Start": start.isoformat(), "End": end.isoformat()},
+                Granularity="MONTHLY",
+                Metrics=["UnblendedCost"],
+            )
+
+
+if __name__ == "__main__":
+    latency = (float(sys.argv[1]) if len(sys.argv) > 1 else 150) / 1000
+    iterations = 10
+
+    ce = StubCostExplorer(latency)
+    before = measure(lambda: baseline_summary(ce), iterations, warmup=0)
+    report(f"3 sequential MONTHLY calls ({ce.calls // iterations}/miss)", before)
+
+    ce = StubCostExplorer(latency)
+    main._ce_client = lambda: ce
+
+    def reset() -> None:
+        # Let the previous iteration's background cube load finish (untimed),
+        # then start from an empty CE cache and an unloaded cube.
+        main._cost_cube.get()
+        main._ce_cache.clear()
+        main._cost_cube = CostCubeCache(lambda: ce, ttl_seconds=15 * 60)
+
+    main._cost_cube = CostCubeCache(lambda: ce, ttl_seconds=15 * 60)
+    after = measure(lambda: main.costs_summary(_={}), iterations, warmup=0, setup=reset)
+    report(f"cold: 1 DAILY query ({ce.ungrouped // iterations}/miss)", after)
+    speedup(before, after)
+
+    main._cost_cube.get()
+    cube_calls = ce.calls - ce.ungrouped
+    warm = measure(lambda: main.costs_summary(_={}), 1000)
+    report(f"warm: cube slice (each load: {cube_calls // (iterations + 1)} calls)", warm)
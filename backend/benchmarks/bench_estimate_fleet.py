@@ -0,0 +1,70 @@
+"""
+Pricing a 50k-instance fleet: _estimate_monthly once per instance (the
+scalar path) vs _estimate_fleet, which prices each distinct price key once.
+The fleet mixes types from the price book, types it doesn't know (vCPU
+fallback through a stubbed instance catalog), spot and on-demand, running
+and stopped, across two regions.
+
+    python benchmarks/bench_estimate_fleet.py [instances]
+"""
+
+import random
+import sys
+
+from _harness import measure, report, speedup  # also puts backend/ on sys.path
+
+import main
+from aws_rates import EC2_MONTHLY_RATES_USD
+
+
+class StubCatalog:
+    def vcpus(self, instance_type):
+        return 4
+
+
+def fleet(size: int):
+    rng = random.Random(42)
+    types = sorted(EC2_MONTHLY_RATES_USD) + ["x9.large", "x9.xlarge", "z1d.2xlarge"]
+    keys = []
+    for _ in range(size):
+        lifecycle = "spot" if rng.random() < 0.2 else None
+        keys.append((
+            rng.choice(types),
+            rng.random() < 0.9,
+            lifecycle,
+            rng.choice(["us-west-2", "us-east-1"]),
+            "Linux",
+            "Shared",
+            0.031 if lifecycle and rng.random() < 0.5 else None,
+        ))
+    return keys
+
+
+def scalar(keys):
+    out = []
+    for instance_type, running, lifecycle, region, os_name, tenancy, spot_hourly in keys:
+        hourly, monthly, estimated = main._estimate_monthly(
+            instance_type,
+            "running" if running else "stopped",
+            lifecycle,
+            region=region,
+            os_name=os_name,
+            tenancy=tenancy,
+            spot_hourly=spot_hourly,
+        )
+        out.append({"hourly": hourly, "monthly": monthly, "estimated": estimated})
+    return out
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    main._instance_catalog = StubCatalog()
+    keys = fleet(size)
+    assert scalar(keys) == main._estimate_fleet(keys)
+
+    print(f"{size} instances, {len(set(keys))} distinct price keys")
+    before = measure(lambda: scalar(keys), 5)
+    report("_estimate_monthly per instance", before)
+    after = measure(lambda: main._estimate_fleet(keys), 5)
+    report("_estimate_fleet", after)
+    speedup(before, after)
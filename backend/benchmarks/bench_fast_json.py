@@ -0,0 +1,75 @@
+"""
+p50/p99 latency of a 10k-row list response: FastAPI's default path (the
+route returns a dict, so jsonable_encoder + json.dumps) vs the same payload
+returned as FastJSONResponse. Rows are shaped like /api/ec2/instances rows.
+Requests go through TestClient, so routing and the response cycle are
+included; only the serialization path differs between the two routes.
+
+    python benchmarks/bench_fast_json.py [rows] [iterations]
+"""
+
+import sys
+
+from _harness import measure, report, speedup  # also puts backend/ on sys.path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fast_json import FastJSONResponse, orjson
+
+
+def rows(count: int):
+    return [
+        {
+            "instance_id": f"i-{n:017x}",
+            "name": f"node-{n}",
+            "state": "running" if n % 10 else "stopped",
+            "instance_type": "m6i.xlarge",
+            "availability_zone": "us-west-2a",
+            "private_ip": f"10.0.{n // 256 % 256}.{n % 256}",
+            "public_ip": None,
+            "launch_time": "2026-09-01T12:00:00+00:00",
+            "vpc_id": "vpc-0123456789abcdef0",
+            "subnet_id": "subnet-0123456789abcdef0",
+            "platform": "Linux/UNIX",
+            "architecture": "x86_64",
+            "tags": {"Name": f"node-{n}", "eks:cluster-name": "prod", "team": "platform"},
+            "parent_cluster": "prod",
+            "parent_cluster_source": "eks:cluster-name",
+            "node_role_hint": "worker",
+            "use_hints": ["eks-node"],
+            "lifecycle": "on-demand",
+            "monthly_estimate": {"hourly": 0.192, "monthly": 140.16, "estimated": False},
+            "uptime": {"seconds": 3_888_000, "human": "45d 0h"},
+        }
+        for n in range(count)
+    ]
+
+
+def app_for(payload) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/default")
+    def default():
+        return payload
+
+    @app.get("/fast")
+    def fast():
+        return FastJSONResponse(payload)
+
+    return app
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    payload = {"instances": rows(count), "count": count}
+    client = TestClient(app_for(payload))
+    assert client.get("/default").json() == client.get("/fast").json()
+
+    print(f"{count} rows, encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    before = measure(lambda: client.get("/default"), iterations)
+    report("jsonable_encoder + json.dumps", before)
+    after = measure(lambda: client.get("/fast"), iterations)
+    report("FastJSONResponse", after)
+    speedup(before, after)
@@ -0,0 +1,118 @@
+"""
+/api/groups against an Identity Store stub with injected latency.
+
+  before: the baseline's loop — list_groups, then per group one
+          list_group_memberships and a sequential describe_user per member.
+  after:  get_groups over the shared IdentityDirectory — a cold request pays
+          one paginated list_users/list_groups pass plus the per-group
+          membership listings on IDENTITY_MAX_WORKERS threads; warm requests
+          read the loaded directory.
+
+    python benchmarks/bench_groups.py [latency_ms] [groups] [users]
+"""
+
+import os
+import sys
+import threading
+import time
+
+from _harness import Paginator, measure, pages_of, report, speedup  # also puts backend/ on sys.path
+
+os.environ.setdefault("C2A_JWT_SECRET", "YmVuY2htYXJrLXNlY3JldC1iZW5jaG1hcmstc2VjcmV0")
+
+import main
+from identity_directory import IdentityDirectory
+
+PAGE_SIZE = 100  # list_* MaxResults ceiling in the Identity Store API
+MEMBERS_PER_GROUP = 25
+
+
+class StubIdentityStore:
+    def __init__(self, latency: float, group_count: int, user_count: int) -> None:
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.users = [
+            {"UserId": f"u-{n}", "UserName": f"user{n}", "DisplayName": f"User {n}",
+             "Emails": [{"Value": f"user{n}@example.com", "Primary": True}]}
+            for n in range(user_count)
+        ]
+        self.by_id = {u["UserId"]: u for u in self.users}
+        self.groups = [{"GroupId": f"g-{n}", "DisplayName": f"Group {n}"} for n in range(group_count)]
+        self.memberships = {
+            group["GroupId"]: [
+                {"MembershipId": f"m-{g}-{k}", "MemberId": {"UserId": f"u-{(g * 7 + k) % user_count}"}}
+                for k in range(MEMBERS_PER_GROUP)
+            ]
+            for g, group in enumerate(self.groups)
+        }
+
+    def _call(self) -> None:
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+
+    # -- the baseline's unpaginated calls ---------------------------------------
+
+    def list_groups(self, IdentityStoreId):
+        self._call()
+        return {"Groups": self.groups}
+
+    def list_group_memberships(self, IdentityStoreId, GroupId):
+        self._call()
+        return {"GroupMemberships": self.memberships[GroupId]}
+
+    def describe_user(self, IdentityStoreId, UserId):
+        self._call()
+        return self.by_id[UserId]
+
+    # -- paginators used by identity_directory ------------------------------------
+
+    def get_paginator(self, operation):
+        def pages(IdentityStoreId, GroupId=None):
+            if operation == "list_users":
+                result = pages_of("Users", self.users, PAGE_SIZE)
+            elif operation == "list_groups":
+                result = pages_of("Groups", self.groups, PAGE_SIZE)
+            else:
+                result = pages_of("GroupMemberships", self.memberships[GroupId], PAGE_SIZE)
+            with self._lock:
+                self.calls += len(result)  # one call per page
+            return result
+        return Paginator(pages, self.latency)
+
+
+def baseline_groups(store: StubIdentityStore) -> None:
+    groups = []
+    for group in store.list_groups(IdentityStoreId="d-bench").get("Groups", []):
+        members_response = store.list_group_memberships(IdentityStoreId="d-bench", GroupId=group["GroupId"])
+        members = []
+        for m in members_response.get("GroupMemberships", []):
+            user = store.describe_user(IdentityStoreId="d-bench", UserId=m["MemberId"]["UserId"])
+            members.append({"id": user["UserId"], "username": user["UserName"],
+                            "displayName": user.get("DisplayName", "")})
+        groups.append({"id": group["GroupId"], "name": group["DisplayName"], "members": members})
+
+
+if __name__ == "__main__":
+    latency = (float(sys.argv[1]) if len(sys.argv) > 1 else 20) / 1000
+    group_count = int(sys.argv[2]) if len(sys.argv) > 2 else 80
+    user_count = int(sys.argv[3]) if len(sys.argv) > 3 else 400
+
+    store = StubIdentityStore(latency, group_count, user_count)
+    before = measure(lambda: baseline_groups(store), 1, warmup=0)
+    report(f"N+1 describe_user ({store.calls} calls)", before)
+
+    store = StubIdentityStore(latency, group_count, user_count)
+
+    def cold() -> None:
+        main._identity = IdentityDirectory(
+            lambda: store, "d-bench", ttl_seconds=600, max_workers=main._IDENTITY_MAX_WORKERS,
+        )
+        main.get_groups()
+
+    after = measure(cold, 3, warmup=0)
+    report(f"directory, cold ({store.calls // 3} calls, {main._IDENTITY_MAX_WORKERS} workers)", after)
+    warm = measure(main.get_groups, 200)
+    report("directory, warm (no calls)", warm)
+    speedup(before, after)  # cold vs the baseline's every request
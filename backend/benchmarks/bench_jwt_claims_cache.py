@@ -0,0 +1,62 @@
+"""
+Per-request cost of JWTAuthMiddleware for a repeat token, with and without
+the verified-claims cache: the middleware is driven directly with an ASGI
+scope and a no-op downstream app, so only the auth layer is measured.
+
+    python benchmarks/bench_jwt_claims_cache.py [iterations]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from _harness import measure, report, speedup  # also puts backend/ on sys.path
+
+import jwt
+
+os.environ.setdefault("C2A_JWT_SECRET", "YmVuY2htYXJrLXNlY3JldC1iZW5jaG1hcmstc2VjcmV0")
+import main  # noqa: E402  (reads C2A_JWT_SECRET at import)
+
+
+async def _ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+def _scope(token: str):
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/costs/summary",
+        "query_string": b"",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    }
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    token = jwt.encode(
+        {"sub": "bench", "userType": "SYSTEM", "exp": int(time.time()) + 3600},
+        main.JWT_SECRET_BYTES,
+        algorithm=main.JWT_ALG,
+    )
+    middleware = main.JWTAuthMiddleware(_ok_app)
+    loop = asyncio.new_event_loop()
+
+    def request():
+        loop.run_until_complete(middleware(_scope(token), _receive, _send))
+
+    before = measure(request, iterations, setup=main._claims_cache.clear)
+    report("verify every request", before)
+    after = measure(request, iterations)
+    report("claims cache hit", after)
+    speedup(before, after)
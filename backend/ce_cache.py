@@ -0,0 +1,351 @@
+"""
+Bounded TTL cache for Cost Explorer responses.
+
+The /api/costs/* endpoints key their cache on every query-param combination
+(by-service:1..12, historical:1..24, top-resources:<days>:<limit>, ...). A
+plain dict only dropped an expired entry when the same key was read again,
+so a long-running uvicorn worker accumulated every combination ever asked
+for. This cache bounds memory three ways:
+
+  - LRU eviction once `max_entries` is reached.
+  - An approximate byte budget (`max_bytes`), measured as the size of each
+    value's compact JSON encoding — the same payload we serve.
+  - A background sweeper that drops expired entries nobody re-reads.
+
+Hit/miss/eviction/expiry counters are kept per key prefix (the part before
+the first ':') so /api/costs/cache-stats can show which endpoints churn.
+
+SQLiteCache is the optional persistent tier: same get/put/sweep surface,
+backed by a SQLite file so cached CE responses survive restarts (Knative
+scales us to zero) and are shared by every uvicorn worker on the host.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+# Sentinel: "use the cache-wide TTL" (None already means "never expires").
+_DEFAULT_TTL = object()
+
+
+def _prefix(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+def _approx_size(value: Any) -> int:
+    try:
+        return len(json.dumps(value, separators=(",", ":"), default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry TTLs and a byte budget."""
+
+    def __init__(self, default_ttl: float, max_entries: int, max_bytes: int) -> None:
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (expires_at, size, value); expires_at None = never expires.
+        self._entries: "OrderedDict[str, Tuple[Optional[float], int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweeper = threading.Event()
+
+    def _stat(self, key: str, field: str) -> None:
+        counters = self._stats.setdefault(
+            _prefix(key), {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        )
+        counters[field] += 1
+
+    def _drop(self, key: str) -> None:
+        _expires, size, _value = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: str, record: bool = True) -> Optional[Any]:
+        """Return the live value for `key`, or None. `record=False` skips
+        the hit/miss counters (for internal re-checks)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if record:
+                    self._stat(key, "misses")
+                return None
+            expires_at, _size, value = entry
+            if expires_at is not None and time.time() > expires_at:
+                self._drop(key)
+                self._stat(key, "expirations")
+                if record:
+                    self._stat(key, "misses")
+                return None
+            self._entries.move_to_end(key)
+            if record:
+                self._stat(key, "hits")
+            return value
+
+    def put(self, key: str, value: Any, ttl: Any = _DEFAULT_TTL) -> None:
+        """Store `value`. `ttl` (seconds) defaults to the cache-wide TTL;
+        pass None to keep the entry until it is evicted."""
+        if ttl is _DEFAULT_TTL:
+            ttl = self.default_ttl
+        expires_at = None if ttl is None else time.time() + ttl
+        size = _approx_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                # Larger than the whole budget — caching it would just flush
+                # everything else.
+                return
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stat(oldest, "evictions")
+
+    def sweep(self) -> int:
+        """Drop every expired entry. Returns how many were removed."""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            expired = [
+                k for k, (expires_at, _s, _v) in self._entries.items()
+                if expires_at is not None and now > expires_at
+            ]
+            for key in expired:
+                self._drop(key)
+                self._stat(key, "expirations")
+                removed += 1
+        return removed
+
+    def start_sweeper(self, interval_seconds: float) -> None:
+        """Run sweep() every `interval_seconds` on a daemon thread (idempotent)."""
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            stop = self._stop_sweeper = threading.Event()
+
+            def _run() -> None:
+                while not stop.wait(interval_seconds):
+                    self.sweep()
+
+            self._sweeper = threading.Thread(target=_run, name="ce-cache-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def stop_sweeper(self, timeout: Optional[float] = None) -> None:
+        """Stop the sweeper thread, if running, and wait for it to exit."""
+        with self._lock:
+            sweeper, self._sweeper = self._sweeper, None
+            self._stop_sweeper.set()
+        if sweeper is not None:
+            sweeper.join(timeout)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_prefix: Dict[str, Dict[str, int]] = {
+                p: dict(c, entries=0, bytes=0) for p, c in self._stats.items()
+            }
+            for key, (_expires, size, _value) in self._entries.items():
+                bucket = per_prefix.setdefault(
+                    _prefix(key),
+                    {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "entries": 0, "bytes": 0},
+                )
+                bucket["entries"] += 1
+                bucket["bytes"] += size
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxEntries": self.max_entries,
+                "maxBytes": self.max_bytes,
+                "byPrefix": per_prefix,
+            }
+
+
+class SQLiteCache:
+    """
+    Persistent TTL cache in a SQLite file, safe to share across processes.
+
+    Each thread gets its own connection; the database runs in WAL mode so
+    readers in one worker never block on a writer in another, and writers
+    wait (busy_timeout) rather than fail when another worker holds the lock.
+    Values are stored as compact JSON. Entries with no TTL never expire and
+    only leave via the byte budget, which evicts least-recently-read first.
+
+    A hit only rewrites accessed_at once it is TOUCH_SECONDS old, so a hot
+    key costs one write per interval rather than one per read (each write
+    takes the database-wide lock). LRU order is exact to within that.
+    """
+
+    TOUCH_SECONDS = 60.0
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS ce_cache ("
+        " key TEXT PRIMARY KEY,"
+        " value TEXT NOT NULL,"
+        " size INTEGER NOT NULL,"
+        " expires_at REAL,"
+        " accessed_at REAL NOT NULL)"
+    )
+
+    def __init__(self, path: str, default_ttl: float, max_bytes: int) -> None:
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweeper = threading.Event()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(self._SCHEMA)
+        conn.execute("CREATE INDEX IF NOT EXISTS ce_cache_accessed ON ce_cache (accessed_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _stat(self, key: str, field: str) -> None:
+        with self._stats_lock:
+            counters = self._stats.setdefault(
+                _prefix(key), {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+            )
+            counters[field] += 1
+
+    def get_entry(self, key: str, record: bool = True) -> Optional[Tuple[Any, Optional[float]]]:
+        """Return (value, expires_at) for a live entry, or None."""
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM ce_cache WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None:
+            if record:
+                self._stat(key, "misses")
+            return None
+        raw, expires_at, accessed_at = row
+        if expires_at is not None and now > expires_at:
+            conn.execute(
+                "DELETE FROM ce_cache WHERE key = ? AND expires_at = ?", (key, expires_at)
+            )
+            self._stat(key, "expirations")
+            if record:
+                self._stat(key, "misses")
+            return None
+        if now - accessed_at >= self.TOUCH_SECONDS:
+            conn.execute("UPDATE ce_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        if record:
+            self._stat(key, "hits")
+        return json.loads(raw), expires_at
+
+    def get(self, key: str, record: bool = True) -> Optional[Any]:
+        entry = self.get_entry(key, record=record)
+        return None if entry is None else entry[0]
+
+    def put(self, key: str, value: Any, ttl: Any = _DEFAULT_TTL) -> None:
+        """Store `value`. `ttl` (seconds) defaults to the cache-wide TTL;
+        pass None to keep the entry until it is evicted."""
+        if ttl is _DEFAULT_TTL:
+            ttl = self.default_ttl
+        try:
+            raw = json.dumps(value, separators=(",", ":"), default=str)
+        except (TypeError, ValueError):
+            return
+        if len(raw) > self.max_bytes:
+            return
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO ce_cache (key, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, raw, len(raw), expires_at, now),
+            )
+            self._evict_over_budget(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict_over_budget(self, conn: sqlite3.Connection) -> None:
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ce_cache").fetchone()
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM ce_cache ORDER BY accessed_at"):
+            victims.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM ce_cache WHERE key = ?", [(k,) for k in victims])
+        for key in victims:
+            self._stat(key, "evictions")
+
+    def sweep(self) -> int:
+        """Drop every expired entry. Returns how many were removed."""
+        cur = self._conn().execute(
+            "DELETE FROM ce_cache WHERE expires_at IS NOT NULL AND expires_at < ?",
+            (time.time(),),
+        )
+        return cur.rowcount
+
+    def start_sweeper(self, interval_seconds: float) -> None:
+        """Run sweep() every `interval_seconds` on a daemon thread (idempotent)."""
+        with self._stats_lock:
+            if self._sweeper is not None:
+                return
+            stop = self._stop_sweeper = threading.Event()
+
+            def _run() -> None:
+                while not stop.wait(interval_seconds):
+                    try:
+                        self.sweep()
+                    except sqlite3.Error:
+                        pass
+
+            self._sweeper = threading.Thread(target=_run, name="ce-cache-sqlite-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def stop_sweeper(self, timeout: Optional[float] = None) -> None:
+        """Stop the sweeper thread, if running, and wait for it to exit."""
+        with self._stats_lock:
+            sweeper, self._sweeper = self._sweeper, None
+            self._stop_sweeper.set()
+        if sweeper is not None:
+            sweeper.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        entries, total = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ce_cache"
+        ).fetchone()
+        with self._stats_lock:
+            per_prefix = {p: dict(c) for p, c in self._stats.items()}
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": total,
+            "maxBytes": self.max_bytes,
+            "byPrefix": per_prefix,
+        }
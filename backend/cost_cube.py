@@ -0,0 +1,335 @@
+"""
+Daily × service Cost Explorer cube backing every /api/costs/* aggregate.
+
+costs_summary, costs_by_service, costs_historical, /api/services and the EKS
+cost endpoints used to send their own CE queries over overlapping windows.
+Instead, one cube holds UnblendedCost per (day, service) for the trailing
+CUBE_MONTHS months and every endpoint slices it locally.
+
+Layout is columnar: a date index (day offset from `start`), a service index,
+and one flat array('d') of days × services, row-major, plus a same-shaped
+bytearray marking which cells CE actually reported — a service CE lists at
+$0 still shows up in by_service, as it did when each endpoint queried CE
+itself. ~730 days × ~100 services is well under a megabyte.
+
+CE only serves DAILY granularity for roughly the last year, so months older
+than DAILY_MONTHS are fetched MONTHLY and their total is stored on the
+month's first day. Any slice that starts and ends on month boundaries (which
+is all the historical series needs) is exact; arbitrary day ranges are only
+exact inside the daily horizon — by-service's 360-day maximum stays inside it.
+
+Refreshes are incremental, on the same settled/open split costs_historical
+used (cost_windows.py): days that were settled when the previous cube was
+fetched are carried over and only the open window is re-fetched.
+"""
+
+import base64
+import threading
+import time
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from cost_windows import add_months, open_window_start, refetch_start
+from singleflight import SingleFlight
+
+CUBE_MONTHS = 24
+DAILY_MONTHS = 12
+
+
+class CostCube:
+    """Immutable days × services UnblendedCost matrix."""
+
+    __slots__ = (
+        "start", "days", "services", "_svc_index", "values", "reported", "fetched_at", "settled_before",
+    )
+
+    def __init__(
+        self,
+        start: date,
+        days: int,
+        services: List[str],
+        values: array,
+        reported: bytearray,
+        fetched_at: float,
+        settled_before: date,
+    ) -> None:
+        self.start = start
+        self.days = days
+        self.services = services
+        self._svc_index = {name: i for i, name in enumerate(services)}
+        self.values = values
+        # 1 where CE returned a cell (even a $0 one), 0 where it didn't.
+        self.reported = reported
+        self.fetched_at = fetched_at
+        # Every day before this was settled when the cube was fetched.
+        self.settled_before = settled_before
+
+    @classmethod
+    def build(
+        cls,
+        start: date,
+        end: date,
+        cells: Iterator[Tuple[str, str, float]],
+        fetched_at: float,
+        settled_before: date,
+    ) -> "CostCube":
+        """Assemble a cube over [start, end) from (iso_day, service, amount)
+        cells. Cells outside the window are dropped."""
+        days = max(0, (end - start).days)
+        services: List[str] = []
+        svc_index: Dict[str, int] = {}
+        sparse: List[Tuple[int, int, float]] = []
+        for iso_day, service, amount in cells:
+            row = (date.fromisoformat(iso_day) - start).days
+            if not 0 <= row < days:
+                continue
+            col = svc_index.get(service)
+            if col is None:
+                col = svc_index[service] = len(services)
+                services.append(service)
+            sparse.append((row, col, amount))
+        width = len(services)
+        values = array("d", bytes(8 * days * width))
+        reported = bytearray(days * width)
+        for row, col, amount in sparse:
+            values[row * width + col] += amount
+            reported[row * width + col] = 1
+        return cls(start, days, services, values, reported, fetched_at, settled_before)
+
+    def _rows(self, start: date, end: date) -> range:
+        lo = min(max((start - self.start).days, 0), self.days)
+        hi = min(max((end - self.start).days, 0), self.days)
+        return range(lo, hi)
+
+    def total(self, start: date, end: date, service: Optional[str] = None) -> float:
+        """Sum over [start, end), for one service or all of them."""
+        width = len(self.services)
+        rows = self._rows(start, end)
+        if not width or not rows:
+            return 0.0
+        if service is None:
+            return sum(self.values[rows.start * width:rows.stop * width])
+        col = self._svc_index.get(service)
+        if col is None:
+            return 0.0
+        return sum(self.values[rows.start * width + col:rows.stop * width:width])
+
+    def by_service(self, start: date, end: date) -> Dict[str, float]:
+        """Per-service sums over [start, end) for every service CE reported
+        in that window, including ones reported at $0."""
+        width = len(self.services)
+        rows = self._rows(start, end)
+        if not width or not rows:
+            return {}
+        sums = [0.0] * width
+        seen = [False] * width
+        values, reported = self.values, self.reported
+        for row in rows:
+            base = row * width
+            for col in range(width):
+                if reported[base + col]:
+                    sums[col] += values[base + col]
+                    seen[col] = True
+        return {self.services[col]: amt for col, amt in enumerate(sums) if seen[col]}
+
+    def cells(self, before: date) -> Iterator[Tuple[str, str, float]]:
+        """Reported (iso_day, service, amount) cells for days before `before`."""
+        width = len(self.services)
+        for row in self._rows(self.start, before):
+            iso_day = (self.start + timedelta(days=row)).isoformat()
+            base = row * width
+            for col in range(width):
+                if self.reported[base + col]:
+                    yield iso_day, self.services[col], self.values[base + col]
+
+    def fetched_at_iso(self) -> str:
+        return datetime.fromtimestamp(self.fetched_at, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start": self.start.isoformat(),
+            "days": self.days,
+            "services": self.services,
+            "values": base64.b64encode(self.values.tobytes()).decode("ascii"),
+            "reported": base64.b64encode(bytes(self.reported)).decode("ascii"),
+            "fetched_at": self.fetched_at,
+            "settled_before": self.settled_before.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CostCube":
+        values = array("d")
+        values.frombytes(base64.b64decode(data["values"]))
+        if "reported" in data:
+            reported = bytearray(base64.b64decode(data["reported"]))
+        else:
+            # Persisted before $0 cells were tracked: only non-zero cells.
+            reported = bytearray(1 if v else 0 for v in values)
+        return cls(
+            date.fromisoformat(data["start"]),
+            int(data["days"]),
+            list(data["services"]),
+            values,
+            reported,
+            float(data["fetched_at"]),
+            date.fromisoformat(data["settled_before"]),
+        )
+
+
+def _fetch_cells(ce, start: date, end: date, granularity: str) -> Iterator[Tuple[str, str, float]]:
+    """(iso_day, service, amount) cells from GetCostAndUsage grouped by
+    SERVICE over [start, end), following NextPageToken."""
+    if start >= end:
+        return
+    request: Dict[str, Any] = {
+        "TimePeriod": {"Start": start.isoformat(), "End": end.isoformat()},
+        "Granularity": granularity,
+        "Metrics": ["UnblendedCost"],
+        "GroupBy": [{"Type": "DIMENSION", "Key": "SERVICE"}],
+    }
+    while True:
+        resp = ce.get_cost_and_usage(**request)
+        for bucket in resp.get("ResultsByTime", []):
+            day = bucket.get("TimePeriod", {}).get("Start")
+            if not day:
+                continue
+            for group in bucket.get("Groups", []):
+                yield day, group["Keys"][0], float(group["Metrics"]["UnblendedCost"]["Amount"])
+        token = resp.get("NextPageToken")
+        if not token:
+            break
+        request["NextPageToken"] = token
+
+
+def fetch_cube(ce, today: date, previous: Optional[CostCube] = None) -> CostCube:
+    """Build the cube for the window ending today (inclusive). With a
+    `previous` cube, only days it hadn't seen settled are re-fetched."""
+    start = add_months(today, -(CUBE_MONTHS - 1))
+    end = today + timedelta(days=1)
+    daily_start = max(start, add_months(today, -DAILY_MONTHS))
+    settled_before = open_window_start(today)
+
+    cells: List[Tuple[str, str, float]] = []
+    fetch_from = refetch_start(start, today, previous.settled_before if previous is not None else None)
+    if previous is not None:
+        cells.extend(previous.cells(before=fetch_from))
+
+    if fetch_from < daily_start:
+        cells.extend(_fetch_cells(ce, fetch_from, daily_start, "MONTHLY"))
+    cells.extend(_fetch_cells(ce, max(fetch_from, daily_start), end, "DAILY"))
+
+    return CostCube.build(start, end, iter(cells), time.time(), settled_before)
+
+
+class CostCubeCache:
+    """
+    Holds the current cube and refreshes it stale-while-revalidate.
+
+    The first get() blocks on a (single-flight) load; peek() instead starts
+    it in the background and returns None, for callers with a cheaper way to
+    answer meanwhile. After that, a cube older than the TTL is still served
+    immediately while one background thread fetches the next one; a failed
+    refresh keeps the old cube.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        ttl_seconds: float,
+        restore: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+        persist: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> None:
+        self._client_factory = client_factory
+        self._ttl = ttl_seconds
+        self._restore = restore
+        self._persist = persist
+        self._lock = threading.Lock()
+        self._cube: Optional[CostCube] = None
+        self._refreshing = False
+        self._flight = SingleFlight()
+        self.last_error: Optional[str] = None
+
+    def _current(self) -> Optional[CostCube]:
+        with self._lock:
+            return self._cube
+
+    def get(self) -> CostCube:
+        """Return the current cube, loading it on first use. Raises only if
+        there has never been a cube to serve."""
+        cube = self._current()
+        if cube is None:
+            return self._flight.do("cube", self._initial_load)
+        if time.time() - cube.fetched_at > self._ttl or cube.start + timedelta(days=cube.days) <= date.today():
+            self._refresh_in_background()
+        return cube
+
+    def peek(self) -> Optional[CostCube]:
+        """Like get(), but never blocks: with no cube yet, start loading one
+        in the background and return None."""
+        if self._current() is None:
+            self._refresh_in_background()
+            return None
+        return self.get()
+
+    def _initial_load(self) -> CostCube:
+        cube = self._current()
+        if cube is not None:
+            return cube
+        if self._restore is not None:
+            try:
+                data = self._restore()
+                if data:
+                    cube = CostCube.from_dict(data)
+            except Exception:
+                cube = None
+        if cube is None:
+            cube = self._fetch(None)
+        with self._lock:
+            self._cube = cube
+        return cube
+
+    def _fetch(self, previous: Optional[CostCube]) -> CostCube:
+        cube = fetch_cube(self._client_factory(), date.today(), previous)
+        if self._persist is not None:
+            try:
+                self._persist(cube.to_dict())
+            except Exception:
+                pass
+        return cube
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name="cost-cube-refresh", daemon=True).start()
+
+    def _refresh(self) -> None:
+        try:
+            previous = self._current()
+            if previous is None:
+                # Shares the flight with any get() blocked on the first load.
+                self._flight.do("cube", self._initial_load)
+            else:
+                cube = self._fetch(previous)
+                with self._lock:
+                    self._cube = cube
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def status(self) -> Dict[str, Any]:
+        cube = self._current()
+        return {
+            "loaded": cube is not None,
+            "fetchedAt": cube.fetched_at_iso() if cube is not None else None,
+            "start": cube.start.isoformat() if cube is not None else None,
+            "days": cube.days if cube is not None else 0,
+            "services": len(cube.services) if cube is not None else 0,
+            "refreshing": self._refreshing,
+            "lastError": self.last_error,
+        }
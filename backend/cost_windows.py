@@ -0,0 +1,42 @@
+"""
+Settled vs open Cost Explorer windows.
+
+CE keeps restating a month for a few days after it ends while AWS finalizes
+the bill; after that its numbers never change. A date range therefore splits
+at open_window_start(today): days before it are settled and can be cached
+indefinitely, days from it on are the open window and are re-fetched on the
+normal TTL.
+
+A refresh that has the previous fetch in hand only needs to re-query from
+refetch_start(): everything earlier was already settled when that fetch ran
+and still is. Month-boundary rollover falls out of the same rule — a month
+that leaves its grace period is fetched once more (it was open last time)
+and then carried over for good.
+"""
+
+from datetime import date, timedelta
+from typing import Optional
+
+SETTLE_DAYS = 5
+
+
+def add_months(d: date, n: int) -> date:
+    """First-of-month `n` months after (or before, if negative) `d`'s month."""
+    index = d.year * 12 + (d.month - 1) + n
+    return d.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+
+def open_window_start(today: date) -> date:
+    """First day of the earliest month whose costs can still change."""
+    prev = add_months(today, -1)
+    if today < add_months(prev, 1) + timedelta(days=SETTLE_DAYS):
+        return prev
+    return add_months(today, 0)
+
+
+def refetch_start(window_start: date, today: date, settled_before: Optional[date]) -> date:
+    """First day a refresh of [window_start, today] must re-query, given the
+    `settled_before` recorded by the previous fetch (None if there was none)."""
+    if settled_before is None:
+        return window_start
+    return max(window_start, min(settled_before, open_window_start(today)))
@@ -0,0 +1,423 @@
+"""
+Shared, TTL-bounded snapshot of the EC2 fleet.
+
+/api/ec2/instances, /api/ec2/summary, /api/ec2/orphans, /api/eks/costs-summary
+and the per-cluster cost rollup all need the same describe_instances walk, and
+the ComputeTab/ClusterTab fire them concurrently. Rather than each endpoint
+paging through the fleet on its own, they all read one in-process snapshot:
+
+  - The snapshot is rebuilt at most once per TTL.
+  - Refreshes are single-flight: concurrent requests that find the snapshot
+    stale wait on the one in-flight fetch instead of issuing their own.
+  - Each snapshot records when it was fetched so responses can expose its
+    age and the UI can show staleness.
+
+The loader (supplied by main.py) does the AWS calls and per-instance
+enrichment into InstanceRecord rows; this module owns the row type,
+lifetime and concurrency.
+"""
+
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from singleflight import SingleFlight
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+class InstanceRecord:
+    """
+    One enriched instance in the snapshot.
+
+    A __slots__ row instead of a ~20-key dict: no per-row __dict__, and the
+    low-cardinality strings (type, AZ, VPC, subnet, state, platform, arch,
+    lifecycle, cluster) are interned so a large fleet shares one copy of
+    each. tags/use_hints/monthly_estimate are shared, read-only dicts.
+    """
+
+    __slots__ = (
+        "instance_id", "name", "state", "instance_type", "private_ip", "public_ip",
+        "launch_time", "launched_at", "availability_zone", "vpc_id", "subnet_id",
+        "platform", "architecture", "tags", "parent_cluster", "node_role_hint",
+        "use_hints", "lifecycle", "monthly_estimate", "parent_cluster_conflict",
+    )
+
+    def __init__(
+        self,
+        instance_id: str,
+        name: str,
+        state: str,
+        instance_type: Optional[str],
+        private_ip: Optional[str],
+        public_ip: Optional[str],
+        launched_at: Optional[datetime],
+        availability_zone: Optional[str],
+        vpc_id: Optional[str],
+        subnet_id: Optional[str],
+        platform: str,
+        architecture: Optional[str],
+        tags: Dict[str, str],
+        parent_cluster: Optional[str],
+        node_role_hint: Optional[str],
+        use_hints: Dict[str, Any],
+        lifecycle: Optional[str],
+        parent_cluster_conflict: Optional[List[str]] = None,
+    ) -> None:
+        self.instance_id = instance_id
+        self.name = name
+        self.state = _intern(state)
+        self.instance_type = _intern(instance_type)
+        self.private_ip = private_ip
+        self.public_ip = public_ip
+        self.launched_at = launched_at
+        self.launch_time = str(launched_at) if launched_at else None
+        self.availability_zone = _intern(availability_zone)
+        self.vpc_id = _intern(vpc_id)
+        self.subnet_id = _intern(subnet_id)
+        self.platform = _intern(platform)
+        self.architecture = _intern(architecture)
+        self.tags = tags
+        self.parent_cluster = _intern(parent_cluster)
+        self.node_role_hint = _intern(node_role_hint)
+        self.use_hints = use_hints
+        self.lifecycle = _intern(lifecycle)
+        self.monthly_estimate: Dict[str, Any] = {}
+        self.parent_cluster_conflict = parent_cluster_conflict
+
+    def uptime(self, now: datetime) -> str:
+        if self.launched_at is None:
+            return ""
+        delta = now - self.launched_at
+        days = delta.days
+        hours = delta.seconds // 3600
+        return f"{days}d {hours}h" if days > 0 else f"{hours}h"
+
+    def to_dict(self, now: datetime) -> Dict[str, Any]:
+        """The /api/ec2/instances row shape, with request-time `uptime`."""
+        out: Dict[str, Any] = {
+            "instanceId": self.instance_id,
+            "name": self.name,
+            "state": self.state,
+            "instanceType": self.instance_type,
+            "privateIp": self.private_ip,
+            "publicIp": self.public_ip,
+            "launchTime": self.launch_time,
+            "availabilityZone": self.availability_zone,
+            "vpcId": self.vpc_id,
+            "subnetId": self.subnet_id,
+            "platform": self.platform,
+            "architecture": self.architecture,
+            "tags": self.tags,
+            "parent_cluster": self.parent_cluster,
+            "node_role_hint": self.node_role_hint,
+            "use_hints": self.use_hints,
+            "lifecycle": self.lifecycle,
+            "monthly_estimate": self.monthly_estimate,
+        }
+        if self.parent_cluster_conflict:
+            out["parent_cluster_conflict"] = self.parent_cluster_conflict
+        out["uptime"] = self.uptime(now)
+        return out
+
+
+# Sort keys accepted by InventorySnapshot.query(). "default" is the loader's
+# own order (running first, then by name). Ties break on instance id so every
+# order is total and cursors are stable.
+SORT_KEYS: Dict[str, Optional[Callable[[InstanceRecord], Any]]] = {
+    "default": None,
+    "name": lambda r: ((r.name or "").lower(), r.instance_id),
+    "state": lambda r: (r.state, r.instance_id),
+    "instanceType": lambda r: (r.instance_type or "", r.instance_id),
+    "availabilityZone": lambda r: (r.availability_zone or "", r.instance_id),
+    "launchTime": lambda r: (r.launch_time or "", r.instance_id),
+    "monthly": lambda r: (r.monthly_estimate.get("monthly", 0.0), r.instance_id),
+}
+
+# Sentinel cluster filter value selecting instances with no parent cluster.
+NO_CLUSTER = "none"
+
+
+def _group(rows: List[InstanceRecord], key: Callable[[InstanceRecord], Optional[str]]) -> Dict[Optional[str], List[int]]:
+    index: Dict[Optional[str], List[int]] = {}
+    for pos, row in enumerate(rows):
+        index.setdefault(key(row), []).append(pos)
+    return index
+
+
+class InventorySnapshot:
+    """An immutable list of InstanceRecord rows plus its fetch time.
+
+    Callers must treat `instances` as read-only — the same objects are
+    handed to every request until the next refresh.
+
+    Indexes are built once, with the snapshot: row position by instance id,
+    positions by state / cluster / type / AZ / VPC / tag key→value, one
+    presorted order (and its inverse, the rank) per SORT_KEYS entry, and the
+    per-cluster summary. query() serves filtered, sorted, cursor-paginated
+    pages from them; the in_*/with_tag accessors are direct index lookups.
+    Every index list is in snapshot order."""
+
+    __slots__ = (
+        "instances", "fetched_at", "_position", "_by_state", "_by_cluster", "_by_type",
+        "_by_az", "_by_vpc", "_by_tag", "_names", "_orders", "_ranks", "cluster_summary", "orphan_count",
+    )
+
+    def __init__(self, instances: List[InstanceRecord], fetched_at: float) -> None:
+        self.instances = instances
+        self.fetched_at = fetched_at
+
+        self._position = {row.instance_id: pos for pos, row in enumerate(instances)}
+        self._by_state = _group(instances, lambda r: r.state)
+        self._by_cluster = _group(instances, lambda r: r.parent_cluster)
+        self._by_type = _group(instances, lambda r: r.instance_type)
+        self._by_az = _group(instances, lambda r: r.availability_zone)
+        self._by_vpc = _group(instances, lambda r: r.vpc_id)
+        self._by_tag: Dict[str, Dict[str, List[int]]] = {}
+        for pos, row in enumerate(instances):
+            for key, value in row.tags.items():
+                self._by_tag.setdefault(key, {}).setdefault(value, []).append(pos)
+        self._names = [(row.name or "").lower() for row in instances]
+
+        n = len(instances)
+        self._orders: Dict[str, List[int]] = {}
+        self._ranks: Dict[str, List[int]] = {}
+        for sort, key in SORT_KEYS.items():
+            order = list(range(n))
+            if key is not None:
+                order.sort(key=lambda pos: key(instances[pos]))
+            rank = [0] * n
+            for r, pos in enumerate(order):
+                rank[pos] = r
+            self._orders[sort] = order
+            self._ranks[sort] = rank
+
+        self.cluster_summary: Dict[str, Dict[str, Any]] = {}
+        for cluster, positions in self._by_cluster.items():
+            if cluster is None:
+                continue
+            types: Dict[str, int] = {}
+            for pos in positions:
+                instance_type = instances[pos].instance_type
+                if instance_type:
+                    types[instance_type] = types.get(instance_type, 0) + 1
+            self.cluster_summary[cluster] = {"nodeCount": len(positions), "instanceTypes": types}
+        self.orphan_count = len(self._by_cluster.get(None, []))
+
+    @property
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.fetched_at)
+
+    def fetched_at_iso(self) -> str:
+        return datetime.fromtimestamp(self.fetched_at, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def staleness(self) -> Dict[str, Any]:
+        """Fields every snapshot-backed response carries."""
+        return {
+            "snapshotAt": self.fetched_at_iso(),
+            "snapshotAgeSeconds": round(self.age_seconds, 1),
+        }
+
+    def _rows(self, positions: List[int]) -> List[InstanceRecord]:
+        return [self.instances[pos] for pos in positions]
+
+    def get(self, instance_id: str) -> Optional[InstanceRecord]:
+        pos = self._position.get(instance_id)
+        return None if pos is None else self.instances[pos]
+
+    def clusters(self) -> List[str]:
+        """Every parent cluster with at least one instance in the snapshot."""
+        return [c for c in self._by_cluster if c is not None]
+
+    def in_cluster(self, cluster: Optional[str]) -> List[InstanceRecord]:
+        """Instances whose detected parent cluster is `cluster` (None = orphans)."""
+        return self._rows(self._by_cluster.get(cluster, []))
+
+    def in_state(self, state: str) -> List[InstanceRecord]:
+        return self._rows(self._by_state.get(state, []))
+
+    def in_az(self, az: Optional[str]) -> List[InstanceRecord]:
+        return self._rows(self._by_az.get(az, []))
+
+    def in_vpc(self, vpc_id: Optional[str]) -> List[InstanceRecord]:
+        return self._rows(self._by_vpc.get(vpc_id, []))
+
+    def with_tag(self, key: str, value: Optional[str] = None) -> List[InstanceRecord]:
+        """Instances tagged key=value, or carrying `key` at all if value is None."""
+        values = self._by_tag.get(key, {})
+        if value is not None:
+            return self._rows(values.get(value, []))
+        return self._rows(sorted(pos for positions in values.values() for pos in positions))
+
+    def counts(self, index: str) -> Dict[Optional[str], int]:
+        """Instances per value of the "state", "cluster", "type", "az" or "vpc" index."""
+        groups = {
+            "state": self._by_state,
+            "cluster": self._by_cluster,
+            "type": self._by_type,
+            "az": self._by_az,
+            "vpc": self._by_vpc,
+        }[index]
+        return {value: len(positions) for value, positions in groups.items()}
+
+    def _filters(
+        self,
+        state: Optional[str],
+        cluster: Optional[str],
+        instance_type: Optional[str],
+        az: Optional[str],
+        tag: Optional[Tuple[str, Optional[str]]],
+    ) -> List[Tuple[int, Callable[[], List[int]], Callable[[InstanceRecord], bool]]]:
+        """One (match count, matching positions, row predicate) per active
+        filter. Counts are O(1) or O(tag values); positions are only
+        materialized for the filter query() drives from."""
+        filters: List[Tuple[int, Callable[[], List[int]], Callable[[InstanceRecord], bool]]] = []
+
+        def indexed(index: Dict[Any, List[int]], value: Any, attr: str) -> None:
+            positions = index.get(value, [])
+            filters.append((len(positions), lambda: positions, lambda r: getattr(r, attr) == value))
+
+        if state is not None:
+            indexed(self._by_state, state, "state")
+        if cluster is not None:
+            indexed(self._by_cluster, None if cluster == NO_CLUSTER else cluster, "parent_cluster")
+        if instance_type is not None:
+            indexed(self._by_type, instance_type, "instance_type")
+        if az is not None:
+            indexed(self._by_az, az, "availability_zone")
+        if tag is not None:
+            key, value = tag
+            values = self._by_tag.get(key, {})
+            if value is None:
+                filters.append((
+                    sum(len(positions) for positions in values.values()),
+                    lambda: sorted(pos for positions in values.values() for pos in positions),
+                    lambda r: key in r.tags,
+                ))
+            else:
+                positions = values.get(value, [])
+                filters.append((len(positions), lambda: positions, lambda r: r.tags.get(key) == value))
+        return filters
+
+    def query(
+        self,
+        state: Optional[str] = None,
+        cluster: Optional[str] = None,
+        instance_type: Optional[str] = None,
+        az: Optional[str] = None,
+        tag: Optional[Tuple[str, Optional[str]]] = None,
+        text: Optional[str] = None,
+        sort: str = "default",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[InstanceRecord], int, Optional[str]]:
+        """
+        Filter, sort and page the snapshot.
+
+        Filters are ANDed; `cluster=NO_CLUSTER` selects orphans, `tag` is
+        (key, value) or (key, None) for "has key", `text` is a
+        case-insensitive substring of the Name tag. `after` is the instance
+        id of the previous page's last row; if that instance has since left
+        the snapshot, paging resumes at `offset` instead. Returns (rows,
+        total matches, next `after` or None). Unfiltered pages cost O(limit);
+        filtered ones cost the size of the smallest matching index (its rows
+        are checked against the other filters directly) plus sorting the
+        matches.
+        """
+        order = self._orders[sort]
+        rank = self._ranks[sort]
+        n = len(order)
+        after_rank: Optional[int] = None
+        if after is not None and after in self._position:
+            after_rank = rank[self._position[after]]
+
+        filters = self._filters(state, cluster, instance_type, az, tag)
+        if not filters and not text:
+            total = n
+            if descending:
+                start = offset if after_rank is None else n - after_rank
+                stop = n if limit is None else min(n, start + limit)
+                positions = [order[n - 1 - i] for i in range(start, stop)]
+            else:
+                start = offset if after_rank is None else after_rank + 1
+                positions = order[start:] if limit is None else order[start:start + limit]
+            has_more = start + len(positions) < n
+        else:
+            if filters:
+                # Walk the smallest index and test the other filters on
+                # each row directly, so cost tracks that index, not the fleet.
+                driver = min(filters, key=lambda f: f[0])
+                checks = [f[2] for f in filters if f is not driver]
+                instances = self.instances
+                matched = [
+                    pos for pos in driver[1]()
+                    if all(check(instances[pos]) for check in checks)
+                ]
+            else:
+                matched = list(range(n))
+            if text:
+                needle = text.lower()
+                matched = [pos for pos in matched if needle in self._names[pos]]
+            matched.sort(key=rank.__getitem__, reverse=descending)
+            total = len(matched)
+            start = min(offset, total)
+            if after_rank is not None:
+                if descending:
+                    start = next((i for i, pos in enumerate(matched) if rank[pos] < after_rank), total)
+                else:
+                    start = next((i for i, pos in enumerate(matched) if rank[pos] > after_rank), total)
+            positions = matched[start:] if limit is None else matched[start:start + limit]
+            has_more = start + len(positions) < total
+
+        rows = [self.instances[pos] for pos in positions]
+        next_after = rows[-1].instance_id if rows and has_more else None
+        return rows, total, next_after
+
+
+class InventoryCache:
+    """Holds the current InventorySnapshot and refreshes it single-flight."""
+
+    def __init__(self, loader: Callable[[], List[InstanceRecord]], ttl_seconds: float) -> None:
+        self._loader = loader
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._snapshot: Optional[InventorySnapshot] = None
+        self._flight = SingleFlight()
+
+    def _fresh(self) -> Optional[InventorySnapshot]:
+        with self._lock:
+            snap = self._snapshot
+        if snap is not None and snap.age_seconds <= self._ttl:
+            return snap
+        return None
+
+    def get(self) -> InventorySnapshot:
+        """Return a snapshot no older than the TTL, fetching if needed.
+        Raises whatever the loader raised if the refresh fails."""
+        snap = self._fresh()
+        if snap is not None:
+            return snap
+        return self._flight.do("snapshot", self._refresh)
+
+    def _refresh(self) -> InventorySnapshot:
+        # Another leader may have refreshed between our staleness check and
+        # acquiring the flight — don't fetch twice back to back.
+        snap = self._fresh()
+        if snap is not None:
+            return snap
+        instances = self._loader()
+        snap = InventorySnapshot(instances, time.time())
+        with self._lock:
+            self._snapshot = snap
+        return snap
+
+    def invalidate(self) -> None:
+        """Force the next get() to refetch (e.g. after start/stop/reboot)."""
+        with self._lock:
+            self._snapshot = None
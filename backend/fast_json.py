@@ -0,0 +1,55 @@
+"""
+Fast JSON response for large, pre-shaped payloads.
+
+Returning a dict from a FastAPI route runs it through jsonable_encoder, which
+walks and copies every value, before json.dumps walks it again. Routes that
+already build plain dict/list/str/number payloads (inventory, kubectl, cost
+endpoints) can return FastJSONResponse(payload) instead: the payload goes
+straight to bytes, via orjson when it is installed and the stdlib encoder
+otherwise. Both write NaN and ±Infinity as null, as orjson does.
+"""
+
+import json
+import math
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _finite(value: Any) -> Any:
+    """Copy of `value` with non-finite floats replaced by None."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(v) for v in value]
+    return value
+
+
+def _dumps(content: Any) -> bytes:
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=str,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that skips jsonable_encoder and prefers orjson."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS, default=str)
+        try:
+            return _dumps(content)
+        except ValueError:
+            # Only payloads that actually hold a NaN/Infinity pay for the copy.
+            return _dumps(_finite(content))
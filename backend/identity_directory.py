@@ -0,0 +1,336 @@
+"""
+In-process IAM Identity Center directory: users, groups and memberships.
+
+/api/users, /api/groups, /api/users/{id}/groups and /api/account-assignments
+each re-read the Identity Store on every call, although it changes rarely and
+almost only through this dashboard's own write endpoints. They now read one
+shared directory instead:
+
+  - Loaded with one paginated list_users and list_groups pass plus a
+    paginated list_group_memberships per group on a bounded worker pool.
+  - Memberships are indexed in both directions with their membership ids,
+    so group -> members, user -> groups and (group, user) -> membership id
+    are dict hits. membership_id() falls back to a paginated scan of the
+    group when the index doesn't know the pair, and the remove endpoint
+    re-scans once when an indexed id turns out to be stale.
+  - Reloaded at most once per TTL, single-flight.
+  - Our own writes (create user, add/remove member) are applied in place
+    rather than forcing a reload. A write that lands while a reload is in
+    flight marks the new directory stale so the next read reloads again.
+  - principal_names() resolves a deduplicated set of (type, id) principals
+    in one pass: directory hits first, then concurrent describe_* calls for
+    the rest, remembered until the next reload.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from singleflight import SingleFlight
+
+Principal = Tuple[str, str]  # (principal type, principal id), e.g. ("GROUP", id)
+
+
+def list_all(client, operation: str, result_key: str, **kwargs) -> List[Dict[str, Any]]:
+    """Every item of a paginated list_* call."""
+    items: List[Dict[str, Any]] = []
+    for page in client.get_paginator(operation).paginate(**kwargs):
+        items.extend(page.get(result_key, []))
+    return items
+
+
+def bounded_map(fn: Callable[[Any], Any], items: List[Any], max_workers: int) -> List[Any]:
+    """fn over items on at most max_workers threads, results in input order.
+    The first exception propagates, like the sequential loop it replaces."""
+    if len(items) <= 1 or max_workers <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(fn, items))
+
+
+def user_row(user: Dict[str, Any]) -> Dict[str, Any]:
+    """describe_user/list_users entry -> the /api/users row."""
+    emails = user.get("Emails", [])
+    return {
+        "id": user["UserId"],
+        "username": user["UserName"],
+        "displayName": user.get("DisplayName", ""),
+        "givenName": user.get("Name", {}).get("GivenName", ""),
+        "familyName": user.get("Name", {}).get("FamilyName", ""),
+        "email": next((e["Value"] for e in emails if e.get("Primary")), None),
+        "title": user.get("Title", ""),
+        "userType": user.get("UserType", ""),
+    }
+
+
+def group_row(group: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": group["GroupId"],
+        "name": group["DisplayName"],
+        "description": group.get("Description", ""),
+    }
+
+
+class Directory:
+    """One loaded copy of the directory. Mutated in place by our writes, so
+    every read and write goes through its lock."""
+
+    def __init__(
+        self,
+        users: Dict[str, Dict[str, Any]],
+        groups: Dict[str, Dict[str, Any]],
+        members: Dict[str, Dict[str, str]],
+        loaded_at: float,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._users = users
+        self._groups = groups
+        # group id -> {user id: membership id}, and the reverse
+        self._members = members
+        self._user_groups: Dict[str, Dict[str, str]] = {}
+        for group_id, by_user in members.items():
+            for user_id, membership_id in by_user.items():
+                self._user_groups.setdefault(user_id, {})[group_id] = membership_id
+        self.loaded_at = loaded_at
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.loaded_at
+
+    # -- reads ---------------------------------------------------------------
+
+    def users(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._users.values())
+
+    def user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._users.get(user_id)
+
+    def group(self, group_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._groups.get(group_id)
+
+    def principal_name(self, principal_type: str, principal_id: str) -> Optional[str]:
+        with self._lock:
+            if principal_type == "GROUP":
+                group = self._groups.get(principal_id)
+                return group["name"] if group is not None else None
+            if principal_type == "USER":
+                user = self._users.get(principal_id)
+                return (user["displayName"] or user["username"]) if user is not None else None
+            return None
+
+    def membership_id(self, group_id: str, user_id: str) -> Optional[str]:
+        with self._lock:
+            return self._members.get(group_id, {}).get(user_id)
+
+    def groups(self) -> List[Dict[str, Any]]:
+        """/api/groups rows. Members that don't resolve to a user are
+        skipped, as the describe_user-per-member version did."""
+        with self._lock:
+            out = []
+            for group_id, group in self._groups.items():
+                members = [
+                    {"id": u["id"], "username": u["username"], "displayName": u["displayName"]}
+                    for u in (self._users.get(uid) for uid in self._members.get(group_id, {}))
+                    if u is not None
+                ]
+                out.append({**group, "memberCount": len(members), "members": members})
+            return out
+
+    def groups_for_user(self, user_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"id": group_id, "name": self._groups[group_id]["name"], "membershipId": membership_id}
+                for group_id, membership_id in self._user_groups.get(user_id, {}).items()
+                if group_id in self._groups
+            ]
+
+    # -- in-place writes -------------------------------------------------------
+
+    def put_user(self, row: Dict[str, Any]) -> None:
+        with self._lock:
+            self._users[row["id"]] = row
+
+    def add_membership(self, group_id: str, user_id: str, membership_id: str) -> None:
+        with self._lock:
+            self._members.setdefault(group_id, {})[user_id] = membership_id
+            self._user_groups.setdefault(user_id, {})[group_id] = membership_id
+
+    def remove_membership(self, group_id: str, user_id: str) -> None:
+        with self._lock:
+            self._members.get(group_id, {}).pop(user_id, None)
+            self._user_groups.get(user_id, {}).pop(group_id, None)
+
+
+def load_directory(identitystore, identity_store_id: str, max_workers: int) -> Directory:
+    users = {
+        u["UserId"]: user_row(u)
+        for u in list_all(identitystore, "list_users", "Users", IdentityStoreId=identity_store_id)
+    }
+    groups = {
+        g["GroupId"]: group_row(g)
+        for g in list_all(identitystore, "list_groups", "Groups", IdentityStoreId=identity_store_id)
+    }
+
+    def memberships(group_id: str) -> Dict[str, str]:
+        return {
+            m["MemberId"]["UserId"]: m["MembershipId"]
+            for m in list_all(
+                identitystore, "list_group_memberships", "GroupMemberships",
+                IdentityStoreId=identity_store_id, GroupId=group_id,
+            )
+            if "UserId" in m.get("MemberId", {})
+        }
+
+    group_ids = list(groups)
+    members = dict(zip(group_ids, bounded_map(memberships, group_ids, max_workers)))
+    return Directory(users, groups, members, time.time())
+
+
+class IdentityDirectory:
+    """Holds the current Directory and reloads it single-flight."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        identity_store_id: str,
+        ttl_seconds: float,
+        max_workers: int,
+    ) -> None:
+        self._client_factory = client_factory
+        self._identity_store_id = identity_store_id
+        self._ttl = ttl_seconds
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._directory: Optional[Directory] = None
+        self._writes = 0
+        # Names of principals the directory didn't know, from describe_*.
+        self._names: Dict[Principal, str] = {}
+        self._flight = SingleFlight()
+
+    def _fresh(self) -> Optional[Directory]:
+        with self._lock:
+            directory = self._directory
+        if directory is not None and directory.age_seconds <= self._ttl:
+            return directory
+        return None
+
+    def get(self) -> Directory:
+        """The directory, no older than the TTL. Raises whatever the
+        Identity Store raised if a reload fails."""
+        directory = self._fresh()
+        if directory is not None:
+            return directory
+        return self._flight.do("directory", self._reload)
+
+    def _reload(self) -> Directory:
+        directory = self._fresh()
+        if directory is not None:
+            return directory
+        with self._lock:
+            writes_before = self._writes
+        directory = load_directory(self._client_factory(), self._identity_store_id, self._max_workers)
+        with self._lock:
+            if self._writes != writes_before:
+                # A write raced the load and may be missing from it: serve
+                # this copy once, but reload on the next read.
+                directory.loaded_at = 0.0
+            self._directory = directory
+            self._names = {}
+        return directory
+
+    def membership_id(self, group_id: str, user_id: str) -> Optional[str]:
+        """Membership id of user_id in group_id, or None if not a member:
+        the index if it knows the pair, otherwise a scan of the group."""
+        membership_id = self.indexed_membership_id(group_id, user_id)
+        if membership_id is not None:
+            return membership_id
+        return self.scan_membership_id(group_id, user_id)
+
+    def indexed_membership_id(self, group_id: str, user_id: str) -> Optional[str]:
+        """Membership id from whatever directory is loaded, without forcing
+        a load or calling the Identity Store."""
+        with self._lock:
+            directory = self._directory
+        return directory.membership_id(group_id, user_id) if directory is not None else None
+
+    def scan_membership_id(self, group_id: str, user_id: str) -> Optional[str]:
+        """Scan the group's memberships page by page, stopping at the match
+        and indexing it in the loaded directory."""
+        with self._lock:
+            directory = self._directory
+        paginator = self._client_factory().get_paginator("list_group_memberships")
+        for page in paginator.paginate(IdentityStoreId=self._identity_store_id, GroupId=group_id):
+            for membership in page.get("GroupMemberships", []):
+                if membership.get("MemberId", {}).get("UserId") == user_id:
+                    if directory is not None:
+                        directory.add_membership(group_id, user_id, membership["MembershipId"])
+                    return membership["MembershipId"]
+        return None
+
+    def principal_names(self, principals: Iterable[Principal]) -> Dict[Principal, str]:
+        """Display name per principal, each distinct principal resolved once.
+        Falls back to the principal id when it can't be described."""
+        directory = self.get()
+        names: Dict[Principal, str] = {}
+        misses: List[Principal] = []
+        for principal in set(principals):
+            name = directory.principal_name(*principal)
+            if name is None:
+                with self._lock:
+                    name = self._names.get(principal)
+            if name is None:
+                misses.append(principal)
+            else:
+                names[principal] = name
+        if misses:
+            resolved = bounded_map(self._describe, misses, self._max_workers)
+            with self._lock:
+                for principal, name in zip(misses, resolved):
+                    self._names[principal] = name
+                    names[principal] = name
+        return names
+
+    def _describe(self, principal: Principal) -> str:
+        principal_type, principal_id = principal
+        identitystore = self._client_factory()
+        try:
+            if principal_type == "GROUP":
+                group = identitystore.describe_group(
+                    IdentityStoreId=self._identity_store_id, GroupId=principal_id
+                )
+                return group["DisplayName"]
+            if principal_type == "USER":
+                user = identitystore.describe_user(
+                    IdentityStoreId=self._identity_store_id, UserId=principal_id
+                )
+                return user.get("DisplayName") or user["UserName"]
+        except Exception:
+            pass
+        return principal_id
+
+    def _apply(self, fn: Callable[[Directory], None]) -> None:
+        with self._lock:
+            self._writes += 1
+            directory = self._directory
+        if directory is not None:
+            fn(directory)
+
+    def put_user(self, row: Dict[str, Any]) -> None:
+        self._apply(lambda d: d.put_user(row))
+
+    def add_membership(self, group_id: str, user_id: str, membership_id: str) -> None:
+        self._apply(lambda d: d.add_membership(group_id, user_id, membership_id))
+
+    def remove_membership(self, group_id: str, user_id: str) -> None:
+        self._apply(lambda d: d.remove_membership(group_id, user_id))
+
+    def invalidate(self) -> None:
+        """Force the next get() to reload (e.g. after a write conflict shows
+        the directory has drifted from the Identity Store)."""
+        with self._lock:
+            self._directory = None
+
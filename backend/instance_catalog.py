@@ -0,0 +1,221 @@
+"""
+EC2 instance-type catalog: vCPU, memory, architecture and network per type.
+
+_estimate_monthly needs a vCPU count for any type missing from the price
+table. It used to call describe_instance_types once per unknown type, never
+remembered failures and had no lock, so one unknown type cost an AWS call on
+every row of every request. The catalog instead:
+
+  - Starts from a bundled offline snapshot (data/instance_types.json) so the
+    process can estimate without network access.
+  - Merges the full live catalog into it, fetched with the
+    describe_instance_types paginator on a background thread, and again at
+    most every REFRESH_SECONDS. A failed live fetch keeps the current table
+    and isn't retried for RETRY_SECONDS. Types only the snapshot knows
+    (e.g. ones not offered in this region) are kept.
+  - Never fetches on the request path: a miss returns None at once (callers
+    fall back to a flat estimate) and, if a live fetch is due, starts one in
+    the background.
+
+Rows are stored as tuples (InstanceTypeInfo) with interned strings.
+
+The bundled snapshot is built by merging two sources, either of which can be
+re-run on its own:
+
+    python instance_catalog.py --seed       # families in instance_families.py
+    python instance_catalog.py --refresh    # live catalog; needs EC2 read access
+
+--refresh overwrites seeded rows with live ones; --seed only adds types the
+snapshot doesn't have yet.
+"""
+
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from singleflight import SingleFlight
+
+SNAPSHOT_PATH = Path(__file__).parent / "data" / "instance_types.json"
+REFRESH_SECONDS = 24 * 60 * 60
+RETRY_SECONDS = 10 * 60
+
+
+class InstanceTypeInfo(NamedTuple):
+    vcpus: int
+    memory_mib: int
+    architectures: Tuple[str, ...]
+    network_performance: str
+
+
+def _row(info: Dict[str, Any]) -> Optional[Tuple[str, InstanceTypeInfo]]:
+    """describe_instance_types entry -> (type, InstanceTypeInfo)."""
+    name = info.get("InstanceType")
+    vcpus = info.get("VCpuInfo", {}).get("DefaultVCpus")
+    if not name or not isinstance(vcpus, int) or vcpus <= 0:
+        return None
+    return sys.intern(name), InstanceTypeInfo(
+        vcpus,
+        int(info.get("MemoryInfo", {}).get("SizeInMiB") or 0),
+        tuple(sys.intern(a) for a in info.get("ProcessorInfo", {}).get("SupportedArchitectures", [])),
+        sys.intern(info.get("NetworkInfo", {}).get("NetworkPerformance") or ""),
+    )
+
+
+def fetch_live(ec2) -> Dict[str, InstanceTypeInfo]:
+    """Every instance type offered in the client's region."""
+    types: Dict[str, InstanceTypeInfo] = {}
+    for page in ec2.get_paginator("describe_instance_types").paginate():
+        for info in page.get("InstanceTypes", []):
+            row = _row(info)
+            if row is not None:
+                types[row[0]] = row[1]
+    return types
+
+
+def load_snapshot(path: Path = SNAPSHOT_PATH) -> Dict[str, InstanceTypeInfo]:
+    with open(path) as f:
+        data = json.load(f)
+    return {
+        sys.intern(name): InstanceTypeInfo(
+            int(vcpus), int(mem), tuple(sys.intern(a) for a in arch), sys.intern(net)
+        )
+        for name, (vcpus, mem, arch, net) in data["types"].items()
+    }
+
+
+def write_snapshot(types: Dict[str, InstanceTypeInfo], sources: List[str], path: Path = SNAPSHOT_PATH) -> None:
+    data = {
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "sources": sources,
+        "types": {
+            name: [t.vcpus, t.memory_mib, list(t.architectures), t.network_performance]
+            for name, t in sorted(types.items())
+        },
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+        f.write("\n")
+
+
+def seed_types() -> Dict[str, InstanceTypeInfo]:
+    """Rows for every family in instance_families.py."""
+    from instance_families import rows
+
+    return {
+        sys.intern(name): InstanceTypeInfo(vcpus, mem, tuple(sys.intern(a) for a in arch), net)
+        for name, (vcpus, mem, arch, net) in rows().items()
+    }
+
+
+class InstanceCatalog:
+    """Thread-safe instance-type lookup: bundled snapshot, merged with the
+    live catalog in the background."""
+
+    def __init__(self, client_factory: Callable[[], Any], snapshot_path: Path = SNAPSHOT_PATH) -> None:
+        self._client_factory = client_factory
+        self._snapshot_path = snapshot_path
+        self._lock = threading.Lock()
+        self._types: Optional[Dict[str, InstanceTypeInfo]] = None
+        self._live_at = 0.0
+        self._retry_at = 0.0
+        self._refreshing = False
+        self._flight = SingleFlight()
+        self.source = "empty"
+
+    def _table(self) -> Dict[str, InstanceTypeInfo]:
+        with self._lock:
+            if self._types is None:
+                try:
+                    self._types = load_snapshot(self._snapshot_path)
+                    self.source = "snapshot"
+                except (OSError, ValueError, KeyError, TypeError):
+                    self._types = {}
+            return self._types
+
+    def _live_due(self) -> bool:
+        now = time.time()
+        with self._lock:
+            return now >= self._retry_at and now - self._live_at >= REFRESH_SECONDS
+
+    def refresh(self) -> bool:
+        """Merge the live catalog into the table (single-flight), blocking
+        until it is done. Returns False, keeping the current table, if the
+        fetch fails."""
+        return self._flight.do("refresh", self._refresh)
+
+    def refresh_in_background(self) -> None:
+        """Start refresh() on a daemon thread unless one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run() -> None:
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="instance-catalog-refresh", daemon=True).start()
+
+    def _refresh(self) -> bool:
+        try:
+            types = fetch_live(self._client_factory())
+        except Exception:
+            types = {}
+        current = self._table()
+        now = time.time()
+        with self._lock:
+            if not types:
+                self._retry_at = now + RETRY_SECONDS
+                return False
+            # Copy-on-write: readers keep whichever table they already hold.
+            self._types = {**current, **types}
+            self._live_at = now
+            self.source = "live"
+            return True
+
+    def get(self, instance_type: str) -> Optional[InstanceTypeInfo]:
+        """Info for `instance_type`, or None if the catalog doesn't know it
+        (yet). Never blocks on AWS."""
+        info = self._table().get(instance_type)
+        if info is None and self._live_due():
+            # Retried on the live schedule, so a type missing from the
+            # snapshot or from a failed fetch isn't stuck as unknown.
+            self.refresh_in_background()
+        return info
+
+    def vcpus(self, instance_type: str) -> Optional[int]:
+        info = self.get(instance_type)
+        return info.vcpus if info is not None else None
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    try:
+        current = load_snapshot()
+        sources = json.loads(SNAPSHOT_PATH.read_text()).get("sources", [])
+    except (OSError, ValueError, KeyError, TypeError):
+        current, sources = {}, []
+    if args == ["--seed"]:
+        merged = {**seed_types(), **current}
+        source = "instance_families"
+    elif args == ["--refresh"]:
+        from aws_clients import get_client
+
+        client = get_client("ec2")
+        live = fetch_live(client)
+        if not live:
+            sys.exit("describe_instance_types returned nothing; snapshot left unchanged")
+        merged = {**current, **live}
+        source = f"describe_instance_types:{client.meta.region_name}"
+    else:
+        sys.exit("usage: python instance_catalog.py --seed | --refresh")
+    write_snapshot(merged, sorted(set(sources) | {source}))
+    print(f"wrote {len(merged)} instance types ({len(merged) - len(current)} new) to {SNAPSHOT_PATH}")
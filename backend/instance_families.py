@@ -0,0 +1,146 @@
+"""
+Static instance-family table used to seed data/instance_types.json.
+
+The bundled instance-type snapshot has to answer vCPU lookups before the
+live describe_instance_types catalog has been fetched (or when it can't be:
+no network, no ec2:DescribeInstanceTypes). Writing it needs EC2 read access,
+so `python instance_catalog.py --seed` builds the common current-generation
+families from this table instead, following EC2's size conventions:
+
+  - large = 2 vCPUs, xlarge = 4, Nxlarge = 4 × N, metal = the largest size;
+  - memory is a fixed GiB-per-vCPU ratio within a family
+    (c = 2, m = 4, r = 8, ...);
+  - the burstable t2/t3/t3a/t4g families don't follow either rule and are
+    listed size by size.
+
+Network performance isn't derivable this way and is left empty; the live
+catalog fills it in.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+X86 = ("x86_64",)
+ARM = ("arm64",)
+
+# (vCPUs, memory GiB) per size, listed explicitly.
+_BURSTABLE: Dict[str, Tuple[int, float]] = {
+    "nano": (2, 0.5), "micro": (2, 1), "small": (2, 2), "medium": (2, 4),
+    "large": (2, 8), "xlarge": (4, 16), "2xlarge": (8, 32),
+}
+_T2: Dict[str, Tuple[int, float]] = {
+    "nano": (1, 0.5), "micro": (1, 1), "small": (1, 2), "medium": (2, 4),
+    "large": (2, 8), "xlarge": (4, 16), "2xlarge": (8, 32),
+}
+
+_M5_SIZES = ["large", "xlarge", "2xlarge", "4xlarge", "8xlarge", "12xlarge", "16xlarge", "24xlarge"]
+_C5_SIZES = ["large", "xlarge", "2xlarge", "4xlarge", "9xlarge", "12xlarge", "18xlarge", "24xlarge"]
+_GEN6_X86 = _M5_SIZES + ["32xlarge"]
+_GEN6_AMD = _GEN6_X86 + ["48xlarge"]
+_GRAVITON = ["medium", "large", "xlarge", "2xlarge", "4xlarge", "8xlarge", "12xlarge", "16xlarge"]
+_GRAVITON4 = _GRAVITON + ["24xlarge", "48xlarge"]
+_GPU = ["xlarge", "2xlarge", "4xlarge", "8xlarge", "12xlarge", "16xlarge"]
+
+# family -> (GiB per vCPU, architectures, sizes, has a plain ".metal" size).
+# Families whose bare-metal sizes are named metal-24xl/metal-48xl, or whose
+# metal size breaks the ratio, are left to the live catalog.
+RATIO_FAMILIES: Dict[str, Tuple[float, Tuple[str, ...], List[str], bool]] = {
+    # general purpose
+    "m5": (4, X86, _M5_SIZES, True),
+    "m5a": (4, X86, _M5_SIZES, False),
+    "m5d": (4, X86, _M5_SIZES, True),
+    "m5n": (4, X86, _M5_SIZES, True),
+    "m6i": (4, X86, _GEN6_X86, True),
+    "m6id": (4, X86, _GEN6_X86, True),
+    "m6a": (4, X86, _GEN6_AMD, True),
+    "m7i": (4, X86, _GEN6_AMD, False),
+    "m7a": (4, X86, ["medium"] + _GEN6_AMD, False),
+    "m6g": (4, ARM, _GRAVITON, True),
+    "m6gd": (4, ARM, _GRAVITON, True),
+    "m7g": (4, ARM, _GRAVITON, True),
+    "m8g": (4, ARM, _GRAVITON4, False),
+    # compute optimized
+    "c5": (2, X86, _C5_SIZES, True),
+    "c5a": (2, X86, _M5_SIZES, False),
+    "c5d": (2, X86, _C5_SIZES, True),
+    "c5n": (2.625, X86, ["large", "xlarge", "2xlarge", "4xlarge", "9xlarge", "18xlarge"], True),
+    "c6i": (2, X86, _GEN6_X86, True),
+    "c6id": (2, X86, _GEN6_X86, True),
+    "c6a": (2, X86, _GEN6_AMD, True),
+    "c7i": (2, X86, _GEN6_AMD, False),
+    "c7a": (2, X86, ["medium"] + _GEN6_AMD, False),
+    "c6g": (2, ARM, _GRAVITON, True),
+    "c6gd": (2, ARM, _GRAVITON, True),
+    "c6gn": (2, ARM, _GRAVITON, False),
+    "c7g": (2, ARM, _GRAVITON, True),
+    "c8g": (2, ARM, _GRAVITON4, False),
+    # memory optimized
+    "r5": (8, X86, _M5_SIZES, True),
+    "r5a": (8, X86, _M5_SIZES, False),
+    "r5d": (8, X86, _M5_SIZES, True),
+    "r5n": (8, X86, _M5_SIZES, True),
+    "r6i": (8, X86, _GEN6_X86, True),
+    "r6id": (8, X86, _GEN6_X86, True),
+    "r6a": (8, X86, _GEN6_AMD, True),
+    "r7i": (8, X86, _GEN6_AMD, False),
+    "r7a": (8, X86, ["medium"] + _GEN6_AMD, False),
+    "r6g": (8, ARM, _GRAVITON, True),
+    "r6gd": (8, ARM, _GRAVITON, True),
+    "r7g": (8, ARM, _GRAVITON, True),
+    "r8g": (8, ARM, _GRAVITON4, False),
+    "x2gd": (16, ARM, _GRAVITON, True),
+    "z1d": (8, X86, ["large", "xlarge", "2xlarge", "3xlarge", "6xlarge", "12xlarge"], True),
+    # storage optimized
+    "i3": (7.625, X86, ["large", "xlarge", "2xlarge", "4xlarge", "8xlarge", "16xlarge"], True),
+    "i3en": (8, X86, ["large", "xlarge", "2xlarge", "3xlarge", "6xlarge", "12xlarge", "24xlarge"], True),
+    "i4i": (8, X86, _GEN6_X86, True),
+    "im4gn": (4, ARM, ["large", "xlarge", "2xlarge", "4xlarge", "8xlarge", "16xlarge"], False),
+    # accelerated
+    "g4dn": (4, X86, _GPU, False),
+    "g5": (4, X86, _GPU + ["24xlarge", "48xlarge"], False),
+    "g5g": (2, ARM, _GPU[:-2] + ["16xlarge"], True),
+    "g6": (4, X86, _GPU + ["24xlarge", "48xlarge"], False),
+    "inf2": (4, X86, ["xlarge", "8xlarge", "24xlarge", "48xlarge"], False),
+}
+
+EXPLICIT_FAMILIES: Dict[str, Tuple[Tuple[str, ...], Dict[str, Tuple[int, float]]]] = {
+    "t2": (X86, _T2),
+    "t3": (X86, _BURSTABLE),
+    "t3a": (X86, _BURSTABLE),
+    "t4g": (ARM, _BURSTABLE),
+}
+
+# In the ratio families "medium" (Graviton, m7a/c7a/r7a) is 1 vCPU.
+_SIZE_VCPUS = {"medium": 1, "large": 2, "xlarge": 4}
+
+
+def size_vcpus(size: str) -> int:
+    if size in _SIZE_VCPUS:
+        return _SIZE_VCPUS[size]
+    if size.endswith("xlarge"):
+        return 4 * int(size[: -len("xlarge")])
+    raise ValueError(f"unknown instance size {size!r}")
+
+
+Row = Tuple[int, int, Tuple[str, ...], str]  # vCPUs, memory MiB, architectures, network
+
+
+def _ratio_rows(family: str, ratio: float, arch: Tuple[str, ...], sizes: Iterable[str], metal: bool):
+    largest = 0
+    for size in sizes:
+        vcpus = size_vcpus(size)
+        largest = max(largest, vcpus)
+        yield f"{family}.{size}", (vcpus, int(vcpus * ratio * 1024), arch, "")
+    if metal:
+        yield f"{family}.metal", (largest, int(largest * ratio * 1024), arch, "")
+
+
+def rows() -> Dict[str, Row]:
+    """instance type -> (vCPUs, memory MiB, architectures, "") for every
+    family in the table."""
+    out: Dict[str, Row] = {}
+    for family, (ratio, arch, sizes, metal) in RATIO_FAMILIES.items():
+        out.update(_ratio_rows(family, ratio, arch, sizes, metal))
+    for family, (arch, by_size) in EXPLICIT_FAMILIES.items():
+        for size, (vcpus, gib) in by_size.items():
+            out[f"{family}.{size}"] = (vcpus, int(gib * 1024), arch, "")
+    return out
@@ -3,17 +3,23 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
+from starlette.types import ASGIApp, Receive, Scope, Send
 import base64
-import boto3
+import hashlib
 import jwt
 import json
+import logging
 import subprocess
 import os
+import sqlite3
 import threading
 import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional, List, Any, Dict, Tuple
+from typing import Optional, List, Any, Callable, Dict, Iterator, Tuple
 
+from aws_clients import get_client
 from aws_rates import (
     ABSOLUTE_FALLBACK_HR,
     EC2_MONTHLY_RATES_USD,
@@ -22,6 +28,25 @@ from aws_rates import (
     MONTHLY_HOURS,
     SPOT_MULTIPLIER,
 )
+from ce_cache import SQLiteCache, TTLCache
+from cost_cube import CostCubeCache, add_months
+from ec2_inventory import NO_CLUSTER, SORT_KEYS, InstanceRecord, InventoryCache
+from fast_json import FastJSONResponse
+from identity_directory import IdentityDirectory, bounded_map, list_all, user_row
+from instance_catalog import InstanceCatalog
+from permission_sets import PermissionSetCatalog
+from pricing import (
+    PriceBook,
+    PriceBookBudgetError,
+    load as load_price_book,
+    os_for_platform,
+    region_for_az,
+    tenancy_for_placement,
+)
+from singleflight import SingleFlight
+from spot_prices import SpotPriceCache
+
+logger = logging.getLogger(__name__)
 
 # Load configuration from config.json
 # Try multiple paths to support both local dev and Docker
@@ -45,7 +70,19 @@ IDENTITY_STORE_ID = config["aws"]["identityStoreId"]
 SSO_INSTANCE_ARN = config["aws"]["ssoInstanceArn"]
 ACCOUNT_ID = config["aws"]["accountId"]
 
-app = FastAPI(title="AWS Dashboard API", version="1.0.0")
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    """Start background workers on startup and stop them on shutdown. The
+    helpers it calls are defined further down, next to what they manage."""
+    _start_ce_cache_sweepers()
+    try:
+        yield
+    finally:
+        _stop_ce_cache_sweepers()
+
+
+app = FastAPI(title="AWS Dashboard API", version="1.0.0", lifespan=_lifespan)
 
 
 # Pydantic models for request bodies
@@ -86,7 +123,7 @@ app.add_middleware(
 # convention on the coordinator side) — it MUST be base64-decoded before being
 # passed to PyJWT, otherwise signature verification silently fails.
 #
-# Enforcement is done via an ASGI HTTP middleware so we don't have to modify
+# Enforcement is done via an ASGI middleware so we don't have to modify
 # the body of every existing route. /api/health is exempt (Knative probes).
 # ============================================================================
 
@@ -107,10 +144,48 @@ def _json_error(status: int, error: str, message: str) -> JSONResponse:
     return JSONResponse(status_code=status, content={"error": error, "message": message})
 
 
+# Verified claims keyed by sha256(token), kept until the token's own exp.
+# The frontend polls several endpoints every 30s with the same token, so
+# repeat requests skip the HMAC verify + claim validation. Bounded LRU; an
+# entry is never served at or past its exp.
+_CLAIMS_CACHE_MAX_ENTRIES = 1024
+_claims_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_claims_cache_lock = threading.Lock()
+
+
+def _cached_claims(digest: str) -> Optional[Dict[str, Any]]:
+    with _claims_cache_lock:
+        entry = _claims_cache.get(digest)
+        if entry is None:
+            return None
+        exp, claims = entry
+        if time.time() >= exp:
+            del _claims_cache[digest]
+            return None
+        _claims_cache.move_to_end(digest)
+        return claims
+
+
+def _remember_claims(digest: str, claims: Dict[str, Any]) -> None:
+    try:
+        exp = float(claims["exp"])
+    except (KeyError, TypeError, ValueError):
+        return
+    with _claims_cache_lock:
+        _claims_cache[digest] = (exp, claims)
+        _claims_cache.move_to_end(digest)
+        while len(_claims_cache) > _CLAIMS_CACHE_MAX_ENTRIES:
+            _claims_cache.popitem(last=False)
+
+
 def _verify_token(token: str) -> Dict[str, Any]:
     """Decode+verify a JWT. Raises HTTPException on failure."""
     if not JWT_SECRET_BYTES:
         raise HTTPException(status_code=500, detail="C2A_JWT_SECRET not configured")
+    digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    claims = _cached_claims(digest)
+    if claims is not None:
+        return claims
     try:
         claims = jwt.decode(
             token,
@@ -126,6 +201,7 @@ def _verify_token(token: str) -> Dict[str, Any]:
         raise HTTPException(status_code=401, detail="token expired")
     except jwt.InvalidTokenError as e:
         raise HTTPException(status_code=401, detail=f"invalid token: {e}")
+    _remember_claims(digest, claims)
     return claims
 
 
@@ -140,47 +216,71 @@ def _extract_token(request: Request) -> Optional[str]:
     return None
 
 
-@app.middleware("http")
-async def jwt_auth_middleware(request: Request, call_next):
+class JWTAuthMiddleware:
     """Enforce SYSTEM-user JWT on every /api/* endpoint except AUTH_EXEMPT_PATHS.
-    Non-/api/ routes (static SPA files) pass through untouched."""
-    path = request.url.path
+    Non-/api/ routes (static SPA files) pass through untouched.
 
-    # Only guard /api/* routes. Static SPA files are public.
-    if not path.startswith("/api/"):
-        return await call_next(request)
+    Written as plain ASGI rather than @app.middleware("http"): that wraps
+    each request/response in BaseHTTPMiddleware's extra task and body stream,
+    which costs latency on every call and breaks streaming responses. Here an
+    authorised request is handed to the app with the original receive/send."""
 
-    # CORS preflight — let the CORS middleware handle it.
-    if request.method == "OPTIONS":
-        return await call_next(request)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-    if path in AUTH_EXEMPT_PATHS:
-        return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    token = _extract_token(request)
-    if not token:
-        return _json_error(401, "UNAUTHORIZED", "missing bearer token")
+        path = scope["path"]
+        # Only guard /api/* routes. Static SPA files are public. CORS
+        # preflight is left to the CORS middleware.
+        if not path.startswith("/api/") or scope["method"] == "OPTIONS" or path in AUTH_EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
 
-    try:
-        claims = _verify_token(token)
-    except HTTPException as e:
-        code = "UNAUTHORIZED" if e.status_code == 401 else "SERVER_ERROR"
-        return _json_error(e.status_code, code, str(e.detail))
+        request = Request(scope)
+        token = _extract_token(request)
+        if not token:
+            await _json_error(401, "UNAUTHORIZED", "missing bearer token")(scope, receive, send)
+            return
 
-    if claims.get("userType") != "SYSTEM":
-        return _json_error(403, "FORBIDDEN", "SYSTEM users only")
+        try:
+            claims = _verify_token(token)
+        except HTTPException as e:
+            code = "UNAUTHORIZED" if e.status_code == 401 else "SERVER_ERROR"
+            await _json_error(e.status_code, code, str(e.detail))(scope, receive, send)
+            return
+
+        if claims.get("userType") != "SYSTEM":
+            await _json_error(403, "FORBIDDEN", "SYSTEM users only")(scope, receive, send)
+            return
 
-    # Stash claims on request state for any downstream handler that wants them.
-    request.state.jwt_claims = claims
-    return await call_next(request)
+        # Stash claims on request state (scope["state"]) for any downstream
+        # handler that wants them.
+        request.state.jwt_claims = claims
+        await self.app(scope, receive, send)
+
+
+# Added after CORSMiddleware, so — like the old @app.middleware("http") — it
+# is the outermost layer.
+app.add_middleware(JWTAuthMiddleware)
 
 
 def require_system_user(request: Request) -> Dict[str, Any]:
     """FastAPI dependency form of the same check.
 
-    The HTTP middleware above already enforces auth cluster-wide, but exposing
+    The auth middleware above already enforces auth cluster-wide, but exposing
     this dependency lets new endpoints (the cost endpoints below) declare their
-    auth requirement explicitly at the route level for clarity/testability."""
+    auth requirement explicitly at the route level for clarity/testability.
+
+    When the middleware ran it has already verified the token and checked
+    userType, so its claims are reused; the token is only verified here when
+    the middleware didn't run (e.g. the route is mounted without it)."""
+    claims = getattr(request.state, "jwt_claims", None)
+    if claims is not None and claims.get("userType") == "SYSTEM":
+        return claims
     token = _extract_token(request)
     if not token:
         raise HTTPException(status_code=401, detail="missing bearer token")
@@ -196,34 +296,146 @@ def require_system_user(request: Request) -> Dict[str, Any]:
 #
 # All responses are shaped to the design contract in the accompanying design
 # doc: USD, 2-decimal rounding, ISO-8601 dates, `generated_at` UTC timestamp.
-# Cost Explorer is us-east-1 only and each call costs $0.01 — we cache every
-# response in-memory for 15 minutes.
+# Cost Explorer is us-east-1 only and each call costs $0.01. The aggregate
+# endpoints are served from one daily × service cost cube (cost_cube.py);
+# the rest cache each response in-memory for 15 minutes, in a bounded LRU
+# (see ce_cache.py).
+#
+# Set CE_CACHE_PATH to also persist responses in a SQLite file. The in-memory
+# cache stays in front as the hot tier; the file survives restarts and is
+# shared by every uvicorn worker that points at it, so a cold start after
+# scale-to-zero doesn't re-pay for every CE call.
 # ============================================================================
 
 _CE_CACHE_TTL_SECONDS = 15 * 60
-_ce_cache: Dict[str, Tuple[float, Any]] = {}
-_ce_cache_lock = threading.Lock()
+_CE_CACHE_MAX_ENTRIES = int(os.environ.get("CE_CACHE_MAX_ENTRIES", "512"))
+_CE_CACHE_MAX_BYTES = int(os.environ.get("CE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+_CE_CACHE_SWEEP_SECONDS = 60
+_ce_cache = TTLCache(
+    default_ttl=_CE_CACHE_TTL_SECONDS,
+    max_entries=_CE_CACHE_MAX_ENTRIES,
+    max_bytes=_CE_CACHE_MAX_BYTES,
+)
+
+_CE_CACHE_PATH = os.environ.get("CE_CACHE_PATH", "")
+_CE_CACHE_DISK_MAX_BYTES = int(os.environ.get("CE_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+_ce_store: Optional[SQLiteCache] = None
+if _CE_CACHE_PATH:
+    try:
+        _ce_store = SQLiteCache(
+            _CE_CACHE_PATH,
+            default_ttl=_CE_CACHE_TTL_SECONDS,
+            max_bytes=_CE_CACHE_DISK_MAX_BYTES,
+        )
+    except sqlite3.Error as e:
+        # A bad path shouldn't take the API down — fall back to memory only.
+        logger.warning("CE_CACHE_PATH=%r unusable, persistent CE cache disabled: %s", _CE_CACHE_PATH, e)
+        _ce_store = None
+
+
+def _start_ce_cache_sweepers() -> None:
+    _ce_cache.start_sweeper(_CE_CACHE_SWEEP_SECONDS)
+    if _ce_store is not None:
+        _ce_store.start_sweeper(_CE_CACHE_SWEEP_SECONDS)
+
+
+def _stop_ce_cache_sweepers() -> None:
+    _ce_cache.stop_sweeper(timeout=5)
+    if _ce_store is not None:
+        _ce_store.stop_sweeper(timeout=5)
 
 
 def _ce_client():
-    return boto3.client("ce", region_name="us-east-1")
+    return get_client("ce", region_name="us-east-1")
 
 
-def _cache_get(key: str) -> Optional[Any]:
-    with _ce_cache_lock:
-        entry = _ce_cache.get(key)
-        if entry is None:
-            return None
-        ts, value = entry
-        if time.time() - ts > _CE_CACHE_TTL_SECONDS:
-            _ce_cache.pop(key, None)
-            return None
+def _cache_get(key: str, record: bool = True) -> Optional[Any]:
+    value = _ce_cache.get(key, record=record)
+    if value is not None or _ce_store is None:
+        return value
+    try:
+        entry = _ce_store.get_entry(key, record=record)
+    except sqlite3.Error:
+        return None
+    if entry is None:
+        return None
+    value, expires_at = entry
+    # Promote into the memory tier for whatever TTL the disk entry has left.
+    _ce_cache.put(key, value, None if expires_at is None else max(0.0, expires_at - time.time()))
+    return value
+
+
+def _cache_put(key: str, value: Any, ttl: Optional[float] = _CE_CACHE_TTL_SECONDS) -> None:
+    """Cache `value` for `ttl` seconds (None = until evicted) in every tier."""
+    _ce_cache.put(key, value, ttl)
+    if _ce_store is not None:
+        try:
+            _ce_store.put(key, value, ttl)
+        except sqlite3.Error:
+            pass
+
+
+# Coalesces concurrent misses for the same cache key into one CE request.
+_ce_flight = SingleFlight()
+
+
+def _ce_cached(key: str, loader: Callable[[], Any]) -> Any:
+    """
+    Return the cached value for `key`, or run `loader` to fill it.
+
+    On a miss only one caller per key runs `loader`; every request arriving
+    while it is in flight waits for and shares that result (or exception)
+    instead of issuing its own $0.01 CE call. Exceptions are not cached.
+    """
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    def _fill() -> Any:
+        # A previous leader may have filled the key after our miss.
+        cached = _cache_get(key, record=False)
+        if cached is not None:
+            return cached
+        value = loader()
+        _cache_put(key, value)
         return value
 
+    return _ce_flight.do(key, _fill)
+
+
+# summary, by-service, historical, /api/services and the EKS service totals
+# all slice one daily × service cube (see cost_cube.py) instead of sending
+# their own overlapping CE queries. It is refreshed in the background once it
+# is older than the CE cache TTL; with CE_CACHE_PATH set it is also persisted,
+# so a cold start serves the last cube while the next one is fetched.
+_COST_CUBE_KEY = "cost-cube"
+
+
+def _restore_cost_cube() -> Optional[Dict[str, Any]]:
+    if _ce_store is None:
+        return None
+    try:
+        return _ce_store.get(_COST_CUBE_KEY, record=False)
+    except sqlite3.Error:
+        return None
+
+
+def _persist_cost_cube(data: Dict[str, Any]) -> None:
+    if _ce_store is not None:
+        try:
+            _ce_store.put(_COST_CUBE_KEY, data, ttl=None)
+        except sqlite3.Error:
+            pass
+
+
+_cost_cube = CostCubeCache(
+    _ce_client,
+    ttl_seconds=_CE_CACHE_TTL_SECONDS,
+    restore=_restore_cost_cube,
+    persist=_persist_cost_cube,
+)
 
-def _cache_put(key: str, value: Any) -> None:
-    with _ce_cache_lock:
-        _ce_cache[key] = (time.time(), value)
+_EKS_SERVICE_NAME = "Amazon Elastic Container Service for Kubernetes"
 
 
 def _iso_now() -> str:
@@ -239,27 +451,49 @@ def _ce_error_response(exc: Exception) -> JSONResponse:
     return _json_error(502, "COST_EXPLORER_ERROR", str(exc))
 
 
+def _summary_daily_totals(start, end) -> Dict[str, float]:
+    """ISO day -> UnblendedCost over [start, end) from one DAILY query,
+    following NextPageToken."""
+    daily: Dict[str, float] = {}
+    request: Dict[str, Any] = {
+        "TimePeriod": {"Start": start.isoformat(), "End": end.isoformat()},
+        "Granularity": "DAILY",
+        "Metrics": ["UnblendedCost"],
+    }
+    while True:
+        resp = _ce_client().get_cost_and_usage(**request)
+        for r in resp.get("ResultsByTime", []):
+            day = r.get("TimePeriod", {}).get("Start")
+            if day:
+                daily[day] = daily.get(day, 0.0) + float(
+                    r.get("Total", {}).get("UnblendedCost", {}).get("Amount", 0)
+                )
+        token = resp.get("NextPageToken")
+        if not token:
+            return daily
+        request["NextPageToken"] = token
+
+
 @app.get("/api/costs/summary")
 def costs_summary(_: Dict[str, Any] = Depends(require_system_user)):
-    """Hero-card summary: MTD vs previous-month-to-date."""
-    from datetime import date, timedelta
+    """
+    Hero-card summary: MTD vs previous-month-to-date.
 
-    cache_key = "summary"
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        return cached
+    Sliced from the cost cube once it is loaded. Before that (a cold start
+    with nothing persisted) it is answered from one small DAILY query over
+    [previous month start, MTD end) rather than waiting for the 24-month
+    cube, which peek() starts loading in the background.
+    """
+    from datetime import date, timedelta
 
     today = date.today()
     mtd_start = today.replace(day=1)
-    # CE End is exclusive. For the current month we ask for [1st, today], and
-    # if today IS the 1st we widen by a day so CE has a non-empty window.
+    # Windows are half-open. For the current month we sum [1st, today), and
+    # if today IS the 1st we widen by a day so the window isn't empty.
     mtd_query_end = today if today > mtd_start else mtd_start + timedelta(days=1)
 
     # Previous full month
-    if mtd_start.month == 1:
-        prev_month_start = mtd_start.replace(year=mtd_start.year - 1, month=12, day=1)
-    else:
-        prev_month_start = mtd_start.replace(month=mtd_start.month - 1, day=1)
+    prev_month_start = add_months(today, -1)
     prev_month_end = mtd_start  # exclusive — day 1 of current month
 
     # Previous month-to-date (same day-of-month window as current MTD)
@@ -267,58 +501,58 @@ def costs_summary(_: Dict[str, Any] = Depends(require_system_user)):
     prev_mtd_start = prev_month_start
     prev_mtd_end = prev_month_start + timedelta(days=day_offset) if day_offset > 0 else prev_month_start
 
-    ce = _ce_client()
+    def _respond(total: Callable[[Any, Any], float], generated_at: str) -> Dict[str, Any]:
+        mtd_cost = total(mtd_start, mtd_query_end)
+        prev_month_cost = total(prev_month_start, prev_month_end)
+        prev_mtd_cost = total(prev_mtd_start, prev_mtd_end)
 
-    def _total(start, end):
-        if start >= end:
-            return 0.0
-        resp = ce.get_cost_and_usage(
-            TimePeriod={"Start": start.isoformat(), "End": end.isoformat()},
-            Granularity="MONTHLY",
-            Metrics=["UnblendedCost"],
-        )
-        total = 0.0
-        for r in resp.get("ResultsByTime", []):
-            total += float(r.get("Total", {}).get("UnblendedCost", {}).get("Amount", 0))
-        return total
+        if prev_mtd_cost == 0:
+            delta_pct = None
+        else:
+            delta_pct = round((mtd_cost - prev_mtd_cost) / prev_mtd_cost * 100, 2)
+
+        return {
+            "currency": "USD",
+            "mtd": {
+                "start": mtd_start.isoformat(),
+                "end": today.isoformat(),
+                "cost": round(mtd_cost, 2),
+            },
+            "previous_month": {
+                "start": prev_month_start.isoformat(),
+                "end": (prev_month_end - timedelta(days=1)).isoformat(),
+                "cost": round(prev_month_cost, 2),
+            },
+            "previous_month_to_date": {
+                "start": prev_mtd_start.isoformat(),
+                "end": prev_mtd_end.isoformat(),
+                "cost": round(prev_mtd_cost, 2),
+                "note": "same day-of-month window as mtd, for fair comparison",
+            },
+            "delta_pct": delta_pct,
+            "delta_pct_basis": "mtd_vs_previous_month_to_date",
+            "generated_at": generated_at,
+        }
+
+    cube = _cost_cube.peek()
+    if cube is not None:
+        return FastJSONResponse(_respond(cube.total, cube.fetched_at_iso()))
+
+    def _load() -> Dict[str, Any]:
+        daily = _summary_daily_totals(prev_month_start, mtd_query_end)
+
+        def _total(start, end):
+            # ISO dates compare correctly as strings.
+            lo, hi = start.isoformat(), end.isoformat()
+            return sum(amt for day, amt in daily.items() if lo <= day < hi)
+
+        return _respond(_total, _iso_now())
 
     try:
-        mtd_cost = _total(mtd_start, mtd_query_end)
-        prev_month_cost = _total(prev_month_start, prev_month_end)
-        prev_mtd_cost = _total(prev_mtd_start, prev_mtd_end) if prev_mtd_end > prev_mtd_start else 0.0
+        return FastJSONResponse(_ce_cached(f"summary:{today.isoformat()}", _load))
     except Exception as e:
         return _ce_error_response(e)
 
-    if prev_mtd_cost == 0:
-        delta_pct = None
-    else:
-        delta_pct = round((mtd_cost - prev_mtd_cost) / prev_mtd_cost * 100, 2)
-
-    result = {
-        "currency": "USD",
-        "mtd": {
-            "start": mtd_start.isoformat(),
-            "end": today.isoformat(),
-            "cost": round(mtd_cost, 2),
-        },
-        "previous_month": {
-            "start": prev_month_start.isoformat(),
-            "end": (prev_month_end - timedelta(days=1)).isoformat(),
-            "cost": round(prev_month_cost, 2),
-        },
-        "previous_month_to_date": {
-            "start": prev_mtd_start.isoformat(),
-            "end": prev_mtd_end.isoformat(),
-            "cost": round(prev_mtd_cost, 2),
-            "note": "same day-of-month window as mtd, for fair comparison",
-        },
-        "delta_pct": delta_pct,
-        "delta_pct_basis": "mtd_vs_previous_month_to_date",
-        "generated_at": _iso_now(),
-    }
-    _cache_put(cache_key, result)
-    return result
-
 
 @app.get("/api/costs/by-service")
 def costs_by_service(
@@ -328,34 +562,16 @@ def costs_by_service(
     """Cost broken down by AWS service over the trailing `months` months."""
     from datetime import date, timedelta
 
-    cache_key = f"by-service:{months}"
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        return cached
-
-    end = date.today()
-    # Approximate month arithmetic — trailing N*30 days is close enough for
-    # CE's own MONTHLY buckets and matches how the frontend labels the range.
-    start = end - timedelta(days=months * 30)
-
-    ce = _ce_client()
     try:
-        resp = ce.get_cost_and_usage(
-            TimePeriod={"Start": start.isoformat(), "End": end.isoformat()},
-            Granularity="MONTHLY",
-            Metrics=["UnblendedCost"],
-            GroupBy=[{"Type": "DIMENSION", "Key": "SERVICE"}],
-        )
+        cube = _cost_cube.get()
     except Exception as e:
         return _ce_error_response(e)
 
-    # Aggregate across the time buckets CE returns
-    totals: Dict[str, float] = {}
-    for bucket in resp.get("ResultsByTime", []):
-        for group in bucket.get("Groups", []):
-            name = group["Keys"][0]
-            amt = float(group["Metrics"]["UnblendedCost"]["Amount"])
-            totals[name] = totals.get(name, 0.0) + amt
+    end = date.today()
+    # Approximate month arithmetic — trailing N*30 days matches how the
+    # frontend labels the range.
+    start = end - timedelta(days=months * 30)
+    totals = cube.by_service(start, end)
 
     total_all = sum(totals.values())
     services = []
@@ -367,15 +583,13 @@ def costs_by_service(
             "pct_of_total": pct,
         })
 
-    result = {
+    return FastJSONResponse({
         "currency": "USD",
         "period": {"start": start.isoformat(), "end": end.isoformat()},
         "total": round(total_all, 2),
         "services": services,
-        "generated_at": _iso_now(),
-    }
-    _cache_put(cache_key, result)
-    return result
+        "generated_at": cube.fetched_at_iso(),
+    })
 
 
 @app.get("/api/costs/historical")
@@ -383,67 +597,30 @@ def costs_historical(
     months: int = Query(6, ge=1, le=24),
     _: Dict[str, Any] = Depends(require_system_user),
 ):
-    """Trailing-N-month monthly cost series."""
+    """Trailing-N-month monthly cost series, summed from the cost cube."""
     from datetime import date
 
-    cache_key = f"historical:{months}"
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        return cached
-
-    today = date.today()
-
-    # Compute the first-of-month `months-1` months ago.
-    y, m = today.year, today.month
-    back = months - 1
-    for _i in range(back):
-        if m == 1:
-            m = 12
-            y -= 1
-        else:
-            m -= 1
-    start = date(y, m, 1)
-    # CE End is exclusive; using today covers the current (partial) month.
-    end = today
-
-    ce = _ce_client()
     try:
-        resp = ce.get_cost_and_usage(
-            TimePeriod={"Start": start.isoformat(), "End": end.isoformat()},
-            Granularity="MONTHLY",
-            Metrics=["UnblendedCost"],
-        )
+        cube = _cost_cube.get()
     except Exception as e:
         return _ce_error_response(e)
 
-    by_month: Dict[str, float] = {}
-    for bucket in resp.get("ResultsByTime", []):
-        period_start = bucket.get("TimePeriod", {}).get("Start")
-        if period_start:
-            by_month[period_start] = float(
-                bucket.get("Total", {}).get("UnblendedCost", {}).get("Amount", 0)
-            )
-
-    # Walk month-by-month from `start` to `today`, emitting 0.0 for gaps.
+    today = date.today()
+    start = add_months(today, -(months - 1))
     series = []
-    cy, cm = start.year, start.month
-    while (cy, cm) <= (today.year, today.month):
-        key = date(cy, cm, 1).isoformat()
-        series.append({"date": key, "cost": round(by_month.get(key, 0.0), 2)})
-        if cm == 12:
-            cm = 1
-            cy += 1
-        else:
-            cm += 1
-
-    result = {
+    for i in range(months):
+        month_start = add_months(start, i)
+        # Like every other cost window, the series ends before today: the
+        # current month doesn't include today's partial day.
+        cost = cube.total(month_start, min(add_months(month_start, 1), today))
+        series.append({"date": month_start.isoformat(), "cost": round(cost, 2)})
+
+    return FastJSONResponse({
         "currency": "USD",
         "granularity": "MONTHLY",
         "series": series,
-        "generated_at": _iso_now(),
-    }
-    _cache_put(cache_key, result)
-    return result
+        "generated_at": cube.fetched_at_iso(),
+    })
 
 
 @app.get("/api/costs/top-resources")
@@ -461,107 +638,125 @@ def costs_top_resources(
     returns an error which we surface as 502 COST_EXPLORER_ERROR."""
     from datetime import date, timedelta
 
-    cache_key = f"top-resources:{days}:{limit}"
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        return cached
+    def _load() -> Dict[str, Any]:
+        end = date.today()
+        start = end - timedelta(days=days)
+
+        ce = _ce_client()
+        try:
+            resp = ce.get_cost_and_usage_with_resources(
+                TimePeriod={"Start": start.isoformat(), "End": end.isoformat()},
+                Granularity="DAILY",
+                Metrics=["UnblendedCost"],
+                GroupBy=[
+                    {"Type": "DIMENSION", "Key": "SERVICE"},
+                    {"Type": "DIMENSION", "Key": "RESOURCE_ID"},
+                ],
+                Filter={
+                    "Not": {
+                        "Dimensions": {
+                            "Key": "RECORD_TYPE",
+                            "Values": ["Credit", "Refund"],
+                        }
+                    }
+                },
+            )
+        except Exception as e:
+            # Resource-level CE data requires an explicit opt-in in the
+            # payer account's Cost Explorer Settings. Detect that specific
+            # AccessDeniedException and return a 200 with a structured
+            # opt-in-needed payload — the frontend renders a helpful empty
+            # state with a link to AWS settings rather than a scary 502.
+            msg = str(e)
+            if "Resource-level data granularity is an opt-in" in msg or (
+                "AccessDeniedException" in msg and "opt-in" in msg
+            ):
+                return {
+                    "resources": [],
+                    "resourceLevelEnabled": False,
+                    "message": (
+                        "Resource-level Cost Explorer data is not enabled on this AWS account. "
+                        "Enable it in the payer account's Billing → Cost Explorer → Preferences. "
+                        "Data starts populating within ~24 hours; history is not backfilled."
+                    ),
+                    "helpUrl": "https://console.aws.amazon.com/cost-management/home#/settings",
+                    "days": days,
+                    "limit": limit,
+                }
+            raise
+
+        # Aggregate cost per (resource_id, service) across time buckets
+        agg: Dict[Tuple[str, str], float] = {}
+        for bucket in resp.get("ResultsByTime", []):
+            for group in bucket.get("Groups", []):
+                keys = group.get("Keys", [])
+                # GroupBy order: SERVICE first, RESOURCE_ID second
+                service = keys[0] if len(keys) > 0 else ""
+                resource_id = keys[1] if len(keys) > 1 else ""
+                if not resource_id or resource_id == "NoResourceId":
+                    continue
+                amt = float(group["Metrics"]["UnblendedCost"]["Amount"])
+                agg[(resource_id, service)] = agg.get((resource_id, service), 0.0) + amt
+
+        ranked = sorted(agg.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+
+        resources = []
+        for (resource_id, service), cost in ranked:
+            # CE doesn't return tags in the groups response — we intentionally
+            # leave `tags` empty rather than paying for a second CE call per row.
+            resources.append({
+                "resource_id": resource_id,
+                "service": service,
+                "cost": round(cost, 2),
+                "tags": {},
+            })
 
-    end = date.today()
-    start = end - timedelta(days=days)
+        return {
+            "currency": "USD",
+            "period": {"start": start.isoformat(), "end": end.isoformat()},
+            "total_resources_reported": len(resources),
+            "resources": resources,
+            "generated_at": _iso_now(),
+        }
 
-    ce = _ce_client()
     try:
-        resp = ce.get_cost_and_usage_with_resources(
-            TimePeriod={"Start": start.isoformat(), "End": end.isoformat()},
-            Granularity="DAILY",
-            Metrics=["UnblendedCost"],
-            GroupBy=[
-                {"Type": "DIMENSION", "Key": "SERVICE"},
-                {"Type": "DIMENSION", "Key": "RESOURCE_ID"},
-            ],
-            Filter={
-                "Not": {
-                    "Dimensions": {
-                        "Key": "RECORD_TYPE",
-                        "Values": ["Credit", "Refund"],
-                    }
-                }
-            },
-        )
+        return FastJSONResponse(_ce_cached(f"top-resources:{days}:{limit}", _load))
     except Exception as e:
-        # Resource-level CE data requires an explicit opt-in in the
-        # payer account's Cost Explorer Settings. Detect that specific
-        # AccessDeniedException and return a 200 with a structured
-        # opt-in-needed payload — the frontend renders a helpful empty
-        # state with a link to AWS settings rather than a scary 502.
-        msg = str(e)
-        if "Resource-level data granularity is an opt-in" in msg or (
-            "AccessDeniedException" in msg and "opt-in" in msg
-        ):
-            payload = {
-                "resources": [],
-                "resourceLevelEnabled": False,
-                "message": (
-                    "Resource-level Cost Explorer data is not enabled on this AWS account. "
-                    "Enable it in the payer account's Billing → Cost Explorer → Preferences. "
-                    "Data starts populating within ~24 hours; history is not backfilled."
-                ),
-                "helpUrl": "https://console.aws.amazon.com/cost-management/home#/settings",
-                "days": days,
-                "limit": limit,
-            }
-            _cache_put(cache_key, payload)
-            return payload
         return _ce_error_response(e)
 
-    # Aggregate cost per (resource_id, service) across time buckets
-    agg: Dict[Tuple[str, str], float] = {}
-    for bucket in resp.get("ResultsByTime", []):
-        for group in bucket.get("Groups", []):
-            keys = group.get("Keys", [])
-            # GroupBy order: SERVICE first, RESOURCE_ID second
-            service = keys[0] if len(keys) > 0 else ""
-            resource_id = keys[1] if len(keys) > 1 else ""
-            if not resource_id or resource_id == "NoResourceId":
-                continue
-            amt = float(group["Metrics"]["UnblendedCost"]["Amount"])
-            agg[(resource_id, service)] = agg.get((resource_id, service), 0.0) + amt
-
-    ranked = sorted(agg.items(), key=lambda kv: kv[1], reverse=True)[:limit]
-
-    resources = []
-    for (resource_id, service), cost in ranked:
-        # CE doesn't return tags in the groups response — we intentionally
-        # leave `tags` empty rather than paying for a second CE call per row.
-        resources.append({
-            "resource_id": resource_id,
-            "service": service,
-            "cost": round(cost, 2),
-            "tags": {},
-        })
 
-    result = {
-        "currency": "USD",
-        "period": {"start": start.isoformat(), "end": end.isoformat()},
-        "total_resources_reported": len(resources),
-        "resources": resources,
+@app.get("/api/costs/cache-stats")
+def costs_cache_stats(_: Dict[str, Any] = Depends(require_system_user)):
+    """CE cache introspection: size/budget, hit/miss/eviction/expiry counts
+    per key prefix, and how many CE loads were issued vs. coalesced onto an
+    in-flight load for the same key."""
+    return {
+        **_ce_cache.stats(),
+        "persistent": _ce_store.stats() if _ce_store is not None else None,
+        "costCube": _cost_cube.status(),
+        "singleFlight": {
+            "issued": _ce_flight.issued,
+            "coalesced": _ce_flight.coalesced,
+            "inFlight": _ce_flight.in_flight(),
+        },
         "generated_at": _iso_now(),
     }
-    _cache_put(cache_key, result)
-    return result
 
 
 def get_boto_clients():
+    """Shared, lazily-built clients from the process-wide registry (see
+    aws_clients.py). Cheap to call per request — nothing is constructed
+    after the first call for each service."""
     return {
         # Cost Explorer is us-east-1 only — pinned in code so the legacy
         # /api/services endpoint doesn't silently 400 if AWS_REGION is
         # overridden away from us-east-1.
-        "ce": boto3.client("ce", region_name="us-east-1"),
-        "identitystore": boto3.client("identitystore"),
-        "sso_admin": boto3.client("sso-admin"),
-        "resourcegroupstaggingapi": boto3.client("resourcegroupstaggingapi"),
-        "eks": boto3.client("eks"),
-        "ec2": boto3.client("ec2"),
+        "ce": get_client("ce", region_name="us-east-1"),
+        "identitystore": get_client("identitystore"),
+        "sso_admin": get_client("sso-admin"),
+        "resourcegroupstaggingapi": get_client("resourcegroupstaggingapi"),
+        "eks": get_client("eks"),
+        "ec2": get_client("ec2"),
     }
 
 
@@ -573,25 +768,15 @@ def health_check():
 @app.get("/api/services")
 def get_services():
     """Get all AWS services in use with costs and resource counts."""
-    clients = get_boto_clients()
-
-    # Get services by cost
-    from datetime import datetime, timedelta
-    end_date = datetime.now().strftime("%Y-%m-%d")
-    start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    from datetime import date, timedelta
+    end = date.today()
+    start = end - timedelta(days=30)
 
     try:
-        cost_response = clients["ce"].get_cost_and_usage(
-            TimePeriod={"Start": start_date, "End": end_date},
-            Granularity="MONTHLY",
-            Metrics=["UnblendedCost"],
-            GroupBy=[{"Type": "DIMENSION", "Key": "SERVICE"}],
-        )
+        totals = _cost_cube.get().by_service(start, end)
 
         services = []
-        for group in cost_response.get("ResultsByTime", [{}])[0].get("Groups", []):
-            service_name = group["Keys"][0]
-            cost = float(group["Metrics"]["UnblendedCost"]["Amount"])
+        for service_name, cost in totals.items():
             if cost > 0:
                 services.append({
                     "name": service_name,
@@ -636,8 +821,41 @@ def get_resources():
 # EC2 HELPERS — cluster membership, use hints, monthly cost estimate
 # ============================================================================
 
-# Cache for describe_instance_types vCPU lookups (per process).
-_VCPU_CACHE: Dict[str, int] = {}
+# vCPU/memory/arch per instance type: bundled snapshot, with the live
+# paginated catalog merged in off the request path (see instance_catalog.py).
+_instance_catalog = InstanceCatalog(lambda: get_client("ec2"))
+
+# On-demand price book (see pricing.py). The static aws_rates table is the
+# fallback if the bundled snapshot is missing or over its budgets.
+try:
+    _price_book = load_price_book()
+except (OSError, ValueError, KeyError, PriceBookBudgetError) as e:
+    logger.warning("EC2 price snapshot unusable, falling back to aws_rates: %s", e)
+    _price_book = PriceBook.from_rate_table(EC2_MONTHLY_RATES_USD)
+
+# describe_instances caps MaxResults at 1000 per page.
+_DESCRIBE_INSTANCES_PAGE_SIZE = 1000
+
+
+def _iter_instances(ec2, filters: Optional[List[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every instance from describe_instances, one page at a time.
+
+    A bare describe_instances() call silently truncates past the first page,
+    and holding the whole response keeps every reservation alive until the
+    caller is done. Walking the paginator lets callers fold instances into
+    their aggregates as they arrive, so only one page is resident at a time.
+    """
+    paginator = ec2.get_paginator("describe_instances")
+    kwargs: Dict[str, Any] = {
+        "PaginationConfig": {"PageSize": _DESCRIBE_INSTANCES_PAGE_SIZE},
+    }
+    if filters:
+        kwargs["Filters"] = filters
+    for page in paginator.paginate(**kwargs):
+        for reservation in page.get("Reservations", []):
+            for instance in reservation.get("Instances", []):
+                yield instance
 
 
 def _detect_parent_cluster(tags: Dict[str, str]) -> Tuple[Optional[str], Optional[str], List[str]]:
@@ -732,44 +950,46 @@ def _extract_use_hints(tags: Dict[str, str], iam_instance_profile_arn: Optional[
 
 
 def _instance_type_vcpu(instance_type: str) -> Optional[int]:
-    """Return vCPU count for an instance type, cached per process. None on failure."""
-    if instance_type in _VCPU_CACHE:
-        return _VCPU_CACHE[instance_type]
-    try:
-        ec2 = boto3.client("ec2")
-        resp = ec2.describe_instance_types(InstanceTypes=[instance_type])
-        infos = resp.get("InstanceTypes") or []
-        if not infos:
-            return None
-        vcpu = infos[0].get("VCpuInfo", {}).get("DefaultVCpus")
-        if isinstance(vcpu, int) and vcpu > 0:
-            _VCPU_CACHE[instance_type] = vcpu
-            return vcpu
-    except Exception:
-        pass
-    return None
+    """Return vCPU count for an instance type from the catalog. None if unknown."""
+    return _instance_catalog.vcpus(instance_type)
 
 
 def _estimate_monthly(
     instance_type: Optional[str],
     state: str = "running",
     lifecycle: Optional[str] = None,
+    region: Optional[str] = None,
+    os_name: Optional[str] = None,
+    tenancy: Optional[str] = None,
+    spot_hourly: Optional[float] = None,
 ) -> Tuple[float, float, bool]:
     """
     Estimate hourly + monthly USD cost for an instance.
 
+    `region`, `os_name` and `tenancy` use the price-list vocabulary (see
+    pricing.py); None means the price book's defaults (us-west-2, Linux,
+    Shared). `spot_hourly` is the recent spot price for a spot instance;
+    without it spot falls back to SPOT_MULTIPLIER × on-demand.
+
     Returns:
         (hourly, monthly, estimated)
-        - hourly: rate applied (post spot-multiplier if lifecycle == 'spot')
+        - hourly: rate applied (spot price, or post spot-multiplier, if
+          lifecycle == 'spot')
         - monthly: hourly * MONTHLY_HOURS, or 0.0 if state != 'running'
-        - estimated: True if a fallback path was used (unknown type, spot,
-          or absolute floor)
+        - estimated: True if a fallback path was used (no exact price-book
+          entry, unknown type, spot multiplier, or absolute floor)
     """
     if not instance_type:
         return 0.0, 0.0, True
 
     estimated = False
-    base_hourly = EC2_MONTHLY_RATES_USD.get(instance_type)
+    base_hourly = _price_book.hourly(instance_type, region, os_name, tenancy)
+
+    if base_hourly is None and (region, os_name, tenancy) != (None, None, None):
+        # No price for that exact region/OS/tenancy — the default table's
+        # price is a closer guess than the per-vCPU fallback.
+        base_hourly = _price_book.hourly(instance_type)
+        estimated = True
 
     if base_hourly is None:
         estimated = True
@@ -781,21 +1001,175 @@ def _estimate_monthly(
 
     hourly = base_hourly
     if lifecycle == "spot":
-        hourly = base_hourly * SPOT_MULTIPLIER
-        estimated = True
+        if spot_hourly is not None:
+            # Recent market average for this type/AZ (spot_prices.py).
+            hourly = spot_hourly
+            estimated = False
+        else:
+            hourly = base_hourly * SPOT_MULTIPLIER
+            estimated = True
 
     # Stopped/terminated instances contribute $0/mo to steady-state cost.
     monthly = hourly * MONTHLY_HOURS if state == "running" else 0.0
     return round(hourly, 6), round(monthly, 2), estimated
 
 
+# ============================================================================
+# EC2 INVENTORY SNAPSHOT
+# ============================================================================
+#
+# Every fleet-wide EC2 endpoint derives its view from one shared snapshot
+# (see ec2_inventory.py) instead of paging describe_instances itself. The
+# snapshot is rebuilt at most every _INVENTORY_TTL_SECONDS, single-flight.
+# ============================================================================
+
+_INVENTORY_TTL_SECONDS = 60
+
+
+# (instance_type, running, lifecycle, region, os_name, tenancy, spot_hourly)
+_PriceKey = Tuple[
+    Optional[str], bool, Optional[str], Optional[str], Optional[str], Optional[str], Optional[float]
+]
+
+_SPOT_PRICE_TTL_SECONDS = 15 * 60
+_spot_prices = SpotPriceCache(
+    lambda az: get_client("ec2", region_name=region_for_az(az)),
+    _SPOT_PRICE_TTL_SECONDS,
+)
+
+
+def _estimate_fleet(keys: List[_PriceKey]) -> List[Dict[str, Any]]:
+    """
+    _estimate_monthly over a whole fleet, one result per key.
+
+    Thousands of instances collapse to a few dozen distinct price keys, so
+    each distinct key is priced once and every row with that key shares the
+    same (read-only) monthly_estimate dict.
+    """
+    priced: Dict[_PriceKey, Dict[str, Any]] = {}
+    out: List[Dict[str, Any]] = []
+    for key in keys:
+        estimate = priced.get(key)
+        if estimate is None:
+            instance_type, running, lifecycle, region, os_name, tenancy, spot_hourly = key
+            hourly, monthly, estimated = _estimate_monthly(
+                instance_type,
+                "running" if running else "stopped",
+                lifecycle,
+                region=region,
+                os_name=os_name,
+                tenancy=tenancy,
+                spot_hourly=spot_hourly,
+            )
+            estimate = priced[key] = {"hourly": hourly, "monthly": monthly, "estimated": estimated}
+        out.append(estimate)
+    return out
+
+
+def _load_inventory() -> List[InstanceRecord]:
+    """
+    Walk the fleet once and enrich every instance with cluster membership,
+    use hints and a monthly estimate. Rows come back pre-sorted (running
+    first, then by name) so endpoints can serve them without re-sorting.
+
+    `uptime` is deliberately absent — it depends on the request time, so
+    endpoints add it via InstanceRecord.to_dict(now).
+    """
+    items: List[InstanceRecord] = []
+    price_keys: List[Tuple[Any, ...]] = []
+    azs: List[Optional[str]] = []
+    for instance in _iter_instances(get_client("ec2")):
+        tags_map: Dict[str, str] = {t["Key"]: t["Value"] for t in instance.get("Tags", [])}
+        launch_time = instance.get("LaunchTime")
+        state = instance.get("State", {}).get("Name", "unknown")
+        instance_type = instance.get("InstanceType")
+        lifecycle = instance.get("InstanceLifecycle")  # 'spot' | 'scheduled' | None
+        iam_arn = (instance.get("IamInstanceProfile") or {}).get("Arn")
+
+        parent_cluster, node_role_hint, conflicts = _detect_parent_cluster(tags_map)
+        use_hints = _extract_use_hints(tags_map, iam_arn)
+        placement = instance.get("Placement", {})
+        azs.append(placement.get("AvailabilityZone"))
+        price_keys.append((
+            instance_type,
+            state == "running",
+            lifecycle,
+            region_for_az(placement.get("AvailabilityZone")),
+            os_for_platform(instance.get("PlatformDetails")),
+            tenancy_for_placement(placement.get("Tenancy")),
+        ))
+
+        items.append(InstanceRecord(
+            instance_id=instance.get("InstanceId"),
+            name=tags_map.get("Name", ""),
+            state=state,
+            instance_type=instance_type,
+            private_ip=instance.get("PrivateIpAddress"),
+            public_ip=instance.get("PublicIpAddress"),
+            launched_at=launch_time,
+            availability_zone=placement.get("AvailabilityZone"),
+            vpc_id=instance.get("VpcId"),
+            subnet_id=instance.get("SubnetId"),
+            platform=instance.get("PlatformDetails", "Linux/UNIX"),
+            architecture=instance.get("Architecture"),
+            tags=tags_map,
+            parent_cluster=parent_cluster,
+            node_role_hint=node_role_hint,
+            use_hints=use_hints,
+            lifecycle=lifecycle,
+            parent_cluster_conflict=conflicts or None,
+        ))
+
+    # One batched spot-price lookup for the Linux spot (type, AZ) pairs present.
+    spot = _spot_prices.prices(
+        (key[0], az)
+        for key, az in zip(price_keys, azs)
+        if key[2] == "spot" and key[0] and az and key[4] == "Linux"
+    )
+    keys: List[_PriceKey] = [
+        key + (spot.get((key[0], az)) if key[2] == "spot" else None,)
+        for key, az in zip(price_keys, azs)
+    ]
+    for item, estimate in zip(items, _estimate_fleet(keys)):
+        item.monthly_estimate = estimate
+
+    items.sort(key=lambda x: (x.state != "running", (x.name or "").lower()))
+    return items
+
+
+_inventory = InventoryCache(_load_inventory, _INVENTORY_TTL_SECONDS)
+
+
 # ============================================================================
 # EC2 ENDPOINTS
 # ============================================================================
 
+def _encode_cursor(after: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{offset}:{after}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        offset, after = raw.split(":", 1)
+        return after, int(offset)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
 @app.get("/api/ec2/instances")
 def get_ec2_instances(
     group_by: Optional[str] = Query(None, description="Set to 'cluster' for pre-bucketed response"),
+    state: Optional[str] = Query(None, description="Only instances in this state"),
+    cluster: Optional[str] = Query(None, description=f"Parent cluster name, or '{NO_CLUSTER}' for orphans"),
+    instance_type: Optional[str] = Query(None, alias="instanceType"),
+    az: Optional[str] = Query(None, alias="availabilityZone"),
+    tag: Optional[str] = Query(None, description="Tag key, or key=value"),
+    q: Optional[str] = Query(None, description="Case-insensitive Name substring"),
+    sort: str = Query("default", description=f"One of: {', '.join(SORT_KEYS)}"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit for every match"),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous page"),
 ):
     """
     Get all EC2 instances with details.
@@ -811,87 +1185,51 @@ def get_ec2_instances(
     When `group_by=cluster` is passed, response uses the {groups: [...]}
     shape (cluster buckets + an __orphans__ bucket) so the ComputeTab can
     render section headers without re-grouping client-side.
-    """
-    clients = get_boto_clients()
 
-    try:
-        response = clients["ec2"].describe_instances()
-        instances: List[Dict[str, Any]] = []
-        cluster_summary: Dict[str, Dict[str, Any]] = {}
-        orphan_count = 0
-
-        for reservation in response.get("Reservations", []):
-            for instance in reservation.get("Instances", []):
-                tags_map: Dict[str, str] = {t["Key"]: t["Value"] for t in instance.get("Tags", [])}
-                name = tags_map.get("Name", "")
-
-                # Calculate uptime
-                launch_time = instance.get("LaunchTime")
-                uptime = ""
-                if launch_time:
-                    from datetime import datetime, timezone
-                    now = datetime.now(timezone.utc)
-                    delta = now - launch_time
-                    days = delta.days
-                    hours = delta.seconds // 3600
-                    if days > 0:
-                        uptime = f"{days}d {hours}h"
-                    else:
-                        uptime = f"{hours}h"
-
-                state = instance.get("State", {}).get("Name", "unknown")
-                instance_type = instance.get("InstanceType")
-                lifecycle = instance.get("InstanceLifecycle")  # 'spot' | 'scheduled' | None
-                iam_arn = (instance.get("IamInstanceProfile") or {}).get("Arn")
-
-                parent_cluster, node_role_hint, conflicts = _detect_parent_cluster(tags_map)
-                use_hints = _extract_use_hints(tags_map, iam_arn)
-                hourly, monthly, estimated = _estimate_monthly(instance_type, state, lifecycle)
-
-                item: Dict[str, Any] = {
-                    "instanceId": instance.get("InstanceId"),
-                    "name": name,
-                    "state": state,
-                    "instanceType": instance_type,
-                    "privateIp": instance.get("PrivateIpAddress"),
-                    "publicIp": instance.get("PublicIpAddress"),
-                    "launchTime": str(launch_time) if launch_time else None,
-                    "uptime": uptime,
-                    "availabilityZone": instance.get("Placement", {}).get("AvailabilityZone"),
-                    "vpcId": instance.get("VpcId"),
-                    "subnetId": instance.get("SubnetId"),
-                    "platform": instance.get("PlatformDetails", "Linux/UNIX"),
-                    "architecture": instance.get("Architecture"),
-                    "tags": tags_map,
-                    "parent_cluster": parent_cluster,
-                    "node_role_hint": node_role_hint,
-                    "use_hints": use_hints,
-                    "lifecycle": lifecycle,  # 'spot' | 'scheduled' | None
-                    "monthly_estimate": {
-                        "hourly": hourly,
-                        "monthly": monthly,
-                        "estimated": estimated,
-                    },
-                }
-                if conflicts:
-                    item["parent_cluster_conflict"] = conflicts
+    Optional filters (state, cluster, instanceType, availabilityZone, tag,
+    q), `sort`/`order`, and cursor pagination (`limit` + the `nextCursor`
+    of the previous page) run against the snapshot's indexes. With none of
+    them the response is every instance, as before. `total` is the number
+    of matches across all pages; clusterSummary/orphanCount are always
+    fleet-wide.
 
-                if parent_cluster:
-                    summary = cluster_summary.setdefault(
-                        parent_cluster, {"nodeCount": 0, "instanceTypes": {}}
-                    )
-                    summary["nodeCount"] += 1
-                    if instance_type:
-                        summary["instanceTypes"][instance_type] = (
-                            summary["instanceTypes"].get(instance_type, 0) + 1
-                        )
-                else:
-                    orphan_count += 1
-
-                instances.append(item)
+    Served from the shared inventory snapshot; `snapshotAt` /
+    `snapshotAgeSeconds` say how old the data is.
+    """
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SORT_KEYS)}")
+    after, offset = _decode_cursor(cursor) if cursor else (None, 0)
+    tag_filter: Optional[Tuple[str, Optional[str]]] = None
+    if tag:
+        key, sep, value = tag.partition("=")
+        tag_filter = (key, value if sep else None)
 
-        # Sort by name (running first)
-        instances.sort(key=lambda x: (x["state"] != "running", (x["name"] or "").lower()))
+    try:
+        snapshot = _inventory.get()
+        from datetime import datetime, timezone
+        now = datetime.now(timezone.utc)
+
+        rows, total, next_after = snapshot.query(
+            state=state,
+            cluster=cluster,
+            instance_type=instance_type,
+            az=az,
+            tag=tag_filter,
+            text=q,
+            sort=sort,
+            descending=order == "desc",
+            limit=limit,
+            after=after,
+            offset=offset,
+        )
+        instances: List[Dict[str, Any]] = [inv.to_dict(now) for inv in rows]
+        page: Dict[str, Any] = {
+            "clusterSummary": snapshot.cluster_summary,
+            "orphanCount": snapshot.orphan_count,
+            "total": total,
+            "nextCursor": _encode_cursor(next_after, offset + len(rows)) if next_after else None,
+            **snapshot.staleness(),
+        }
 
         if group_by == "cluster":
             # Two buckets: one per cluster + __orphans__
@@ -909,17 +1247,9 @@ def get_ec2_instances(
                     orphans.append(inst)
             groups: List[Dict[str, Any]] = sorted(groups_by_key.values(), key=lambda g: g["clusterName"])
             groups.append({"key": "__orphans__", "kind": "orphans", "instances": orphans})
-            return {
-                "groups": groups,
-                "clusterSummary": cluster_summary,
-                "orphanCount": orphan_count,
-            }
+            return FastJSONResponse({"groups": groups, **page})
 
-        return {
-            "instances": instances,
-            "clusterSummary": cluster_summary,
-            "orphanCount": orphan_count,
-        }
+        return FastJSONResponse({"instances": instances, **page})
     except Exception as e:
         return {"instances": [], "error": str(e)}
 
@@ -1007,6 +1337,7 @@ def start_ec2_instance(instance_id: str):
 
     try:
         response = clients["ec2"].start_instances(InstanceIds=[instance_id])
+        _inventory.invalidate()
         return {
             "success": True,
             "instanceId": instance_id,
@@ -1024,6 +1355,7 @@ def stop_ec2_instance(instance_id: str):
 
     try:
         response = clients["ec2"].stop_instances(InstanceIds=[instance_id])
+        _inventory.invalidate()
         return {
             "success": True,
             "instanceId": instance_id,
@@ -1052,11 +1384,9 @@ def reboot_ec2_instance(instance_id: str):
 
 @app.get("/api/ec2/summary")
 def get_ec2_summary():
-    """Get EC2 summary statistics."""
-    clients = get_boto_clients()
-
+    """Get EC2 summary statistics (from the shared inventory snapshot)."""
     try:
-        response = clients["ec2"].describe_instances()
+        snapshot = _inventory.get()
 
         summary = {
             "total": 0,
@@ -1068,25 +1398,19 @@ def get_ec2_summary():
             "byAz": {},
         }
 
-        for reservation in response.get("Reservations", []):
-            for instance in reservation.get("Instances", []):
-                state = instance.get("State", {}).get("Name", "unknown")
-                instance_type = instance.get("InstanceType", "unknown")
-                az = instance.get("Placement", {}).get("AvailabilityZone", "unknown")
-
-                summary["total"] += 1
-                if state == "running":
-                    summary["running"] += 1
-                elif state == "stopped":
-                    summary["stopped"] += 1
-                elif state == "pending":
-                    summary["pending"] += 1
-                elif state == "terminated":
-                    summary["terminated"] += 1
-
-                summary["byType"][instance_type] = summary["byType"].get(instance_type, 0) + 1
-                summary["byAz"][az] = summary["byAz"].get(az, 0) + 1
-
+        # Straight off the snapshot's indexes — no per-instance walk.
+        summary["total"] = len(snapshot.instances)
+        state_counts = snapshot.counts("state")
+        for state in ("running", "stopped", "pending", "terminated"):
+            summary[state] = state_counts.get(state, 0)
+        for instance_type, count in snapshot.counts("type").items():
+            key = instance_type or "unknown"
+            summary["byType"][key] = summary["byType"].get(key, 0) + count
+        for az, count in snapshot.counts("az").items():
+            key = az or "unknown"
+            summary["byAz"][key] = summary["byAz"].get(key, 0) + count
+
+        summary.update(snapshot.staleness())
         return summary
     except Exception as e:
         return {"error": str(e)}
@@ -1104,96 +1428,59 @@ def get_ec2_orphans(
     hundreds of nodes. `include_stopped` defaults to False — stopped orphans
     are rarely interesting for cost identification.
     """
-    clients = get_boto_clients()
-
     try:
-        response = clients["ec2"].describe_instances()
-        orphans: List[Dict[str, Any]] = []
+        snapshot = _inventory.get()
+        from datetime import datetime, timezone
+        now = datetime.now(timezone.utc)
+
+        # Index lookup; rows come back in snapshot order (running-first,
+        # then by name).
+        rows, _total, _next = snapshot.query(
+            cluster=NO_CLUSTER, state=None if include_stopped else "running"
+        )
+        orphans: List[Dict[str, Any]] = [inv.to_dict(now) for inv in rows]
+        return FastJSONResponse({"instances": orphans, "count": len(orphans), **snapshot.staleness()})
+    except Exception as e:
+        return {"instances": [], "count": 0, "error": str(e)}
 
-        for reservation in response.get("Reservations", []):
-            for instance in reservation.get("Instances", []):
-                tags_map: Dict[str, str] = {t["Key"]: t["Value"] for t in instance.get("Tags", [])}
-                parent_cluster, _node_role_hint, _conflicts = _detect_parent_cluster(tags_map)
-                if parent_cluster is not None:
-                    continue
 
-                state = instance.get("State", {}).get("Name", "unknown")
-                if state != "running" and not include_stopped:
-                    continue
+# ============================================================================
+# IAM IDENTITY CENTER
+# ============================================================================
+#
+# Users, groups and memberships are served from one in-process directory
+# (see identity_directory.py), reloaded at most every _IDENTITY_TTL_SECONDS
+# and patched in place by the write endpoints below. SSO Admin list calls
+# are paginated, and per-item fan-outs run on a small bounded pool.
+# ============================================================================
 
-                launch_time = instance.get("LaunchTime")
-                uptime = ""
-                if launch_time:
-                    from datetime import datetime, timezone
-                    now = datetime.now(timezone.utc)
-                    delta = now - launch_time
-                    days = delta.days
-                    hours = delta.seconds // 3600
-                    uptime = f"{days}d {hours}h" if days > 0 else f"{hours}h"
-
-                instance_type = instance.get("InstanceType")
-                lifecycle = instance.get("InstanceLifecycle")
-                iam_arn = (instance.get("IamInstanceProfile") or {}).get("Arn")
-                use_hints = _extract_use_hints(tags_map, iam_arn)
-                hourly, monthly, estimated = _estimate_monthly(instance_type, state, lifecycle)
-
-                orphans.append({
-                    "instanceId": instance.get("InstanceId"),
-                    "name": tags_map.get("Name", ""),
-                    "state": state,
-                    "instanceType": instance_type,
-                    "privateIp": instance.get("PrivateIpAddress"),
-                    "publicIp": instance.get("PublicIpAddress"),
-                    "launchTime": str(launch_time) if launch_time else None,
-                    "uptime": uptime,
-                    "availabilityZone": instance.get("Placement", {}).get("AvailabilityZone"),
-                    "vpcId": instance.get("VpcId"),
-                    "subnetId": instance.get("SubnetId"),
-                    "platform": instance.get("PlatformDetails", "Linux/UNIX"),
-                    "architecture": instance.get("Architecture"),
-                    "tags": tags_map,
-                    "parent_cluster": None,
-                    "node_role_hint": None,
-                    "use_hints": use_hints,
-                    "lifecycle": lifecycle,
-                    "monthly_estimate": {
-                        "hourly": hourly,
-                        "monthly": monthly,
-                        "estimated": estimated,
-                    },
-                })
+_IDENTITY_MAX_WORKERS = int(os.environ.get("IDENTITY_MAX_WORKERS", "8"))
+_IDENTITY_TTL_SECONDS = 10 * 60
 
-        orphans.sort(key=lambda x: (x["state"] != "running", (x["name"] or "").lower()))
-        return {"instances": orphans, "count": len(orphans)}
-    except Exception as e:
-        return {"instances": [], "count": 0, "error": str(e)}
+_identity = IdentityDirectory(
+    lambda: get_client("identitystore"),
+    IDENTITY_STORE_ID,
+    ttl_seconds=_IDENTITY_TTL_SECONDS,
+    max_workers=_IDENTITY_MAX_WORKERS,
+)
+
+# Permission sets change far less often than memberships; each request
+# still diffs the ARN list, so additions and removals show up immediately.
+_PERMISSION_SET_TTL_SECONDS = 6 * 60 * 60
+
+_permission_sets = PermissionSetCatalog(
+    lambda: get_client("sso-admin"),
+    SSO_INSTANCE_ARN,
+    ttl_seconds=_PERMISSION_SET_TTL_SECONDS,
+    max_workers=_IDENTITY_MAX_WORKERS,
+)
 
 
 @app.get("/api/users")
 def get_users():
     """Get all IAM Identity Center users."""
-    clients = get_boto_clients()
-
     try:
-        response = clients["identitystore"].list_users(IdentityStoreId=IDENTITY_STORE_ID)
-        users = []
-
-        for user in response.get("Users", []):
-            emails = user.get("Emails", [])
-            primary_email = next((e["Value"] for e in emails if e.get("Primary")), None)
-
-            users.append({
-                "id": user["UserId"],
-                "username": user["UserName"],
-                "displayName": user.get("DisplayName", ""),
-                "givenName": user.get("Name", {}).get("GivenName", ""),
-                "familyName": user.get("Name", {}).get("FamilyName", ""),
-                "email": primary_email,
-                "title": user.get("Title", ""),
-                "userType": user.get("UserType", ""),
-            })
-
-        return {"users": users}
+        return FastJSONResponse({"users": _identity.get().users()})
     except Exception as e:
         return {"users": [], "error": str(e)}
 
@@ -1201,51 +1488,8 @@ def get_users():
 @app.get("/api/groups")
 def get_groups():
     """Get all IAM Identity Center groups with their members."""
-    clients = get_boto_clients()
-
     try:
-        groups_response = clients["identitystore"].list_groups(IdentityStoreId=IDENTITY_STORE_ID)
-        groups = []
-
-        for group in groups_response.get("Groups", []):
-            group_id = group["GroupId"]
-
-            # Get group members
-            members_response = clients["identitystore"].list_group_memberships(
-                IdentityStoreId=IDENTITY_STORE_ID,
-                GroupId=group_id
-            )
-
-            member_ids = [
-                m["MemberId"]["UserId"]
-                for m in members_response.get("GroupMemberships", [])
-            ]
-
-            # Get member details
-            members = []
-            for user_id in member_ids:
-                try:
-                    user = clients["identitystore"].describe_user(
-                        IdentityStoreId=IDENTITY_STORE_ID,
-                        UserId=user_id
-                    )
-                    members.append({
-                        "id": user_id,
-                        "username": user["UserName"],
-                        "displayName": user.get("DisplayName", "")
-                    })
-                except:
-                    pass
-
-            groups.append({
-                "id": group_id,
-                "name": group["DisplayName"],
-                "description": group.get("Description", ""),
-                "memberCount": len(members),
-                "members": members
-            })
-
-        return {"groups": groups}
+        return FastJSONResponse({"groups": _identity.get().groups()})
     except Exception as e:
         return {"groups": [], "error": str(e)}
 
@@ -1253,38 +1497,8 @@ def get_groups():
 @app.get("/api/permission-sets")
 def get_permission_sets():
     """Get all permission sets."""
-    clients = get_boto_clients()
-
     try:
-        ps_response = clients["sso_admin"].list_permission_sets(InstanceArn=SSO_INSTANCE_ARN)
-        permission_sets = []
-
-        for ps_arn in ps_response.get("PermissionSets", []):
-            ps_details = clients["sso_admin"].describe_permission_set(
-                InstanceArn=SSO_INSTANCE_ARN,
-                PermissionSetArn=ps_arn
-            )
-            ps = ps_details["PermissionSet"]
-
-            # Get attached policies
-            try:
-                policies_response = clients["sso_admin"].list_managed_policies_in_permission_set(
-                    InstanceArn=SSO_INSTANCE_ARN,
-                    PermissionSetArn=ps_arn
-                )
-                policies = [p["Name"] for p in policies_response.get("AttachedManagedPolicies", [])]
-            except:
-                policies = []
-
-            permission_sets.append({
-                "arn": ps_arn,
-                "name": ps["Name"],
-                "description": ps.get("Description", ""),
-                "sessionDuration": ps.get("SessionDuration", ""),
-                "policies": policies
-            })
-
-        return {"permissionSets": permission_sets}
+        return FastJSONResponse({"permissionSets": _permission_sets.get()})
     except Exception as e:
         return {"permissionSets": [], "error": str(e)}
 
@@ -1292,61 +1506,38 @@ def get_permission_sets():
 @app.get("/api/account-assignments")
 def get_account_assignments():
     """Get which groups have which permission sets."""
-    clients = get_boto_clients()
+    sso_admin = get_boto_clients()["sso_admin"]
 
     try:
-        # Get all permission sets
-        ps_response = clients["sso_admin"].list_permission_sets(InstanceArn=SSO_INSTANCE_ARN)
-        assignments = []
+        permission_sets = _permission_sets.get()
 
-        for ps_arn in ps_response.get("PermissionSets", []):
-            # Get assignments for this permission set
-            assign_response = clients["sso_admin"].list_account_assignments(
-                InstanceArn=SSO_INSTANCE_ARN,
-                AccountId=ACCOUNT_ID,
-                PermissionSetArn=ps_arn
+        def list_assignments(ps: Dict[str, Any]) -> List[Dict[str, Any]]:
+            return list_all(
+                sso_admin, "list_account_assignments", "AccountAssignments",
+                InstanceArn=SSO_INSTANCE_ARN, AccountId=ACCOUNT_ID, PermissionSetArn=ps["arn"],
             )
 
-            ps_details = clients["sso_admin"].describe_permission_set(
-                InstanceArn=SSO_INSTANCE_ARN,
-                PermissionSetArn=ps_arn
-            )
-            ps_name = ps_details["PermissionSet"]["Name"]
-
-            for assignment in assign_response.get("AccountAssignments", []):
-                principal_id = assignment["PrincipalId"]
-                principal_type = assignment["PrincipalType"]
-
-                # Get principal name
-                principal_name = principal_id
-                if principal_type == "GROUP":
-                    try:
-                        group = clients["identitystore"].describe_group(
-                            IdentityStoreId=IDENTITY_STORE_ID,
-                            GroupId=principal_id
-                        )
-                        principal_name = group["DisplayName"]
-                    except:
-                        pass
-                elif principal_type == "USER":
-                    try:
-                        user = clients["identitystore"].describe_user(
-                            IdentityStoreId=IDENTITY_STORE_ID,
-                            UserId=principal_id
-                        )
-                        principal_name = user.get("DisplayName", user["UserName"])
-                    except:
-                        pass
+        loaded = bounded_map(list_assignments, permission_sets, _IDENTITY_MAX_WORKERS)
 
+        # Each principal is resolved once, however many permission sets
+        # it holds.
+        names = _identity.principal_names(
+            (a["PrincipalType"], a["PrincipalId"]) for rows in loaded for a in rows
+        )
+
+        assignments = []
+        for ps, rows in zip(permission_sets, loaded):
+            for assignment in rows:
+                principal = (assignment["PrincipalType"], assignment["PrincipalId"])
                 assignments.append({
-                    "permissionSetName": ps_name,
-                    "permissionSetArn": ps_arn,
-                    "principalType": principal_type,
-                    "principalId": principal_id,
-                    "principalName": principal_name
+                    "permissionSetName": ps["name"],
+                    "permissionSetArn": ps["arn"],
+                    "principalType": principal[0],
+                    "principalId": principal[1],
+                    "principalName": names[principal]
                 })
 
-        return {"assignments": assignments}
+        return FastJSONResponse({"assignments": assignments})
     except Exception as e:
         return {"assignments": [], "error": str(e)}
 
@@ -1375,6 +1566,15 @@ def create_user(request: CreateUserRequest):
             **({"Title": request.title} if request.title else {}),
             **({"UserType": request.userType} if request.userType else {}),
         )
+        _identity.put_user(user_row({
+            "UserId": response["UserId"],
+            "UserName": request.username,
+            "DisplayName": f"{request.givenName} {request.familyName}",
+            "Name": {"GivenName": request.givenName, "FamilyName": request.familyName},
+            "Emails": [{"Value": request.email, "Primary": True}],
+            "Title": request.title or "",
+            "UserType": request.userType or "",
+        }))
 
         return {
             "success": True,
@@ -1382,6 +1582,8 @@ def create_user(request: CreateUserRequest):
             "message": f"User {request.username} created successfully",
         }
     except clients["identitystore"].exceptions.ConflictException:
+        # Created outside the dashboard; pick it up on the next read.
+        _identity.invalidate()
         raise HTTPException(status_code=409, detail=f"User {request.username} already exists")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1398,6 +1600,7 @@ def add_user_to_group(request: AddUserToGroupRequest):
             GroupId=request.groupId,
             MemberId={"UserId": request.userId},
         )
+        _identity.add_membership(request.groupId, request.userId, response["MembershipId"])
 
         return {
             "success": True,
@@ -1405,6 +1608,7 @@ def add_user_to_group(request: AddUserToGroupRequest):
             "message": "User added to group successfully",
         }
     except clients["identitystore"].exceptions.ConflictException:
+        _identity.invalidate()
         raise HTTPException(status_code=409, detail="User is already a member of this group")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1414,27 +1618,39 @@ def add_user_to_group(request: AddUserToGroupRequest):
 def remove_user_from_group(request: RemoveUserFromGroupRequest):
     """Remove a user from a group."""
     clients = get_boto_clients()
+    not_found = clients["identitystore"].exceptions.ResourceNotFoundException
 
-    try:
-        # First, find the membership ID
-        memberships = clients["identitystore"].list_group_memberships(
+    def delete(membership_id):
+        clients["identitystore"].delete_group_membership(
             IdentityStoreId=IDENTITY_STORE_ID,
-            GroupId=request.groupId,
+            MembershipId=membership_id,
         )
 
-        membership_id = None
-        for membership in memberships.get("GroupMemberships", []):
-            if membership["MemberId"].get("UserId") == request.userId:
-                membership_id = membership["MembershipId"]
-                break
+    try:
+        # Index hit, or a paginated scan of the group if the index misses.
+        membership_id = _identity.indexed_membership_id(request.groupId, request.userId)
+        indexed = membership_id is not None
+        if not indexed:
+            membership_id = _identity.scan_membership_id(request.groupId, request.userId)
 
         if not membership_id:
+            _identity.remove_membership(request.groupId, request.userId)
             raise HTTPException(status_code=404, detail="User is not a member of this group")
 
-        clients["identitystore"].delete_group_membership(
-            IdentityStoreId=IDENTITY_STORE_ID,
-            MembershipId=membership_id,
-        )
+        try:
+            delete(membership_id)
+        except not_found:
+            if not indexed:
+                raise
+            # The indexed id is stale: the membership was removed (and maybe
+            # re-added under a new id) outside the dashboard. Drop it, look
+            # the pair up again and retry once.
+            _identity.remove_membership(request.groupId, request.userId)
+            fresh_id = _identity.scan_membership_id(request.groupId, request.userId)
+            if not fresh_id or fresh_id == membership_id:
+                raise
+            delete(fresh_id)
+        _identity.remove_membership(request.groupId, request.userId)
 
         return {
             "success": True,
@@ -1442,6 +1658,10 @@ def remove_user_from_group(request: RemoveUserFromGroupRequest):
         }
     except HTTPException:
         raise
+    except not_found:
+        # The membership was already removed outside the dashboard.
+        _identity.remove_membership(request.groupId, request.userId)
+        raise HTTPException(status_code=404, detail="User is not a member of this group")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1449,31 +1669,8 @@ def remove_user_from_group(request: RemoveUserFromGroupRequest):
 @app.get("/api/users/{user_id}/groups")
 def get_user_groups(user_id: str):
     """Get all groups a user belongs to."""
-    clients = get_boto_clients()
-
     try:
-        response = clients["identitystore"].list_group_memberships_for_member(
-            IdentityStoreId=IDENTITY_STORE_ID,
-            MemberId={"UserId": user_id},
-        )
-
-        groups = []
-        for membership in response.get("GroupMemberships", []):
-            group_id = membership["GroupId"]
-            try:
-                group = clients["identitystore"].describe_group(
-                    IdentityStoreId=IDENTITY_STORE_ID,
-                    GroupId=group_id,
-                )
-                groups.append({
-                    "id": group_id,
-                    "name": group["DisplayName"],
-                    "membershipId": membership["MembershipId"],
-                })
-            except:
-                pass
-
-        return {"groups": groups}
+        return {"groups": _identity.get().groups_for_user(user_id)}
     except Exception as e:
         return {"groups": [], "error": str(e)}
 
@@ -1629,101 +1826,88 @@ def _rollup_cluster_cost(cluster_name: str, cluster_status: Optional[str]) -> Di
     Compute the honest monthly cost for an EKS cluster:
       control_plane_monthly + node_monthly
 
-    Node cost uses the static us-west-2 on-demand rate table
-    (aws_rates.EC2_MONTHLY_RATES_USD) × 730h/mo, with a per-vCPU fallback and
-    a 0.30× spot multiplier. Stopped instances contribute $0. Rows with
-    an unknown instanceType or a spot lifecycle are flagged estimated=true.
+    Node cost sums each instance's snapshot estimate — the region/OS/tenancy
+    on-demand price from the price book (pricing.py) × 730h/mo, with a
+    per-vCPU fallback. Spot nodes use their recent spot price, or a 0.30×
+    multiplier when none is known. Stopped instances contribute $0. Rows
+    with any estimated instance are flagged estimated=true.
 
-    Node discovery: describe_instances filtered by
-    `tag:kubernetes.io/cluster/<name>=owned` OR `tag:aws:eks:cluster-name=<name>`.
-    Rather than issue two calls we do one filter on the kubernetes.io tag
-    (present on both managed + self-managed nodes) and then re-check the
-    managed tag in-Python so nothing slips through.
+    Node discovery: looks up instances tagged
+    `kubernetes.io/cluster/<name>=owned` OR `aws:eks:cluster-name=<name>`
+    (managed nodes carry both, self-managed nodes only the first) in the
+    shared inventory snapshot's tag index.
     """
-    ec2 = boto3.client("ec2")
-
-    # Membership filter — the kubernetes.io/cluster/<X>=owned tag is present
-    # on both managed and self-managed EKS nodes. Managed nodes ALSO carry
-    # aws:eks:cluster-name, so we OR the two filters via two calls only when
-    # needed. Start with the k8s.io tag which covers ~everything.
-    running_types: Dict[str, Dict[str, Any]] = {}
+    running_types: Dict[Tuple[str, str], Dict[str, Any]] = {}
     running_count = 0
     total_count = 0
-    seen_instance_ids: set = set()
-
-    def _consume(reservations: List[Dict[str, Any]]) -> None:
-        nonlocal running_count, total_count
-        for reservation in reservations:
-            for instance in reservation.get("Instances", []):
-                iid = instance.get("InstanceId")
-                if not iid or iid in seen_instance_ids:
-                    continue
-                seen_instance_ids.add(iid)
-                state = instance.get("State", {}).get("Name", "unknown")
-                if state == "terminated":
-                    continue
-                total_count += 1
-                instance_type = instance.get("InstanceType") or "unknown"
-                lifecycle = instance.get("InstanceLifecycle")
-                capacity_type = "SPOT" if lifecycle == "spot" else "ON_DEMAND"
-                key = (instance_type, capacity_type)
-                bucket = running_types.setdefault(
-                    key,
-                    {
-                        "instanceType": instance_type,
-                        "capacityType": capacity_type,
-                        "count": 0,
-                        "runningCount": 0,
-                    },
-                )
-                bucket["count"] += 1
-                if state == "running":
-                    bucket["runningCount"] += 1
-                    running_count += 1
+    owned_tag = f"kubernetes.io/cluster/{cluster_name}"
 
+    snapshot = None
     try:
-        resp = ec2.describe_instances(
-            Filters=[
-                {"Name": f"tag:kubernetes.io/cluster/{cluster_name}", "Values": ["owned"]}
-            ]
-        )
-        _consume(resp.get("Reservations", []))
+        snapshot = _inventory.get()
     except Exception:
         pass
 
-    try:
-        resp2 = ec2.describe_instances(
-            Filters=[
-                {"Name": "tag:aws:eks:cluster-name", "Values": [cluster_name]}
-            ]
+    nodes: Dict[str, InstanceRecord] = {}
+    if snapshot is not None:
+        for inv in snapshot.with_tag(owned_tag, "owned") + snapshot.with_tag("aws:eks:cluster-name", cluster_name):
+            nodes[inv.instance_id] = inv
+
+    for inv in nodes.values():
+        state = inv.state
+        if state == "terminated":
+            continue
+        total_count += 1
+        instance_type = inv.instance_type or "unknown"
+        capacity_type = "SPOT" if inv.lifecycle == "spot" else "ON_DEMAND"
+        estimate = inv.monthly_estimate
+        key = (instance_type, capacity_type)
+        bucket = running_types.setdefault(
+            key,
+            {
+                "instanceType": instance_type,
+                "capacityType": capacity_type,
+                "count": 0,
+                "runningCount": 0,
+                "hourlySum": 0.0,
+                "runningHourlySum": 0.0,
+                "monthly": 0.0,
+                "estimated": False,
+            },
         )
-        _consume(resp2.get("Reservations", []))
-    except Exception:
-        pass
+        bucket["count"] += 1
+        bucket["hourlySum"] += estimate["hourly"]
+        bucket["estimated"] = bucket["estimated"] or estimate["estimated"]
+        if state == "running":
+            bucket["runningCount"] += 1
+            bucket["runningHourlySum"] += estimate["hourly"]
+            bucket["monthly"] += estimate["monthly"]
+            running_count += 1
 
     # Materialize per-type rows using the running count for monthly math.
     node_types: List[Dict[str, Any]] = []
     node_monthly_total = 0.0
     any_estimated = False
     for _key, bucket in running_types.items():
-        instance_type = bucket["instanceType"]
-        capacity_type = bucket["capacityType"]
-        running = bucket["runningCount"]
-        lifecycle = "spot" if capacity_type == "SPOT" else None
-        # Use "running" so the fallback returns non-zero hourly, then multiply by running count.
-        hourly, monthly_per_instance, estimated = _estimate_monthly(instance_type, "running", lifecycle)
-        row_monthly = round(monthly_per_instance * running, 2)
+        row_monthly = round(bucket["monthly"], 2)
         node_monthly_total += row_monthly
-        if estimated:
+        if bucket["estimated"]:
             any_estimated = True
+        # Per-instance rate behind the row's monthly figure: instances of one
+        # type can be priced differently (region, OS, spot price), so it is
+        # the mean over the running ones (over all of them if none run).
+        if bucket["runningCount"]:
+            row_hourly = bucket["runningHourlySum"] / bucket["runningCount"]
+        else:
+            row_hourly = bucket["hourlySum"] / bucket["count"]
         node_types.append({
-            "instanceType": instance_type,
+            "instanceType": bucket["instanceType"],
             "count": bucket["count"],
-            "runningCount": running,
-            "hourly": hourly,
+            "runningCount": bucket["runningCount"],
+            "hourly": round(row_hourly, 6),
             "monthly": row_monthly,
-            "capacityType": capacity_type,
-            "estimated": estimated,
+            "capacityType": bucket["capacityType"],
+            "estimated": bucket["estimated"],
         })
 
     node_types.sort(key=lambda r: (-r["monthly"], r["instanceType"]))
@@ -1746,6 +1930,7 @@ def _rollup_cluster_cost(cluster_name: str, cluster_status: Optional[str]) -> Di
         "estimated": any_estimated,
         "currency": "USD",
         "asOf": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+        **(snapshot.staleness() if snapshot is not None else {}),
     }
 
 
@@ -1759,8 +1944,8 @@ def get_eks_cluster_cost_rollup(cluster_name: str):
     only. This endpoint is the transparency rollup the ClusterTab needs to
     show the operator what the cluster ACTUALLY costs each month.
 
-    Node cost is estimated from a static on-demand rate table (see
-    aws_rates.py) — actual billing may differ due to Savings Plans,
+    Node cost is estimated from the on-demand price book (see pricing.py)
+    — actual billing may differ due to Savings Plans,
     Reserved Instances, or spot price float. The `estimated` flag is true
     if any row used a fallback.
     """
@@ -1823,7 +2008,7 @@ def get_eks_cluster_costs(cluster_name: str):
                             {
                                 "Dimensions": {
                                     "Key": "SERVICE",
-                                    "Values": ["Amazon Elastic Container Service for Kubernetes"]
+                                    "Values": [_EKS_SERVICE_NAME]
                                 }
                             },
                             {
@@ -1844,22 +2029,12 @@ def get_eks_cluster_costs(cluster_name: str):
             except Exception:
                 # If tag-based filtering fails, try service-level cost divided by cluster count
                 try:
-                    cost_response = clients["ce"].get_cost_and_usage(
-                        TimePeriod={"Start": start_date, "End": end_date},
-                        Granularity="DAILY" if days <= 7 else "MONTHLY",
-                        Metrics=["UnblendedCost"],
-                        Filter={
-                            "Dimensions": {
-                                "Key": "SERVICE",
-                                "Values": ["Amazon Elastic Container Service for Kubernetes"]
-                            }
-                        }
+                    total_cost = _cost_cube.get().total(
+                        (datetime.now() - timedelta(days=days)).date(),
+                        datetime.now().date(),
+                        service=_EKS_SERVICE_NAME,
                     )
 
-                    total_cost = 0
-                    for result in cost_response.get("ResultsByTime", []):
-                        total_cost += float(result.get("Total", {}).get("UnblendedCost", {}).get("Amount", 0))
-
                     # Get cluster count to estimate per-cluster cost
                     clusters_response = clients["eks"].list_clusters()
                     cluster_count = len(clusters_response.get("clusters", [])) or 1
@@ -1889,10 +2064,10 @@ def get_all_eks_costs(
     controlPlaneMonthly / nodeMonthly / totalMonthly plus a top-level
     grandTotalMonthly — the honest number the operator wants to see.
 
-    Node cost is computed via a static us-west-2 on-demand rate table
-    × 730h/mo × running instance count. We make ONE describe_instances call
-    (no filter) and partition by cluster in-Python so we don't pay N calls
-    when there are many clusters.
+    Node cost sums the snapshot's per-instance estimates (region/OS/tenancy
+    on-demand price × 730h/mo) over running instances. Nodes come from the
+    shared EC2 inventory snapshot's per-cluster index, so we don't pay N
+    calls when there are many clusters.
     """
     clients = get_boto_clients()
     from datetime import datetime, timedelta, timezone
@@ -1912,8 +2087,8 @@ def get_all_eks_costs(
             except Exception:
                 cluster_statuses[name] = ""
 
-        # Get total EKS costs
-        end_date = datetime.now().strftime("%Y-%m-%d")
+        # Total EKS service costs, sliced from the shared cost cube
+        end = datetime.now().date()
 
         periods = {
             "last30Days": 30,
@@ -1922,29 +2097,14 @@ def get_all_eks_costs(
         }
 
         total_costs = {}
-        for period_name, period_days in periods.items():
-            start_date = (datetime.now() - timedelta(days=period_days)).strftime("%Y-%m-%d")
-
-            try:
-                cost_response = clients["ce"].get_cost_and_usage(
-                    TimePeriod={"Start": start_date, "End": end_date},
-                    Granularity="DAILY" if period_days <= 7 else "MONTHLY",
-                    Metrics=["UnblendedCost"],
-                    Filter={
-                        "Dimensions": {
-                            "Key": "SERVICE",
-                            "Values": ["Amazon Elastic Container Service for Kubernetes"]
-                        }
-                    }
+        try:
+            cube = _cost_cube.get()
+            for period_name, period_days in periods.items():
+                total_costs[period_name] = round(
+                    cube.total(end - timedelta(days=period_days), end, service=_EKS_SERVICE_NAME), 2
                 )
-
-                total_cost = 0
-                for result in cost_response.get("ResultsByTime", []):
-                    total_cost += float(result.get("Total", {}).get("UnblendedCost", {}).get("Amount", 0))
-
-                total_costs[period_name] = round(total_cost, 2)
-            except Exception:
-                total_costs[period_name] = None
+        except Exception:
+            total_costs = {period_name: None for period_name in periods}
 
         # Estimate per-cluster CE costs (rough — CE control-plane spend split evenly)
         cluster_count = len(cluster_names) or 1
@@ -1957,9 +2117,10 @@ def get_all_eks_costs(
             }
 
         grand_total_monthly: Optional[float] = None
+        snapshot = None
 
         if withNodes and cluster_names:
-            # ONE describe_instances call, partition per cluster in-Python.
+            # Per-cluster nodes come from the snapshot's cluster index.
             # Rows shape per cluster:
             #   {instanceType, capacityType, count, runningCount, hourly, monthly, estimated}
             per_cluster_nodes: Dict[str, Dict[Tuple[str, str], Dict[str, Any]]] = {
@@ -1968,31 +2129,22 @@ def get_all_eks_costs(
             unknown_cluster_membership: Dict[str, int] = {}
 
             try:
-                ec2_resp = clients["ec2"].describe_instances()
-                for reservation in ec2_resp.get("Reservations", []):
-                    for instance in reservation.get("Instances", []):
-                        state = instance.get("State", {}).get("Name", "unknown")
+                snapshot = _inventory.get()
+                for parent in snapshot.clusters():
+                    if parent not in per_cluster_nodes:
+                        # Self-managed / unrecognized-cluster tag — track separately
+                        # so ClusterTab doesn't corrupt real cluster totals.
+                        live = sum(1 for inv in snapshot.in_cluster(parent) if inv.state != "terminated")
+                        if live:
+                            unknown_cluster_membership[parent] = live
+                for parent, buckets in per_cluster_nodes.items():
+                    for inv in snapshot.in_cluster(parent):
+                        state = inv.state
                         if state == "terminated":
                             continue
-                        tags_map: Dict[str, str] = {
-                            t["Key"]: t["Value"] for t in instance.get("Tags", [])
-                        }
-                        parent, _hint, _conflicts = _detect_parent_cluster(tags_map)
-                        if not parent:
-                            continue
-                        instance_type = instance.get("InstanceType") or "unknown"
-                        lifecycle = instance.get("InstanceLifecycle")
-                        capacity_type = "SPOT" if lifecycle == "spot" else "ON_DEMAND"
-
-                        if parent not in per_cluster_nodes:
-                            # Self-managed / unrecognized-cluster tag — track separately
-                            # so ClusterTab doesn't corrupt real cluster totals.
-                            unknown_cluster_membership[parent] = (
-                                unknown_cluster_membership.get(parent, 0) + 1
-                            )
-                            continue
+                        instance_type = inv.instance_type or "unknown"
+                        capacity_type = "SPOT" if inv.lifecycle == "spot" else "ON_DEMAND"
 
-                        buckets = per_cluster_nodes[parent]
                         key = (instance_type, capacity_type)
                         bucket = buckets.setdefault(
                             key,
@@ -2001,11 +2153,16 @@ def get_all_eks_costs(
                                 "capacityType": capacity_type,
                                 "count": 0,
                                 "runningCount": 0,
+                                "monthly": 0.0,
+                                "estimated": False,
                             },
                         )
+                        estimate = inv.monthly_estimate
                         bucket["count"] += 1
+                        bucket["estimated"] = bucket["estimated"] or estimate["estimated"]
                         if state == "running":
                             bucket["runningCount"] += 1
+                            bucket["monthly"] += estimate["monthly"]
             except Exception:
                 # If describe_instances fails, leave per_cluster_nodes empty —
                 # node fields will show 0 with estimated=true.
@@ -2018,16 +2175,11 @@ def get_all_eks_costs(
                 node_count = 0
                 running_count = 0
                 for _key, bucket in per_cluster_nodes.get(name, {}).items():
-                    running = bucket["runningCount"]
-                    lifecycle = "spot" if bucket["capacityType"] == "SPOT" else None
-                    _hourly, per_instance_monthly, estimated = _estimate_monthly(
-                        bucket["instanceType"], "running", lifecycle
-                    )
-                    node_monthly_total += per_instance_monthly * running
-                    if estimated:
+                    node_monthly_total += bucket["monthly"]
+                    if bucket["estimated"]:
                         any_estimated = True
                     node_count += bucket["count"]
-                    running_count += running
+                    running_count += bucket["runningCount"]
 
                 non_billable = (cluster_statuses.get(name) or "").upper() in {
                     "CREATING",
@@ -2059,6 +2211,8 @@ def get_all_eks_costs(
         }
         if grand_total_monthly is not None:
             result["grandTotalMonthly"] = grand_total_monthly
+        if snapshot is not None:
+            result.update(snapshot.staleness())
         return result
     except Exception as e:
         return {"totalCosts": {}, "perClusterCosts": {}, "error": str(e)}
@@ -2450,7 +2604,7 @@ def get_all_pods(context: str):
             "containers": [c.get("name") for c in spec.get("containers", [])],
         })
 
-    return {"pods": pods}
+    return FastJSONResponse({"pods": pods})
 
 
 @app.get("/api/clusters/{context}/all-deployments")
@@ -0,0 +1,89 @@
+"""
+Permission-set catalog shared by /api/permission-sets and
+/api/account-assignments.
+
+Both endpoints used to call describe_permission_set for every ARN on every
+request, and /api/permission-sets also listed each one's managed policies,
+although permission sets almost never change. The catalog instead:
+
+  - Lists the ARNs on each sync (one paginated list_permission_sets) and
+    diffs them against what it holds: only new ARNs are hydrated, removed
+    ones are dropped. A repeat load with nothing changed costs that one
+    list call.
+  - Hydrates (describe_permission_set + list_managed_policies_in_permission_set)
+    concurrently on a bounded pool, and re-hydrates an entry once it is
+    older than the TTL so edits to an existing set are picked up.
+  - Syncs single-flight, so concurrent requests share one list call.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from identity_directory import bounded_map, list_all
+from singleflight import SingleFlight
+
+
+class PermissionSetCatalog:
+    """ARN -> permission-set row, kept in sync with list_permission_sets."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        instance_arn: str,
+        ttl_seconds: float,
+        max_workers: int,
+    ) -> None:
+        self._client_factory = client_factory
+        self._instance_arn = instance_arn
+        self._ttl = ttl_seconds
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        # arn -> (hydrated_at, row)
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._flight = SingleFlight()
+
+    def get(self) -> List[Dict[str, Any]]:
+        """Every permission set, in list_permission_sets order, as
+        {arn, name, description, sessionDuration, policies}."""
+        return self._flight.do("sync", self._sync)
+
+    def _sync(self) -> List[Dict[str, Any]]:
+        sso_admin = self._client_factory()
+        arns = list_all(sso_admin, "list_permission_sets", "PermissionSets", InstanceArn=self._instance_arn)
+
+        now = time.time()
+        with self._lock:
+            stale = [
+                arn for arn in arns
+                if arn not in self._entries or now - self._entries[arn][0] > self._ttl
+            ]
+        hydrated = bounded_map(lambda arn: self._hydrate(sso_admin, arn), stale, self._max_workers)
+
+        with self._lock:
+            for arn, row in zip(stale, hydrated):
+                self._entries[arn] = (now, row)
+            self._entries = {arn: self._entries[arn] for arn in arns}
+            return [entry[1] for entry in self._entries.values()]
+
+    def _hydrate(self, sso_admin, arn: str) -> Dict[str, Any]:
+        ps = sso_admin.describe_permission_set(
+            InstanceArn=self._instance_arn, PermissionSetArn=arn
+        )["PermissionSet"]
+        try:
+            policies = [
+                p["Name"]
+                for p in list_all(
+                    sso_admin, "list_managed_policies_in_permission_set", "AttachedManagedPolicies",
+                    InstanceArn=self._instance_arn, PermissionSetArn=arn,
+                )
+            ]
+        except Exception:
+            policies = []
+        return {
+            "arn": arn,
+            "name": ps["Name"],
+            "description": ps.get("Description", ""),
+            "sessionDuration": ps.get("SessionDuration", ""),
+            "policies": policies,
+        }
@@ -0,0 +1,311 @@
+"""
+EC2 on-demand price book: region × OS × tenancy × instance type → hourly USD.
+
+aws_rates.py only knows us-west-2 Linux prices for the ~50 types we run;
+everything else fell through to a per-vCPU guess. The price book instead
+loads a preprocessed snapshot of the public AWS bulk price list
+(data/ec2_prices.json.gz) into a compact indexed form:
+
+  - one interned type list and a type -> column dict, shared by every table;
+  - one array('d') per (region, os, tenancy), NaN where AWS has no price.
+
+A lookup is two dict hits and an array index. Loading is bounded: the
+decompressed snapshot may not exceed MAX_SNAPSHOT_BYTES, the resulting
+tables may not exceed MAX_TABLE_BYTES and the whole load may not take
+longer than LOAD_BUDGET_SECONDS, otherwise load() raises
+PriceBookBudgetError and callers fall back to from_rate_table().
+
+Build the snapshot from the public bulk price list, every region and OS by
+default (it streams each region's CSV offer file, a few hundred MB apiece,
+row by row rather than loading it):
+
+    python pricing.py --refresh [--region us-west-2 ...]
+
+or from offer files downloaded beforehand, e.g. at image build time
+(https://pricing.us-east-1.amazonaws.com/offers/v1.0/aws/AmazonEC2/current/<region>/index.csv):
+
+    python pricing.py --csv us-east-1=us-east-1.csv --csv us-west-2=us-west-2.csv
+
+or seed it from the static aws_rates table with `python pricing.py --from-rates`.
+"""
+
+import csv
+import gzip
+import io
+import json
+import math
+import re
+import sys
+import time
+import urllib.request
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+SNAPSHOT_PATH = Path(__file__).parent / "data" / "ec2_prices.json.gz"
+MAX_SNAPSHOT_BYTES = 64 * 1024 * 1024
+MAX_TABLE_BYTES = 32 * 1024 * 1024
+LOAD_BUDGET_SECONDS = 2.0
+
+DEFAULT_REGION = "us-west-2"
+DEFAULT_OS = "Linux"
+DEFAULT_TENANCY = "Shared"
+
+_BULK_BASE = "https://pricing.us-east-1.amazonaws.com"
+_REGION_INDEX = "/offers/v1.0/aws/AmazonEC2/current/region_index.json"
+
+# EC2 PlatformDetails -> price-list operatingSystem.
+_OS_BY_PLATFORM = {
+    "linux/unix": "Linux",
+    "red hat enterprise linux": "RHEL",
+    "suse linux": "SUSE",
+    "ubuntu pro": "Ubuntu Pro",
+    "windows": "Windows",
+}
+# Placement.Tenancy -> price-list tenancy.
+_TENANCY = {"default": "Shared", "dedicated": "Dedicated", "host": "Host"}
+_REGION_RE = re.compile(r"^([a-z]{2}(?:-gov)?-[a-z]+-\d+)")
+
+
+class PriceBookBudgetError(Exception):
+    """The snapshot is larger than the configured load/memory budget."""
+
+
+def os_for_platform(platform_details: Optional[str]) -> str:
+    if not platform_details:
+        return DEFAULT_OS
+    key = platform_details.lower()
+    if key.startswith("windows"):
+        return "Windows"
+    for prefix, os_name in _OS_BY_PLATFORM.items():
+        if key.startswith(prefix):
+            return os_name
+    return DEFAULT_OS
+
+
+def tenancy_for_placement(tenancy: Optional[str]) -> str:
+    return _TENANCY.get((tenancy or "").lower(), DEFAULT_TENANCY)
+
+
+def region_for_az(availability_zone: Optional[str]) -> Optional[str]:
+    """us-west-2a -> us-west-2 (local/wavelength zones map to their parent)."""
+    m = _REGION_RE.match(availability_zone or "")
+    return m.group(1) if m else None
+
+
+class PriceBook:
+    """Immutable, indexed on-demand price lookup."""
+
+    def __init__(
+        self,
+        types: List[str],
+        tables: Dict[Tuple[str, str, str], array],
+        source: str,
+        generated_at: Optional[str] = None,
+        load_seconds: float = 0.0,
+    ) -> None:
+        self.types = types
+        self._columns = {name: i for i, name in enumerate(types)}
+        self._tables = tables
+        self.source = source
+        self.generated_at = generated_at
+        self.load_seconds = load_seconds
+
+    @classmethod
+    def from_rate_table(cls, rates: Dict[str, float], region: str = DEFAULT_REGION) -> "PriceBook":
+        """Single-table book for `region`/Linux/Shared (the aws_rates table)."""
+        types = sorted(rates)
+        table = array("d", (rates[t] for t in types))
+        return cls(types, {(region, DEFAULT_OS, DEFAULT_TENANCY): table}, source="aws_rates")
+
+    def hourly(
+        self,
+        instance_type: str,
+        region: Optional[str] = None,
+        os_name: Optional[str] = None,
+        tenancy: Optional[str] = None,
+    ) -> Optional[float]:
+        """On-demand USD/hr, or None if the book has no price for it."""
+        col = self._columns.get(instance_type)
+        if col is None:
+            return None
+        table = self._tables.get((region or DEFAULT_REGION, os_name or DEFAULT_OS, tenancy or DEFAULT_TENANCY))
+        if table is None:
+            return None
+        price = table[col]
+        return None if math.isnan(price) else price
+
+    def table_bytes(self) -> int:
+        return sum(t.itemsize * len(t) for t in self._tables.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "generatedAt": self.generated_at,
+            "types": len(self.types),
+            "tables": len(self._tables),
+            "tableBytes": self.table_bytes(),
+            "loadSeconds": round(self.load_seconds, 3),
+        }
+
+
+def load(path: Path = SNAPSHOT_PATH) -> PriceBook:
+    """Load the gzipped snapshot, enforcing the size budgets."""
+    started = time.perf_counter()
+    with gzip.open(path, "rb") as f:
+        raw = f.read(MAX_SNAPSHOT_BYTES + 1)
+    if len(raw) > MAX_SNAPSHOT_BYTES:
+        raise PriceBookBudgetError(f"{path} decompresses past {MAX_SNAPSHOT_BYTES} bytes")
+    data = json.loads(raw)
+    del raw
+
+    types = [sys.intern(t) for t in data["types"]]
+    width = len(types)
+    if width * 8 * len(data["prices"]) > MAX_TABLE_BYTES:
+        raise PriceBookBudgetError(f"{path} needs more than {MAX_TABLE_BYTES} bytes of price tables")
+    tables: Dict[Tuple[str, str, str], array] = {}
+    for key, prices in data["prices"].items():
+        if time.perf_counter() - started > LOAD_BUDGET_SECONDS:
+            raise PriceBookBudgetError(f"{path} takes longer than {LOAD_BUDGET_SECONDS}s to load")
+        region, os_name, tenancy = (sys.intern(p) for p in key.split("|"))
+        tables[(region, os_name, tenancy)] = array(
+            "d", (math.nan if p is None else p for p in prices)
+        )
+
+    load_seconds = time.perf_counter() - started
+    if load_seconds > LOAD_BUDGET_SECONDS:
+        raise PriceBookBudgetError(f"{path} took {load_seconds:.2f}s to load (budget {LOAD_BUDGET_SECONDS}s)")
+    return PriceBook(
+        types, tables, source=data.get("source", "snapshot"),
+        generated_at=data.get("generated_at"), load_seconds=load_seconds,
+    )
+
+
+def write_snapshot(
+    prices: Dict[Tuple[str, str, str], Dict[str, float]],
+    source: str,
+    path: Path = SNAPSHOT_PATH,
+) -> None:
+    """prices[(region, os, tenancy)][instance_type] = hourly USD."""
+    types = sorted({t for table in prices.values() for t in table})
+    data = {
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "source": source,
+        "types": types,
+        "prices": {
+            "|".join(key): [table.get(t) for t in types]
+            for key, table in sorted(prices.items())
+        },
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt") as f:
+        json.dump(data, f, separators=(",", ":"))
+
+
+def _get_json(url: str) -> Any:
+    with urllib.request.urlopen(url, timeout=300) as resp:
+        return json.load(resp)
+
+
+Prices = Dict[Tuple[str, str, str], Dict[str, float]]
+
+
+def _column(name: str) -> str:
+    """Offer-file column/attribute name -> comparable key: the CSV says
+    "Pre Installed S/W" and "Location Type" where the JSON says
+    preInstalledSw and locationType."""
+    return re.sub(r"[^a-z]", "", name.lower())
+
+
+def parse_offer_csv(region: str, lines: TextIO, prices: Optional[Prices] = None) -> Prices:
+    """Add one region's on-demand Compute Instance prices from its CSV offer
+    file to `prices`, one row at a time.
+
+    Only plain capacity with no pre-installed software or BYOL licence, in
+    the region itself: a region's offer file also lists its Local Zones and
+    Wavelength Zones under the same (region, os, tenancy, type) key."""
+    prices = {} if prices is None else prices
+    rows = csv.reader(lines)
+    # A few "FormatVersion"/"Publication Date"/... lines precede the header.
+    header = next((row for row in rows if row and row[0] == "SKU"), None)
+    if header is None:
+        raise ValueError(f"{region}: no header row in the offer file")
+    col = {_column(name): i for i, name in enumerate(header)}
+    (
+        term_type, family, location_type, pre_installed, capacity, license_model,
+        tenancy_col, os_col, type_col, unit, currency, usd_col,
+    ) = (
+        col[_column(name)] for name in (
+            "TermType", "Product Family", "Location Type", "Pre Installed S/W", "CapacityStatus",
+            "License Model", "Tenancy", "Operating System", "Instance Type", "Unit", "Currency",
+            "PricePerUnit",
+        )
+    )
+    width = max(col.values()) + 1
+    for row in rows:
+        if (
+            len(row) < width
+            or row[term_type] != "OnDemand"
+            or row[family] != "Compute Instance"
+            or row[location_type] != "AWS Region"
+            or row[pre_installed] != "NA"
+            or row[capacity] != "Used"
+            or row[license_model] == "Bring your own license"
+            or row[unit] != "Hrs"
+            or row[currency] != "USD"
+        ):
+            continue
+        usd = float(row[usd_col])
+        tenancy = row[tenancy_col]
+        # Instances on a Dedicated Host are listed at $0 — the host is
+        # what's billed — which isn't a real price.
+        if tenancy == "Host" and usd == 0:
+            continue
+        key = (sys.intern(region), sys.intern(row[os_col]), sys.intern(tenancy))
+        prices.setdefault(key, {})[sys.intern(row[type_col])] = usd
+    return prices
+
+
+def fetch_bulk_prices(regions: Optional[Iterable[str]] = None) -> Prices:
+    """On-demand Compute Instance prices from the public bulk price list,
+    streaming each region's CSV offer file through parse_offer_csv."""
+    index = _get_json(_BULK_BASE + _REGION_INDEX)["regions"]
+    wanted = set(regions) if regions else set(index)
+    prices: Prices = {}
+    for region in sorted(wanted & set(index)):
+        url = _BULK_BASE + index[region]["currentVersionUrl"].replace("/index.json", "/index.csv")
+        with urllib.request.urlopen(url, timeout=300) as resp:
+            parse_offer_csv(region, io.TextIOWrapper(resp, encoding="utf-8", newline=""), prices)
+    return prices
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["--from-rates"]:
+        from aws_rates import EC2_MONTHLY_RATES_USD
+
+        write_snapshot({(DEFAULT_REGION, DEFAULT_OS, DEFAULT_TENANCY): dict(EC2_MONTHLY_RATES_USD)}, "aws_rates")
+    elif args[:1] == ["--refresh"]:
+        regions = [args[i + 1] for i, a in enumerate(args) if a == "--region" and i + 1 < len(args)]
+        bulk = fetch_bulk_prices(regions or None)
+        if not bulk:
+            sys.exit("bulk price list returned nothing; snapshot left unchanged")
+        write_snapshot(bulk, "aws-bulk-price-list")
+    elif args[:1] == ["--csv"]:
+        bulk = {}
+        for i, a in enumerate(args):
+            if a == "--csv" and i + 1 < len(args):
+                region, _, csv_path = args[i + 1].partition("=")
+                with open(csv_path, newline="", encoding="utf-8") as f:
+                    parse_offer_csv(region, f, bulk)
+        if not bulk:
+            sys.exit("offer files held no on-demand prices; snapshot left unchanged")
+        write_snapshot(bulk, "aws-bulk-price-list")
+    else:
+        sys.exit(
+            "usage: python pricing.py --refresh [--region REGION ...]"
+            " | --csv REGION=PATH [--csv REGION=PATH ...] | --from-rates"
+        )
+    book = load()
+    print(f"wrote {SNAPSHOT_PATH}: {book.stats()}")
@@ -0,0 +1,121 @@
+"""
+Recent spot prices for the (instance type, AZ) pairs the fleet actually runs.
+
+_estimate_monthly used to price every spot instance at a flat 0.30× of
+on-demand and flag it estimated. This module looks up the real market price
+instead:
+
+  - Pairs are batched per AZ: one paginated describe_spot_price_history call
+    per AZ with every type we run there, not one call per instance.
+  - Each pair's price is the time-weighted average of the Linux/UNIX price
+    over the last WINDOW_HOURS: every change point holds until the next one
+    (the last until now), and the point in effect at the window start — the
+    history includes it, so a quiet market still yields one — counts from
+    the window start.
+  - Results — including "no price" — are cached per pair for the TTL, and
+    fetches are single-flight, so each distinct pair is fetched at most once
+    per refresh however many spot nodes share it.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from singleflight import SingleFlight
+
+WINDOW_HOURS = 6
+PRODUCT_DESCRIPTION = "Linux/UNIX"
+
+Pair = Tuple[str, str]  # (instance_type, availability_zone)
+
+
+def weighted_average(points: List[Tuple[datetime, float]], start: datetime, end: datetime) -> Optional[float]:
+    """Average of a step series of (timestamp, price) change points over
+    [start, end), each price weighted by how long it held."""
+    if not points:
+        return None
+    points = sorted(points)
+    total = weighted = 0.0
+    for i, (at, price) in enumerate(points):
+        held_from = max(at, start)
+        held_to = points[i + 1][0] if i + 1 < len(points) else end
+        seconds = (min(held_to, end) - held_from).total_seconds()
+        if seconds > 0:
+            total += seconds
+            weighted += price * seconds
+    if total == 0:
+        return points[-1][1]
+    return weighted / total
+
+
+class SpotPriceCache:
+    """TTL cache of recent average spot prices keyed by (type, AZ)."""
+
+    def __init__(self, client_factory: Callable[[str], Any], ttl_seconds: float) -> None:
+        # client_factory(availability_zone) -> EC2 client for that AZ's region
+        self._client_factory = client_factory
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._prices: Dict[Pair, Tuple[float, Optional[float]]] = {}
+        self._flight = SingleFlight()
+        self.fetches = 0
+
+    def _cached(self, pair: Pair, now: float) -> Tuple[bool, Optional[float]]:
+        entry = self._prices.get(pair)
+        if entry is None or now - entry[0] > self._ttl:
+            return False, None
+        return True, entry[1]
+
+    def prices(self, pairs: Iterable[Pair]) -> Dict[Pair, Optional[float]]:
+        """Recent average USD/hr per pair; None where no price is known."""
+        wanted = set(pairs)
+        out: Dict[Pair, Optional[float]] = {}
+        stale: Dict[str, List[str]] = {}
+        now = time.time()
+        with self._lock:
+            for pair in wanted:
+                hit, price = self._cached(pair, now)
+                if hit:
+                    out[pair] = price
+                else:
+                    stale.setdefault(pair[1], []).append(pair[0])
+        for az, types in stale.items():
+            key = (az, tuple(sorted(types)))
+            out.update(self._flight.do(key, lambda az=az, types=key[1]: self._fetch_az(az, types)))
+        return out
+
+    def _fetch_az(self, az: str, types: Tuple[str, ...]) -> Dict[Pair, Optional[float]]:
+        points: Dict[str, List[Tuple[datetime, float]]] = {t: [] for t in types}
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(hours=WINDOW_HOURS)
+        try:
+            ec2 = self._client_factory(az)
+            paginator = ec2.get_paginator("describe_spot_price_history")
+            for page in paginator.paginate(
+                AvailabilityZone=az,
+                InstanceTypes=list(types),
+                ProductDescriptions=[PRODUCT_DESCRIPTION],
+                StartTime=start,
+            ):
+                for point in page.get("SpotPriceHistory", []):
+                    series = points.get(point.get("InstanceType"))
+                    if series is not None:
+                        series.append((point["Timestamp"], float(point["SpotPrice"])))
+        except Exception:
+            # Leave the series empty — callers fall back to the multiplier.
+            pass
+
+        now = time.time()
+        result: Dict[Pair, Optional[float]] = {}
+        with self._lock:
+            self.fetches += 1
+            for instance_type, series in points.items():
+                price = weighted_average(series, start, end)
+                self._prices[(instance_type, az)] = (now, price)
+                result[(instance_type, az)] = price
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"pairs": len(self._prices), "fetches": self.fetches}
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The backend is a flat set of modules run from this directory (see
+# Procfile); make them importable the same way under pytest.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
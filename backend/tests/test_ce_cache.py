@@ -0,0 +1,218 @@
+"""TTLCache and SQLiteCache: expiry, eviction, and sharing one file."""
+
+import sqlite3
+import threading
+
+import pytest
+
+import ce_cache
+from ce_cache import SQLiteCache, TTLCache
+
+
+class Clock:
+    """Stands in for the time module inside ce_cache."""
+
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ce_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "ce-cache.sqlite")
+
+
+# -- TTLCache ------------------------------------------------------------------
+
+
+def test_memory_entry_expires_after_its_ttl(clock):
+    cache = TTLCache(default_ttl=60, max_entries=10, max_bytes=10_000)
+    cache.put("summary", {"total": 1})
+    cache.put("historical:6", [1, 2], ttl=None)
+
+    clock.now += 59
+    assert cache.get("summary") == {"total": 1}
+    clock.now += 2
+    assert cache.get("summary") is None
+    assert cache.get("historical:6") == [1, 2]
+
+    stats = cache.stats()["byPrefix"]["summary"]
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_memory_sweep_drops_unread_expired_entries(clock):
+    cache = TTLCache(default_ttl=60, max_entries=10, max_bytes=10_000)
+    for months in range(1, 4):
+        cache.put(f"historical:{months}", months)
+    cache.put("by-service:3", 3, ttl=600)
+
+    clock.now += 61
+    assert cache.sweep() == 3
+    assert cache.stats()["entries"] == 1
+
+
+def test_memory_lru_evicts_least_recently_read(clock):
+    cache = TTLCache(default_ttl=60, max_entries=2, max_bytes=10_000)
+    cache.put("a:1", 1)
+    cache.put("a:2", 2)
+    assert cache.get("a:1") == 1  # a:2 is now least recently used
+    cache.put("a:3", 3)
+
+    assert cache.get("a:2") is None
+    assert cache.get("a:1") == 1 and cache.get("a:3") == 3
+    assert cache.stats()["byPrefix"]["a"]["evictions"] == 1
+
+
+def test_memory_byte_budget_evicts_and_skips_oversized_values(clock):
+    cache = TTLCache(default_ttl=60, max_entries=100, max_bytes=25)
+    cache.put("k:1", "x" * 8)  # 10 bytes as JSON
+    cache.put("k:2", "y" * 8)
+    cache.put("k:3", "z" * 8)  # 30 > 25: k:1 goes
+
+    assert cache.get("k:1") is None
+    assert cache.stats()["bytes"] == 20
+
+    cache.put("k:big", "w" * 40)  # bigger than the whole budget: not cached
+    assert cache.get("k:big") is None
+    assert cache.get("k:2") is not None and cache.get("k:3") is not None
+
+
+# -- SQLiteCache ---------------------------------------------------------------
+
+
+def test_sqlite_entry_expires_after_its_ttl(clock, db_path):
+    cache = SQLiteCache(db_path, default_ttl=60, max_bytes=10_000)
+    cache.put("summary", {"total": 1})
+    cache.put("month-total:2026-01-01", 12.5, ttl=None)
+
+    clock.now += 61
+    assert cache.get("summary") is None
+    assert cache.get("month-total:2026-01-01") == 12.5
+    assert cache.stats()["entries"] == 1  # the expired row was deleted on read
+
+
+def test_sqlite_sweep_drops_expired_rows(clock, db_path):
+    cache = SQLiteCache(db_path, default_ttl=60, max_bytes=10_000)
+    cache.put("a:1", 1)
+    cache.put("a:2", 2, ttl=600)
+    cache.put("a:3", 3, ttl=None)
+
+    clock.now += 61
+    assert cache.sweep() == 1
+    assert cache.stats()["entries"] == 2
+
+
+def test_sqlite_byte_budget_evicts_least_recently_read(clock, db_path):
+    cache = SQLiteCache(db_path, default_ttl=None, max_bytes=25)
+    cache.put("k:1", "x" * 8)  # 10 bytes
+    clock.now += 1
+    cache.put("k:2", "y" * 8)
+    clock.now += SQLiteCache.TOUCH_SECONDS
+    assert cache.get("k:1") is not None  # k:2 is now least recently read
+    clock.now += 1
+    cache.put("k:3", "z" * 8)
+
+    assert cache.get("k:2") is None
+    assert cache.get("k:1") == "x" * 8 and cache.get("k:3") == "z" * 8
+    assert cache.stats()["byPrefix"]["k"]["evictions"] == 1
+
+
+def test_sqlite_hits_touch_accessed_at_only_once_it_is_stale(clock, db_path):
+    cache = SQLiteCache(db_path, default_ttl=None, max_bytes=10_000)
+    cache.put("summary", {"total": 1})
+    written = clock.now
+
+    def accessed_at():
+        (value,) = sqlite3.connect(db_path).execute(
+            "SELECT accessed_at FROM ce_cache WHERE key = 'summary'"
+        ).fetchone()
+        return value
+
+    for _ in range(5):
+        clock.now += 10
+        assert cache.get("summary") == {"total": 1}
+    assert accessed_at() == written
+
+    clock.now += SQLiteCache.TOUCH_SECONDS
+    cache.get("summary")
+    assert accessed_at() == clock.now
+
+
+def test_two_caches_on_one_file_share_entries(clock, db_path):
+    writer = SQLiteCache(db_path, default_ttl=60, max_bytes=10_000)
+    reader = SQLiteCache(db_path, default_ttl=60, max_bytes=10_000)
+
+    writer.put("summary", {"total": 42})
+    assert reader.get("summary") == {"total": 42}
+
+    reader.put("summary", {"total": 43})
+    assert writer.get("summary") == {"total": 43}
+
+    clock.now += 61
+    assert writer.get("summary") is None
+    assert reader.get("summary") is None
+
+
+def test_threads_get_their_own_connections(db_path):
+    cache = SQLiteCache(db_path, default_ttl=60, max_bytes=1_000_000)
+    errors = []
+
+    def work(n: int) -> None:
+        try:
+            for i in range(50):
+                cache.put(f"t{n}:{i}", [n, i])
+                assert cache.get(f"t{n}:{i}") == [n, i]
+        except Exception as e:  # surfaced below; pytest can't see thread failures
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert cache.stats()["entries"] == 200
+
+
+# -- sweepers and the app lifespan ---------------------------------------------
+
+
+def test_stop_sweeper_ends_the_thread(db_path):
+    for cache in (
+        TTLCache(default_ttl=60, max_entries=10, max_bytes=10_000),
+        SQLiteCache(db_path, default_ttl=60, max_bytes=10_000),
+    ):
+        cache.start_sweeper(3600)
+        sweeper = cache._sweeper
+        assert sweeper.is_alive()
+        cache.stop_sweeper(timeout=5)
+        assert not sweeper.is_alive()
+        cache.stop_sweeper()  # idempotent
+
+
+def test_app_lifespan_starts_and_stops_the_sweeper(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    cache = TTLCache(default_ttl=60, max_entries=10, max_bytes=10_000)
+    monkeypatch.setattr(main, "_ce_cache", cache)
+    with TestClient(main.app):
+        sweeper = cache._sweeper
+        assert sweeper is not None and sweeper.is_alive()
+    assert cache._sweeper is None
+    assert not sweeper.is_alive()
@@ -0,0 +1,77 @@
+"""EKS per-cluster cost rollup from the inventory snapshot."""
+
+import time
+
+import pytest
+
+import main
+from aws_rates import MONTHLY_HOURS
+from ec2_inventory import InstanceRecord, InventorySnapshot
+
+
+def _node(n, state, instance_type, hourly, lifecycle=None):
+    row = InstanceRecord(
+        instance_id=f"i-{n}",
+        name=f"node-{n}",
+        state=state,
+        instance_type=instance_type,
+        private_ip=None,
+        public_ip=None,
+        launched_at=None,
+        availability_zone="us-west-2a",
+        vpc_id=None,
+        subnet_id=None,
+        platform="Linux/UNIX",
+        architecture="x86_64",
+        tags={"kubernetes.io/cluster/prod": "owned"},
+        parent_cluster="prod",
+        node_role_hint=None,
+        use_hints={},
+        lifecycle=lifecycle,
+    )
+    monthly = round(hourly * MONTHLY_HOURS, 2) if state == "running" else 0.0
+    row.monthly_estimate = {"hourly": hourly, "monthly": monthly, "estimated": False}
+    return row
+
+
+class StubInventory:
+    def __init__(self, rows):
+        self._snapshot = InventorySnapshot(rows, time.time())
+
+    def get(self):
+        return self._snapshot
+
+
+@pytest.fixture
+def rollup(monkeypatch):
+    def run(rows):
+        monkeypatch.setattr(main, "_inventory", StubInventory(rows))
+        result = main._rollup_cluster_cost("prod", "ACTIVE")
+        return {(r["instanceType"], r["capacityType"]): r for r in result["node_types"]}
+    return run
+
+
+def test_row_hourly_matches_its_monthly_when_prices_differ(rollup):
+    # Three spot m5.large nodes at different spot prices, one of them stopped.
+    rows = rollup([
+        _node(1, "running", "m5.large", 0.030, "spot"),
+        _node(2, "running", "m5.large", 0.040, "spot"),
+        _node(3, "stopped", "m5.large", 0.500, "spot"),
+    ])
+
+    row = rows[("m5.large", "SPOT")]
+    assert row["runningCount"] == 2
+    assert row["monthly"] == round((0.030 + 0.040) * MONTHLY_HOURS, 2)
+    assert row["hourly"] == pytest.approx(0.035)
+    assert row["hourly"] * MONTHLY_HOURS * row["runningCount"] == pytest.approx(row["monthly"], abs=0.01)
+
+
+def test_row_with_nothing_running_shows_the_mean_rate(rollup):
+    rows = rollup([
+        _node(1, "stopped", "c6i.xlarge", 0.17),
+        _node(2, "stopped", "c6i.xlarge", 0.19),
+    ])
+
+    row = rows[("c6i.xlarge", "ON_DEMAND")]
+    assert row["monthly"] == 0.0
+    assert row["hourly"] == pytest.approx(0.18)
@@ -0,0 +1,114 @@
+"""Cost cube: incremental refresh, slicing, and the cold costs_summary path."""
+
+import json
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+
+import main
+from cost_cube import CostCubeCache, fetch_cube
+from cost_windows import add_months
+
+SERVICES = ["Amazon EC2", "Amazon S3"]
+
+
+class StubCostExplorer:
+    """Every service costs 1.0 per day (MONTHLY buckets: 1.0 per day in
+    the month's part of the window)."""
+
+    def __init__(self):
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def get_cost_and_usage(self, TimePeriod, Granularity, Metrics, GroupBy=None, NextPageToken=None):
+        start = date.fromisoformat(TimePeriod["Start"])
+        end = date.fromisoformat(TimePeriod["End"])
+        with self._lock:
+            self.queries.append((Granularity, start, end, bool(GroupBy)))
+        buckets = []
+        day = start
+        while day < end:
+            nxt = min(day + timedelta(days=1) if Granularity == "DAILY" else add_months(day, 1), end)
+            amount = float((nxt - day).days)
+            bucket = {"TimePeriod": {"Start": day.isoformat(), "End": nxt.isoformat()}}
+            if GroupBy:
+                bucket["Groups"] = [
+                    {"Keys": [name], "Metrics": {"UnblendedCost": {"Amount": str(amount)}}}
+                    for name in SERVICES
+                ]
+            else:
+                bucket["Total"] = {"UnblendedCost": {"Amount": str(amount * len(SERVICES))}}
+            buckets.append(bucket)
+            day = nxt
+        return {"ResultsByTime": buckets}
+
+
+def test_first_fetch_is_monthly_then_daily():
+    ce = StubCostExplorer()
+    today = date(2026, 3, 20)
+    cube = fetch_cube(ce, today)
+
+    assert ce.queries == [
+        ("MONTHLY", date(2024, 4, 1), date(2025, 3, 1), True),
+        ("DAILY", date(2025, 3, 1), date(2026, 3, 21), True),
+    ]
+    assert cube.total(date(2024, 4, 1), date(2024, 5, 1)) == 30 * len(SERVICES)
+    assert cube.total(date(2026, 3, 1), date(2026, 3, 20), "Amazon S3") == 19
+    assert cube.by_service(date(2026, 3, 1), date(2026, 3, 2)) == {name: 1.0 for name in SERVICES}
+
+
+def test_refresh_refetches_only_the_open_window():
+    ce = StubCostExplorer()
+    first = fetch_cube(ce, date(2026, 3, 20))
+    ce.queries.clear()
+
+    second = fetch_cube(ce, date(2026, 3, 21), previous=first)
+    assert ce.queries == [("DAILY", date(2026, 3, 1), date(2026, 3, 22), True)]
+    assert second.total(second.start, date(2026, 3, 1)) == first.total(first.start, date(2026, 3, 1))
+    assert second.total(date(2026, 3, 1), date(2026, 3, 22)) == 21 * len(SERVICES)
+
+
+def test_month_rollover_refetches_the_closing_month_until_it_settles():
+    ce = StubCostExplorer()
+    cube = fetch_cube(ce, date(2026, 3, 20))
+
+    # April 2nd: March is in its grace period, so it is re-fetched with April.
+    cube = fetch_cube(ce, date(2026, 4, 2), previous=cube)
+    assert ce.queries[-1][1] == date(2026, 3, 1)
+    # April 10th: March settled after the last fetch — fetched once more...
+    cube = fetch_cube(ce, date(2026, 4, 10), previous=cube)
+    assert ce.queries[-1][1] == date(2026, 3, 1)
+    # ...and from then on only April is.
+    cube = fetch_cube(ce, date(2026, 4, 11), previous=cube)
+    assert ce.queries[-1][1] == date(2026, 4, 1)
+    assert cube.total(date(2026, 3, 1), date(2026, 4, 1)) == 31 * len(SERVICES)
+
+
+@pytest.fixture
+def cold_cube(monkeypatch):
+    ce = StubCostExplorer()
+    monkeypatch.setattr(main, "_ce_client", lambda: ce)
+    monkeypatch.setattr(main, "_cost_cube", CostCubeCache(lambda: ce, ttl_seconds=900))
+    main._ce_cache.clear()
+    yield ce
+    main._ce_cache.clear()
+
+
+def test_cold_summary_makes_one_daily_query_then_slices_the_cube(cold_cube):
+    cold = json.loads(main.costs_summary(_={}).body)
+    summary_queries = [q for q in cold_cube.queries if not q[3]]
+    assert len(summary_queries) == 1
+    assert summary_queries[0][0] == "DAILY"
+    assert summary_queries[0][1] == add_months(date.today(), -1)
+
+    # The cube loads in the background; once it has, the summary is sliced
+    # from it with no further ungrouped query, and the totals agree.
+    deadline = time.time() + 5
+    while not main._cost_cube.status()["loaded"] and time.time() < deadline:
+        time.sleep(0.01)
+    warm = json.loads(main.costs_summary(_={}).body)
+    assert len([q for q in cold_cube.queries if not q[3]]) == 1
+    for window in ("mtd", "previous_month", "previous_month_to_date"):
+        assert warm[window] == cold[window]
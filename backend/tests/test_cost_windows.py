@@ -0,0 +1,23 @@
+"""Settled/open window split."""
+
+from datetime import date
+
+from cost_windows import open_window_start, refetch_start
+
+
+def test_open_window_covers_previous_month_during_its_grace_period():
+    assert open_window_start(date(2026, 3, 1)) == date(2026, 2, 1)
+    assert open_window_start(date(2026, 3, 5)) == date(2026, 2, 1)
+    assert open_window_start(date(2026, 3, 6)) == date(2026, 3, 1)
+    assert open_window_start(date(2026, 1, 3)) == date(2025, 12, 1)
+
+
+def test_refetch_start():
+    start = date(2024, 4, 1)
+    assert refetch_start(start, date(2026, 3, 20), None) == start
+    # Nothing settled since the last fetch: only the open window.
+    assert refetch_start(start, date(2026, 3, 20), date(2026, 3, 1)) == date(2026, 3, 1)
+    # Last fetch was during February's grace period: February again too.
+    assert refetch_start(start, date(2026, 3, 20), date(2026, 2, 1)) == date(2026, 2, 1)
+    # A previous fetch older than the window start can't pull it earlier.
+    assert refetch_start(start, date(2026, 3, 20), date(2023, 1, 1)) == start
@@ -0,0 +1,203 @@
+"""InventorySnapshot indexes and query() against plain linear scans."""
+
+import itertools
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ec2_inventory import NO_CLUSTER, SORT_KEYS, InstanceRecord, InventorySnapshot
+
+STATES = ["running", "stopped", "pending"]
+CLUSTERS = ["prod", "dev", None]
+TYPES = ["m5.large", "t3.micro", "c6i.xlarge", None]
+AZS = ["us-west-2a", "us-west-2b", None]
+VPCS = ["vpc-a", "vpc-b", None]
+TEAMS = ["core", "data", None]  # None = no "team" tag
+
+
+def _fleet(size: int = 240) -> list:
+    rng = random.Random(7)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for n in range(size):
+        tags = {}
+        name = rng.choice([f"node-{n % 40}", f"Node-{n}", ""])
+        if name:
+            tags["Name"] = name
+        team = rng.choice(TEAMS)
+        if team is not None:
+            tags["team"] = team
+        if rng.random() < 0.3:
+            tags["env"] = rng.choice(["prod", "staging"])
+        row = InstanceRecord(
+            instance_id=f"i-{n:05d}",
+            name=name,
+            state=rng.choice(STATES),
+            instance_type=rng.choice(TYPES),
+            private_ip=None,
+            public_ip=None,
+            launched_at=rng.choice([None, base + timedelta(hours=rng.randrange(500))]),
+            availability_zone=rng.choice(AZS),
+            vpc_id=rng.choice(VPCS),
+            subnet_id=None,
+            platform="Linux/UNIX",
+            architecture="x86_64",
+            tags=tags,
+            parent_cluster=rng.choice(CLUSTERS),
+            node_role_hint=None,
+            use_hints={},
+            lifecycle=None,
+        )
+        row.monthly_estimate = {"monthly": rng.choice([0.0, 7.59, 70.08, 140.16])}
+        rows.append(row)
+    # The loader hands rows over running-first, then by name.
+    rows.sort(key=lambda r: (r.state != "running", (r.name or "").lower()))
+    return rows
+
+
+FLEET = _fleet()
+SNAPSHOT = InventorySnapshot(FLEET, 0.0)
+
+
+def _scan(state=None, cluster=None, instance_type=None, az=None, tag=None, text=None, sort="default", descending=False):
+    """The linear-scan logic the indexes replace: filter every row, then sort."""
+    rows = []
+    for row in FLEET:
+        if state is not None and row.state != state:
+            continue
+        if cluster is not None and row.parent_cluster != (None if cluster == NO_CLUSTER else cluster):
+            continue
+        if instance_type is not None and row.instance_type != instance_type:
+            continue
+        if az is not None and row.availability_zone != az:
+            continue
+        if tag is not None:
+            key, value = tag
+            if key not in row.tags or (value is not None and row.tags[key] != value):
+                continue
+        if text and text.lower() not in (row.name or "").lower():
+            continue
+        rows.append(row)
+    key = SORT_KEYS[sort]
+    if key is None:
+        position = {id(r): i for i, r in enumerate(FLEET)}
+        key = lambda r: position[id(r)]  # noqa: E731
+    rows.sort(key=key, reverse=descending)
+    return [r.instance_id for r in rows]
+
+
+def _ids(rows):
+    return [r.instance_id for r in rows]
+
+
+FILTER_OPTIONS = {
+    "state": [None, "running", "stopped", "terminated"],
+    "cluster": [None, "prod", NO_CLUSTER, "ghost"],
+    "instance_type": [None, "m5.large", "r7g.large"],
+    "az": [None, "us-west-2a"],
+    "tag": [None, ("team", None), ("team", "core"), ("absent", None), ("team", "nobody")],
+    "text": [None, "node-1", "NOPE"],
+}
+FILTER_COMBOS = [
+    dict(zip(FILTER_OPTIONS, values)) for values in itertools.product(*FILTER_OPTIONS.values())
+]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_every_filter_combination_matches_scan(descending):
+    for filters in FILTER_COMBOS:
+        rows, total, next_after = SNAPSHOT.query(**filters, descending=descending)
+        expected = _scan(**filters, descending=descending)
+        assert _ids(rows) == expected, filters
+        assert total == len(expected), filters
+        assert next_after is None, filters
+
+
+@pytest.mark.parametrize("sort", list(SORT_KEYS))
+@pytest.mark.parametrize("descending", [False, True])
+def test_every_sort_matches_scan(sort, descending):
+    for filters in [{}, {"state": "running"}, {"cluster": NO_CLUSTER, "tag": ("team", None)}, {"text": "node"}]:
+        rows, total, _ = SNAPSHOT.query(**filters, sort=sort, descending=descending)
+        assert _ids(rows) == _scan(**filters, sort=sort, descending=descending), (sort, filters)
+        assert total == len(rows)
+
+
+PAGED_FILTERS = [
+    {},
+    {"state": "running"},
+    {"cluster": "prod", "az": "us-west-2a"},
+    {"cluster": NO_CLUSTER, "state": "stopped"},
+    {"tag": ("team", "data"), "instance_type": "m5.large"},
+    {"tag": ("env", None), "text": "node"},
+]
+
+
+@pytest.mark.parametrize("sort", list(SORT_KEYS))
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("filters", PAGED_FILTERS)
+def test_cursor_pages_concatenate_to_scan(sort, descending, filters):
+    expected = _scan(**filters, sort=sort, descending=descending)
+    seen, after, pages = [], None, 0
+    while True:
+        rows, total, after = SNAPSHOT.query(**filters, sort=sort, descending=descending, limit=7, after=after)
+        assert total == len(expected)
+        assert len(rows) <= 7
+        seen.extend(_ids(rows))
+        pages += 1
+        if after is None:
+            break
+        assert after == rows[-1].instance_id
+    assert seen == expected
+    assert pages == max(1, -(-len(expected) // 7))
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("filters", [{}, {"state": "running"}])
+def test_offset_pages_and_unknown_cursor_fall_back_to_offset(descending, filters):
+    expected = _scan(**filters, descending=descending)
+    for offset in (0, 5, len(expected) - 1, len(expected) + 3):
+        rows, total, _ = SNAPSHOT.query(**filters, descending=descending, limit=10, offset=offset)
+        assert _ids(rows) == expected[offset:offset + 10]
+        assert total == len(expected)
+        # A cursor for an instance that has left the snapshot resumes at offset.
+        rows, _, _ = SNAPSHOT.query(**filters, descending=descending, limit=10, after="i-gone", offset=offset)
+        assert _ids(rows) == expected[offset:offset + 10]
+
+
+def test_accessors_match_scan():
+    for cluster in CLUSTERS + ["ghost"]:
+        assert _ids(SNAPSHOT.in_cluster(cluster)) == [r.instance_id for r in FLEET if r.parent_cluster == cluster]
+    for state in STATES + ["terminated"]:
+        assert _ids(SNAPSHOT.in_state(state)) == [r.instance_id for r in FLEET if r.state == state]
+    for az in AZS:
+        assert _ids(SNAPSHOT.in_az(az)) == [r.instance_id for r in FLEET if r.availability_zone == az]
+    for vpc in VPCS:
+        assert _ids(SNAPSHOT.in_vpc(vpc)) == [r.instance_id for r in FLEET if r.vpc_id == vpc]
+    for key, value in [("team", None), ("team", "core"), ("env", "prod"), ("absent", None)]:
+        assert _ids(SNAPSHOT.with_tag(key, value)) == [
+            r.instance_id for r in FLEET
+            if key in r.tags and (value is None or r.tags[key] == value)
+        ]
+    for row in FLEET:
+        assert SNAPSHOT.get(row.instance_id) is row
+    assert SNAPSHOT.get("i-gone") is None
+
+
+def test_counts_clusters_and_summary_match_scan():
+    for index, attr in [("state", "state"), ("cluster", "parent_cluster"), ("type", "instance_type"),
+                        ("az", "availability_zone"), ("vpc", "vpc_id")]:
+        expected = {}
+        for row in FLEET:
+            expected[getattr(row, attr)] = expected.get(getattr(row, attr), 0) + 1
+        assert SNAPSHOT.counts(index) == expected, index
+
+    assert sorted(SNAPSHOT.clusters()) == sorted({r.parent_cluster for r in FLEET if r.parent_cluster})
+    assert SNAPSHOT.orphan_count == sum(1 for r in FLEET if r.parent_cluster is None)
+    for cluster, summary in SNAPSHOT.cluster_summary.items():
+        members = [r for r in FLEET if r.parent_cluster == cluster]
+        types = {}
+        for r in members:
+            if r.instance_type:
+                types[r.instance_type] = types.get(r.instance_type, 0) + 1
+        assert summary == {"nodeCount": len(members), "instanceTypes": types}
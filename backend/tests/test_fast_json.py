@@ -0,0 +1,44 @@
+"""FastJSONResponse: the orjson and stdlib paths render the same JSON."""
+
+import json
+import math
+
+import pytest
+
+import fast_json
+from fast_json import FastJSONResponse
+
+PAYLOAD = {
+    "rows": [{"id": "i-1", "cost": 1.5}, {"id": "i-2", "cost": math.nan}],
+    "total": math.inf,
+    "delta": -math.inf,
+    "nested": ({"pct": math.nan},),
+    "name": "café",
+}
+EXPECTED = {
+    "rows": [{"id": "i-1", "cost": 1.5}, {"id": "i-2", "cost": None}],
+    "total": None,
+    "delta": None,
+    "nested": [{"pct": None}],
+    "name": "café",
+}
+
+
+def test_stdlib_fallback_writes_non_finite_floats_as_null(monkeypatch):
+    monkeypatch.setattr(fast_json, "orjson", None)
+
+    body = FastJSONResponse(PAYLOAD).body
+
+    assert json.loads(body) == EXPECTED
+    assert b"NaN" not in body and b"Infinity" not in body
+
+
+def test_stdlib_fallback_leaves_finite_payloads_alone(monkeypatch):
+    monkeypatch.setattr(fast_json, "orjson", None)
+
+    assert FastJSONResponse({"a": [1, 2.5, "x"], "b": None}).body == b'{"a":[1,2.5,"x"],"b":null}'
+
+
+@pytest.mark.skipif(fast_json.orjson is None, reason="orjson not installed")
+def test_orjson_path_matches():
+    assert json.loads(FastJSONResponse(PAYLOAD).body) == EXPECTED
@@ -0,0 +1,138 @@
+"""Shared identity directory: in-place membership writes and reload races."""
+
+import pytest
+
+import main
+from identity_directory import IdentityDirectory
+from main import AddUserToGroupRequest, RemoveUserFromGroupRequest
+
+
+class ConflictException(Exception):
+    pass
+
+
+class ResourceNotFoundException(Exception):
+    pass
+
+
+class FakeIdentityStore:
+    class exceptions:
+        ConflictException = ConflictException
+        ResourceNotFoundException = ResourceNotFoundException
+
+    def __init__(self):
+        self.users = {
+            uid: {"UserId": uid, "UserName": uid, "DisplayName": uid.upper()} for uid in ("u-1", "u-2")
+        }
+        self.groups = {"g-1": {"GroupId": "g-1", "DisplayName": "Admins"}}
+        self.memberships = {"g-1": {"m-1": "u-1"}}  # group id -> {membership id: user id}
+        self.loads = 0
+        self.during_load = None  # called mid-load, to race a write against it
+
+    def get_paginator(self, operation):
+        store = self
+
+        class Paginator:
+            def paginate(self, IdentityStoreId, GroupId=None):
+                if operation == "list_users":
+                    store.loads += 1
+                    if store.during_load is not None:
+                        store.during_load()
+                    yield {"Users": list(store.users.values())}
+                elif operation == "list_groups":
+                    yield {"Groups": list(store.groups.values())}
+                else:
+                    yield {"GroupMemberships": [
+                        {"MembershipId": mid, "MemberId": {"UserId": uid}}
+                        for mid, uid in store.memberships.get(GroupId, {}).items()
+                    ]}
+
+        return Paginator()
+
+    def create_group_membership(self, IdentityStoreId, GroupId, MemberId):
+        membership_id = f"m-{len(self.memberships[GroupId]) + 1}"
+        self.memberships[GroupId][membership_id] = MemberId["UserId"]
+        return {"MembershipId": membership_id}
+
+    def list_group_memberships(self, IdentityStoreId, GroupId):
+        return {"GroupMemberships": [
+            {"MembershipId": mid, "MemberId": {"UserId": uid}}
+            for mid, uid in self.memberships.get(GroupId, {}).items()
+        ]}
+
+    def delete_group_membership(self, IdentityStoreId, MembershipId):
+        for by_id in self.memberships.values():
+            by_id.pop(MembershipId, None)
+        return {}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    fake = FakeIdentityStore()
+    identity = IdentityDirectory(lambda: fake, "d-test", ttl_seconds=600, max_workers=1)
+    monkeypatch.setattr(main, "_identity", identity)
+    monkeypatch.setattr(main, "get_boto_clients", lambda: {"identitystore": fake})
+    return fake
+
+
+def _member_ids(group_id):
+    group = next(g for g in main._identity.get().groups() if g["id"] == group_id)
+    return [m["id"] for m in group["members"]]
+
+
+def test_add_member_updates_both_indexes_in_place(store):
+    assert _member_ids("g-1") == ["u-1"]
+
+    result = main.add_user_to_group(AddUserToGroupRequest(userId="u-2", groupId="g-1"))
+
+    assert _member_ids("g-1") == ["u-1", "u-2"]
+    assert main.get_user_groups("u-2")["groups"] == [
+        {"id": "g-1", "name": "Admins", "membershipId": result["membershipId"]}
+    ]
+    assert store.loads == 1
+
+
+def test_remove_member_updates_both_indexes_in_place(store):
+    assert main.get_user_groups("u-1")["groups"][0]["membershipId"] == "m-1"
+
+    main.remove_user_from_group(RemoveUserFromGroupRequest(userId="u-1", groupId="g-1"))
+
+    assert _member_ids("g-1") == []
+    assert main.get_user_groups("u-1")["groups"] == []
+    assert store.loads == 1
+
+
+def test_write_during_reload_marks_the_reloaded_copy_stale(store):
+    def write_mid_load():
+        store.during_load = None
+        main.add_user_to_group(AddUserToGroupRequest(userId="u-2", groupId="g-1"))
+
+    store.during_load = write_mid_load
+
+    # The load listed memberships after the write, so it happens to include
+    # it, but it can't know that: the copy is served once and then reloaded.
+    first = main._identity.get()
+    assert first.loaded_at == 0.0
+    assert store.loads == 1
+
+    second = main._identity.get()
+    assert second is not first
+    assert second.loaded_at > 0
+    assert store.loads == 2
+    assert _member_ids("g-1") == ["u-1", "u-2"]
+    assert store.loads == 2
+
+
+def test_conflict_invalidates_the_directory(store):
+    main._identity.get()
+
+    def conflict(**kwargs):
+        raise ConflictException()
+
+    store.create_group_membership = conflict
+    with pytest.raises(main.HTTPException) as raised:
+        main.add_user_to_group(AddUserToGroupRequest(userId="u-1", groupId="g-1"))
+    assert raised.value.status_code == 409
+
+    main._identity.get()
+    assert store.loads == 2
@@ -0,0 +1,131 @@
+"""Instance-type catalog: bundled snapshot, background live refresh."""
+
+import threading
+
+import pytest
+
+import instance_catalog
+from instance_catalog import InstanceCatalog, load_snapshot, seed_types
+
+
+class Paginator:
+    def __init__(self, fetch):
+        self._fetch = fetch
+
+    def paginate(self):
+        return self._fetch()
+
+
+class FakeEC2:
+    """describe_instance_types that blocks until released, or fails."""
+
+    def __init__(self, types, fail=False):
+        self.types = types
+        self.fail = fail
+        self.calls = 0
+        self.release = threading.Event()
+        self.done = threading.Event()
+
+    def get_paginator(self, operation):
+        assert operation == "describe_instance_types"
+
+        def fetch():
+            self.calls += 1
+            try:
+                self.release.wait(5)
+                if self.fail:
+                    raise RuntimeError("UnauthorizedOperation")
+                return [{"InstanceTypes": [
+                    {"InstanceType": name, "VCpuInfo": {"DefaultVCpus": vcpus},
+                     "MemoryInfo": {"SizeInMiB": vcpus * 4096},
+                     "ProcessorInfo": {"SupportedArchitectures": ["x86_64"]},
+                     "NetworkInfo": {"NetworkPerformance": "Up to 12.5 Gigabit"}}
+                    for name, vcpus in self.types.items()
+                ]}]
+            finally:
+                self.done.set()
+
+        return Paginator(fetch)
+
+
+def _wait_for_refresh(catalog):
+    for _ in range(500):
+        with catalog._lock:
+            if not catalog._refreshing:
+                return
+        threading.Event().wait(0.01)
+    raise AssertionError("refresh thread didn't finish")
+
+
+def test_bundled_snapshot_covers_common_families_in_every_region():
+    types = load_snapshot()
+    assert len(types) > 400
+    assert types["t3.micro"].vcpus == 2
+    assert types["t2.nano"].vcpus == 1
+    assert types["c5.9xlarge"].vcpus == 36
+    assert types["m7i.48xlarge"].vcpus == 192
+    assert types["r6g.medium"].vcpus == 1
+    assert types["r6g.medium"].architectures == ("arm64",)
+    assert types["m5.metal"].vcpus == 96
+    # The shipped file is exactly what the documented --seed step writes.
+    assert types == seed_types()
+
+
+def test_miss_returns_at_once_and_the_live_catalog_merges_in():
+    ec2 = FakeEC2({"m7i.large": 2, "u7i-12tb.224xlarge": 896})
+    catalog = InstanceCatalog(lambda: ec2)  # bundled snapshot
+
+    # Unknown type: None without waiting for the (blocked) live fetch.
+    assert catalog.vcpus("u7i-12tb.224xlarge") is None
+    assert not ec2.done.is_set()
+    assert catalog.vcpus("t3.micro") == 2  # still served from the snapshot
+
+    ec2.release.set()
+    _wait_for_refresh(catalog)
+
+    assert catalog.source == "live"
+    assert catalog.vcpus("u7i-12tb.224xlarge") == 896
+    assert catalog.get("m7i.large").network_performance == "Up to 12.5 Gigabit"
+    assert catalog.vcpus("t3.micro") == 2  # snapshot-only types are kept
+    assert ec2.calls == 1
+
+
+def test_concurrent_misses_start_one_refresh():
+    ec2 = FakeEC2({"x8g.large": 2})
+    catalog = InstanceCatalog(lambda: ec2)
+
+    for _ in range(20):
+        assert catalog.get("x8g.large") is None
+    ec2.release.set()
+    _wait_for_refresh(catalog)
+
+    assert ec2.calls == 1
+    assert catalog.vcpus("x8g.large") == 2
+
+
+def test_failed_refresh_is_not_retried_until_the_backoff_passes(monkeypatch):
+    now = [1_000_000.0]
+
+    class Clock:
+        @staticmethod
+        def time():
+            return now[0]
+
+    monkeypatch.setattr(instance_catalog, "time", Clock)
+    ec2 = FakeEC2({}, fail=True)
+    ec2.release.set()
+    catalog = InstanceCatalog(lambda: ec2)
+
+    assert catalog.get("x8g.large") is None
+    _wait_for_refresh(catalog)
+    assert catalog.get("x8g.large") is None
+    assert ec2.calls == 1
+    assert catalog.vcpus("t3.micro") == 2
+
+    now[0] += instance_catalog.RETRY_SECONDS + 1
+    ec2.fail = False
+    ec2.types = {"x8g.large": 2}
+    assert catalog.get("x8g.large") is None
+    _wait_for_refresh(catalog)
+    assert catalog.vcpus("x8g.large") == 2
+    assert ec2.calls == 2
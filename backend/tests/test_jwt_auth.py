@@ -0,0 +1,96 @@
+"""Auth layer: one token verify per request, none for a cached repeat."""
+
+import time
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+SECRET = b"test-secret-test-secret-test-secret"
+AUTHED_PATH = "/api/costs/cache-stats"  # middleware + Depends(require_system_user), no AWS calls
+
+
+def _token(exp: float, user_type: str = "SYSTEM") -> str:
+    return jwt.encode({"sub": "tester", "userType": user_type, "exp": int(exp)}, SECRET, algorithm=main.JWT_ALG)
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    monkeypatch.setattr(main, "JWT_SECRET_BYTES", SECRET)
+    main._claims_cache.clear()
+    calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+    yield calls
+    main._claims_cache.clear()
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def _get(client, token):
+    return client.get(AUTHED_PATH, headers={"Authorization": f"Bearer {token}"})
+
+
+def test_first_request_verifies_once_and_repeat_not_at_all(client, decode_calls):
+    token = _token(time.time() + 3600)
+
+    assert _get(client, token).status_code == 200
+    assert len(decode_calls) == 1
+
+    assert _get(client, token).status_code == 200
+    assert len(decode_calls) == 1
+
+
+def test_expired_token_is_not_served_from_cache(client, decode_calls):
+    exp = int(time.time()) + 2
+    token = _token(exp)
+    assert _get(client, token).status_code == 200
+    assert len(decode_calls) == 1
+
+    while time.time() < exp + 0.1:
+        time.sleep(0.1)
+
+    resp = _get(client, token)
+    assert resp.status_code == 401
+    assert resp.json() == {"error": "UNAUTHORIZED", "message": "token expired"}
+    assert len(decode_calls) == 2
+
+
+def test_non_system_token_is_forbidden(client, decode_calls):
+    resp = _get(client, _token(time.time() + 3600, user_type="ACCOUNT"))
+    assert resp.status_code == 403
+    assert resp.json() == {"error": "FORBIDDEN", "message": "SYSTEM users only"}
+
+
+def test_missing_token_is_unauthorized(client, decode_calls):
+    resp = client.get(AUTHED_PATH)
+    assert resp.status_code == 401
+    assert resp.json() == {"error": "UNAUTHORIZED", "message": "missing bearer token"}
+    assert decode_calls == []
+
+
+def test_cors_preflight_skips_auth(client, decode_calls):
+    resp = client.options(
+        AUTHED_PATH,
+        headers={
+            "Origin": f"http://localhost:{main.FRONTEND_PORT}",
+            "Access-Control-Request-Method": "GET",
+        },
+    )
+    assert resp.status_code == 200
+    assert decode_calls == []
+
+
+def test_health_is_exempt(client, decode_calls):
+    assert client.get("/api/health").status_code == 200
+    assert decode_calls == []
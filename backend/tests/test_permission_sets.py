@@ -0,0 +1,122 @@
+"""Permission-set catalog: ARN diffing, TTL re-hydration, partial failures."""
+
+import threading
+
+import pytest
+
+from permission_sets import PermissionSetCatalog
+
+
+class Paginator:
+    def __init__(self, pages):
+        self._pages = pages
+
+    def paginate(self, **kwargs):
+        return self._pages(**kwargs)
+
+
+class FakeSSOAdmin:
+    def __init__(self, names):
+        self.names = list(names)
+        self.list_calls = 0
+        self.described = []
+        self.broken_policies = set()
+        self.broken_describe = set()
+        self._lock = threading.Lock()
+
+    def get_paginator(self, operation):
+        def pages(InstanceArn, PermissionSetArn=None):
+            if operation == "list_permission_sets":
+                self.list_calls += 1
+                return [{"PermissionSets": [f"arn:ps/{name}" for name in self.names]}]
+            assert operation == "list_managed_policies_in_permission_set"
+            name = PermissionSetArn.rsplit("/", 1)[1]
+            if name in self.broken_policies:
+                raise RuntimeError("AccessDeniedException")
+            return [{"AttachedManagedPolicies": [{"Name": f"{name}Policy"}]}]
+        return Paginator(pages)
+
+    def describe_permission_set(self, InstanceArn, PermissionSetArn):
+        name = PermissionSetArn.rsplit("/", 1)[1]
+        with self._lock:
+            self.described.append(name)
+        if name in self.broken_describe:
+            raise RuntimeError("ThrottlingException")
+        return {"PermissionSet": {"Name": name, "Description": f"{name} access", "SessionDuration": "PT8H"}}
+
+
+@pytest.fixture
+def sso_admin():
+    return FakeSSOAdmin(["Admin", "ReadOnly"])
+
+
+def _catalog(sso_admin, ttl_seconds=600):
+    return PermissionSetCatalog(lambda: sso_admin, "arn:instance", ttl_seconds=ttl_seconds, max_workers=4)
+
+
+def test_first_sync_hydrates_every_permission_set(sso_admin):
+    rows = _catalog(sso_admin).get()
+
+    assert rows == [
+        {"arn": "arn:ps/Admin", "name": "Admin", "description": "Admin access",
+         "sessionDuration": "PT8H", "policies": ["AdminPolicy"]},
+        {"arn": "arn:ps/ReadOnly", "name": "ReadOnly", "description": "ReadOnly access",
+         "sessionDuration": "PT8H", "policies": ["ReadOnlyPolicy"]},
+    ]
+    assert sorted(sso_admin.described) == ["Admin", "ReadOnly"]
+
+
+def test_only_new_arns_are_described_and_removed_ones_dropped(sso_admin):
+    catalog = _catalog(sso_admin)
+    catalog.get()
+    sso_admin.described.clear()
+
+    assert [row["name"] for row in catalog.get()] == ["Admin", "ReadOnly"]
+    assert sso_admin.described == []
+    assert sso_admin.list_calls == 2
+
+    sso_admin.names = ["ReadOnly", "Billing"]
+    assert [row["name"] for row in catalog.get()] == ["ReadOnly", "Billing"]
+    assert sso_admin.described == ["Billing"]
+
+
+def test_entries_older_than_the_ttl_are_rehydrated(sso_admin, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("permission_sets.time.time", lambda: now[0])
+    catalog = _catalog(sso_admin, ttl_seconds=60)
+    catalog.get()
+
+    sso_admin.names.append("Billing")
+    now[0] += 30
+    catalog.get()
+    assert sso_admin.described[2:] == ["Billing"]
+
+    # Admin and ReadOnly pass the TTL first; Billing is only 31s old.
+    now[0] += 31
+    catalog.get()
+    assert sorted(sso_admin.described[3:]) == ["Admin", "ReadOnly"]
+
+
+def test_policy_listing_failure_gives_an_empty_policy_list(sso_admin):
+    sso_admin.broken_policies.add("ReadOnly")
+
+    rows = {row["name"]: row for row in _catalog(sso_admin).get()}
+
+    assert rows["Admin"]["policies"] == ["AdminPolicy"]
+    assert rows["ReadOnly"]["policies"] == []
+    assert rows["ReadOnly"]["description"] == "ReadOnly access"
+
+
+def test_describe_failure_propagates_and_keeps_earlier_entries(sso_admin):
+    catalog = _catalog(sso_admin)
+    catalog.get()
+
+    sso_admin.names.append("Billing")
+    sso_admin.broken_describe.add("Billing")
+    with pytest.raises(RuntimeError):
+        catalog.get()
+
+    sso_admin.broken_describe.clear()
+    sso_admin.described.clear()
+    assert [row["name"] for row in catalog.get()] == ["Admin", "ReadOnly", "Billing"]
+    assert sso_admin.described == ["Billing"]
@@ -0,0 +1,55 @@
+"""Price book build step: streaming a region's CSV offer file."""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from pricing import load, parse_offer_csv, write_snapshot
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "ec2_offer_us-east-1.csv"
+
+
+def _parse(region="us-east-1"):
+    with open(FIXTURE, newline="", encoding="utf-8") as f:
+        return parse_offer_csv(region, f)
+
+
+def test_offer_csv_keeps_only_plain_on_demand_region_capacity():
+    prices = _parse()
+
+    assert prices == {
+        ("us-east-1", "Linux", "Shared"): {"t3.micro": 0.0104, "m5.large": 0.096},
+        ("us-east-1", "Linux", "Dedicated"): {"m5.large": 0.106},
+        ("us-east-1", "Windows", "Shared"): {"t3.micro": 0.0196},
+        ("us-east-1", "RHEL", "Shared"): {"m5.large": 0.1556},
+    }
+    # Not there: the Reserved term, the Local Zone, SQL Web, BYOL, the $0
+    # Dedicated Host row, unused reservations and non-instance products.
+
+
+def test_regions_accumulate_into_one_price_map():
+    prices = _parse("us-east-1")
+    with open(FIXTURE, newline="", encoding="utf-8") as f:
+        parse_offer_csv("us-west-2", f, prices)
+
+    assert prices[("us-west-2", "Windows", "Shared")] == {"t3.micro": 0.0196}
+    assert len(prices) == 8
+
+
+def test_offer_file_without_a_header_is_rejected():
+    with pytest.raises(ValueError):
+        parse_offer_csv("us-east-1", io.StringIO('"FormatVersion","v1.0"\n'))
+
+
+def test_snapshot_round_trip_prices_other_regions_and_os(tmp_path):
+    path = tmp_path / "ec2_prices.json.gz"
+    write_snapshot(_parse(), "aws-bulk-price-list", path)
+    book = load(path)
+
+    assert book.hourly("t3.micro", "us-east-1", "Linux", "Shared") == 0.0104
+    assert book.hourly("t3.micro", "us-east-1", "Windows", "Shared") == 0.0196
+    assert book.hourly("m5.large", "us-east-1", "RHEL", "Shared") == 0.1556
+    assert book.hourly("t3.micro", "us-east-1", "RHEL", "Shared") is None
+    assert book.hourly("m5.large", "us-east-1", "Linux", "Host") is None
+
@@ -0,0 +1,121 @@
+"""/api/account-assignments principal resolution against stubbed clients."""
+
+import json
+import threading
+
+import pytest
+
+import main
+from identity_directory import IdentityDirectory
+from permission_sets import PermissionSetCatalog
+
+
+class Paginator:
+    def __init__(self, pages):
+        self._pages = pages
+
+    def paginate(self, **kwargs):
+        return self._pages(**kwargs)
+
+
+class FakeIdentityStore:
+    """The directory knows u-1 and g-1; u-2 and g-2 need describe_*, and
+    u-gone can't be described at all."""
+
+    def __init__(self):
+        self.described = []
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get_paginator(self, operation):
+        def pages(IdentityStoreId, GroupId=None):
+            if operation == "list_users":
+                self.loads += 1
+                return [{"Users": [{"UserId": "u-1", "UserName": "ann", "DisplayName": "Ann"}]}]
+            if operation == "list_groups":
+                return [{"Groups": [{"GroupId": "g-1", "DisplayName": "Admins"}]}]
+            return [{"GroupMemberships": []}]
+        return Paginator(pages)
+
+    def describe_user(self, IdentityStoreId, UserId):
+        with self._lock:
+            self.described.append(("USER", UserId))
+        if UserId == "u-gone":
+            raise RuntimeError("ResourceNotFoundException")
+        return {"UserId": UserId, "UserName": "bob", "DisplayName": ""}
+
+    def describe_group(self, IdentityStoreId, GroupId):
+        with self._lock:
+            self.described.append(("GROUP", GroupId))
+        return {"GroupId": GroupId, "DisplayName": "Auditors"}
+
+
+class FakeSSOAdmin:
+    def __init__(self, assignments):
+        self.assignments = assignments  # permission set name -> [(type, id)]
+
+    def get_paginator(self, operation):
+        def pages(InstanceArn, AccountId=None, PermissionSetArn=None):
+            if operation == "list_permission_sets":
+                return [{"PermissionSets": [f"arn:ps/{name}" for name in self.assignments]}]
+            if operation == "list_managed_policies_in_permission_set":
+                return [{"AttachedManagedPolicies": []}]
+            name = PermissionSetArn.rsplit("/", 1)[1]
+            return [{"AccountAssignments": [
+                {"PrincipalType": kind, "PrincipalId": pid} for kind, pid in self.assignments[name]
+            ]}]
+        return Paginator(pages)
+
+    def describe_permission_set(self, InstanceArn, PermissionSetArn):
+        return {"PermissionSet": {"Name": PermissionSetArn.rsplit("/", 1)[1]}}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    fake = FakeIdentityStore()
+    monkeypatch.setattr(
+        main, "_identity", IdentityDirectory(lambda: fake, "d-test", ttl_seconds=600, max_workers=4)
+    )
+    return fake
+
+
+def test_principals_shared_across_permission_sets_are_resolved_once(store, monkeypatch):
+    sso_admin = FakeSSOAdmin({
+        "Admin": [("GROUP", "g-1"), ("USER", "u-2"), ("GROUP", "g-2")],
+        "ReadOnly": [("USER", "u-1"), ("USER", "u-2"), ("GROUP", "g-2")],
+        "Billing": [("USER", "u-2")],
+    })
+    monkeypatch.setattr(main, "get_boto_clients", lambda: {"sso_admin": sso_admin})
+    monkeypatch.setattr(
+        main, "_permission_sets",
+        PermissionSetCatalog(lambda: sso_admin, "arn:instance", ttl_seconds=600, max_workers=4),
+    )
+
+    rows = json.loads(main.get_account_assignments().body)["assignments"]
+
+    assert sorted(store.described) == [("GROUP", "g-2"), ("USER", "u-2")]
+    assert len(rows) == 7
+    names = {(r["principalType"], r["principalId"]): r["principalName"] for r in rows}
+    assert names == {
+        ("GROUP", "g-1"): "Admins",
+        ("USER", "u-1"): "Ann",
+        ("USER", "u-2"): "bob",
+        ("GROUP", "g-2"): "Auditors",
+    }
+
+
+def test_described_names_are_cached_until_the_directory_reloads(store):
+    principals = [("USER", "u-1"), ("USER", "u-2"), ("GROUP", "g-2"), ("USER", "u-gone")]
+
+    first = main._identity.principal_names(principals)
+    assert first[("USER", "u-gone")] == "u-gone"
+    assert len(store.described) == 3
+
+    # Directory hits and earlier describe results, failures included.
+    assert main._identity.principal_names(principals) == first
+    assert len(store.described) == 3
+
+    main._identity.invalidate()
+    assert main._identity.principal_names(principals) == first
+    assert store.loads == 2
+    assert len(store.described) == 6
@@ -0,0 +1,131 @@
+"""/api/groups/remove-member membership-id lookup, including a stale index."""
+
+import time
+
+import pytest
+from fastapi import HTTPException
+
+import main
+from identity_directory import Directory, IdentityDirectory
+from main import RemoveUserFromGroupRequest
+
+
+class ResourceNotFoundException(Exception):
+    pass
+
+
+class FakeIdentityStore:
+    class exceptions:
+        ResourceNotFoundException = ResourceNotFoundException
+
+    def __init__(self, memberships, page_size=2):
+        self.memberships = memberships  # group id -> {membership id: user id}
+        self.page_size = page_size
+        self.deleted = []
+        self.scans = 0
+        self.pages_read = 0
+
+    def delete_group_membership(self, IdentityStoreId, MembershipId):
+        self.deleted.append(MembershipId)
+        for by_id in self.memberships.values():
+            if by_id.pop(MembershipId, None) is not None:
+                return {}
+        raise ResourceNotFoundException(MembershipId)
+
+    def get_paginator(self, operation):
+        assert operation == "list_group_memberships"
+        store = self
+
+        class Paginator:
+            def paginate(self, IdentityStoreId, GroupId):
+                store.scans += 1
+                rows = [
+                    {"MembershipId": mid, "MemberId": {"UserId": uid}}
+                    for mid, uid in store.memberships.get(GroupId, {}).items()
+                ]
+                for i in range(0, len(rows), store.page_size):
+                    store.pages_read += 1
+                    yield {"GroupMemberships": rows[i:i + store.page_size]}
+
+        return Paginator()
+
+
+@pytest.fixture
+def store(monkeypatch):
+    def install(memberships, indexed):
+        fake = FakeIdentityStore(memberships)
+        identity = IdentityDirectory(lambda: fake, "d-test", ttl_seconds=600, max_workers=1)
+        identity._directory = Directory({}, {}, indexed, time.time())
+        monkeypatch.setattr(main, "_identity", identity)
+        monkeypatch.setattr(main, "get_boto_clients", lambda: {"identitystore": fake})
+        return fake
+    return install
+
+
+def _remove():
+    return main.remove_user_from_group(RemoveUserFromGroupRequest(userId="u-1", groupId="g-1"))
+
+
+def test_indexed_membership_is_deleted_without_a_scan(store):
+    fake = store({"g-1": {"m-1": "u-1"}}, indexed={"g-1": {"u-1": "m-1"}})
+
+    assert _remove()["success"] is True
+    assert fake.deleted == ["m-1"]
+    assert fake.scans == 0
+    assert main._identity.indexed_membership_id("g-1", "u-1") is None
+
+
+def test_index_miss_scans_until_the_member_is_found(store):
+    members = {f"m-{n}": f"u-{n}" for n in range(2, 8)}
+    members["m-1"] = "u-1"  # on the fourth and last page
+    members["m-9"] = "u-9"
+    fake = store({"g-1": members}, indexed={})
+
+    assert _remove()["success"] is True
+    assert fake.deleted == ["m-1"]
+    assert fake.scans == 1
+    assert fake.pages_read == 4
+
+
+def test_non_member_is_404_after_a_full_scan(store):
+    fake = store({"g-1": {"m-2": "u-2", "m-3": "u-3", "m-4": "u-4"}}, indexed={})
+
+    with pytest.raises(HTTPException) as raised:
+        _remove()
+    assert raised.value.status_code == 404
+    assert fake.deleted == []
+    assert fake.pages_read == 2
+
+
+def test_stale_index_is_rescanned_and_delete_retried(store):
+    fake = store({"g-1": {"m-new": "u-1"}}, indexed={"g-1": {"u-1": "m-old"}})
+
+    assert _remove()["success"] is True
+    assert fake.deleted == ["m-old", "m-new"]
+    assert fake.scans == 1
+    assert main._identity.indexed_membership_id("g-1", "u-1") is None
+
+
+def test_stale_index_for_removed_member_is_404(store):
+    fake = store({"g-1": {}}, indexed={"g-1": {"u-1": "m-old"}})
+
+    with pytest.raises(HTTPException) as raised:
+        _remove()
+    assert raised.value.status_code == 404
+    assert fake.deleted == ["m-old"]
+    assert fake.scans == 1
+    assert main._identity.indexed_membership_id("g-1", "u-1") is None
+
+
+def test_scanned_id_is_not_rescanned(store):
+    fake = store({"g-1": {"m-1": "u-1"}}, indexed={})
+
+    def already_gone(IdentityStoreId, MembershipId):
+        raise ResourceNotFoundException(MembershipId)
+
+    fake.delete_group_membership = already_gone
+
+    with pytest.raises(HTTPException) as raised:
+        _remove()
+    assert raised.value.status_code == 404
+    assert fake.scans == 1